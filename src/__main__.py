@@ -1,25 +1,41 @@
+from __future__ import annotations
+
 import argparse
-from inspect import formatannotationrelativeto
-import itertools
+import atexit
+import functools
 import logging
 import os
 import sys
-from tokenize import group
-from typing import Tuple
+from typing import TYPE_CHECKING, Optional, Tuple
 
-import numpy as np
 import pandas as pd
-import statsmodels.api as sm
-import patsy
-import matplotlib as mpl
-import matplotlib.pyplot as plt
-from sklearn.preprocessing import StandardScaler
 
-import reporting
-import eikon_database
+import defaults
+import features
+import ingestion_journal
+import metrics
+import package_manifest
+import package_supervisor
+import sample_store
+import tag_store
+
+# inference wird erst bei --regression importiert und hier nur für die Typangaben benötigt.
+if TYPE_CHECKING:
+    import inference
+
+# Module mit langsamem Import (Arelle, Refinitiv Eikon, statsmodels, SciPy, matplotlib) werden erst in dem Modus importiert, der sie benötigt
+# (reporting beim Laden der ESEF-Pakete, eikon_* beim Abruf der Unternehmensdaten, descriptive_stats und charts bei --analyze,
+# regression_models, spec_curve und inference bei --regression). Die Standardwerte der Kommandozeile stammen aus dem Modul defaults.
+# Die Einhaltung wird mit src/benchmark_startup.py geprüft.
 
 PATH_SAMPLES_DIR = "./samples"
 
+# Spalten des Samples, die für die Regressionsanalyse gelesen werden
+REGRESSION_COLUMNS = features.INPUT_COLUMNS
+
+# Position der SHA1-Prüfsumme in einem Bericht (Zeile des Samples)
+INDEX_SHA1 = sample_store.COLUMNS.index(sample_store.KEY_COLUMN)
+
 def main():
     logging.root.setLevel(100)
 
@@ -27,12 +43,58 @@ def main():
     arg_group = arg_parser.add_mutually_exclusive_group()
     arg_parser.add_argument("sample_name", help="der Name des Samples")
     arg_group.add_argument("-ap", "--append", action="store_true", help="Wenn die Option gesetzt ist, werden alle Berichte, die noch nicht im Sample enthalten sind, dem Sample hinzugefügt.")
-    arg_group.add_argument("-u", "--update", action="store_true", help="Wenn die Option gesetzt ist, werden alle Unternehmensdaten erneut aus Refinitiv Eikon heruntergeladen.")
+    arg_group.add_argument("-u", "--update", action="store_true", help="Wenn die Option gesetzt ist, werden fehlende (bzw. mit --max-age veraltete) Unternehmensdaten aus Refinitiv Eikon heruntergeladen.")
     arg_group.add_argument("-an", "--analyze", action="store_true", help="Wenn die Option gesetzt ist, wird eine deskriptive Analyse zur Untersuchung des Auszeichnungsverhaltens der Unternehmen durchgeführt.")
+    arg_group.add_argument("-x", "--export", action="store_true", help="Wenn die Option gesetzt ist, wird die Stichprobe als Excel-Datei in den Ordner \"data\" des Samples exportiert.")
     arg_group.add_argument("-r", "--regression", action="store_true", help="Wenn die Option gesetzt ist, wird eine Regressionsanalyse zur Ermittlung der Einflussfaktoren für eine erhöhte Verwendung von Erweiterungstaxonomieelementen druchgeführt.")
+    arg_parser.add_argument("-w", "--workers", type=int, default=1, help="Anzahl der Worker-Prozesse, mit denen die ESEF-Pakete parallel gelesen, die Modelle der Regressionsanalyse geschätzt bzw. die Diagramme der deskriptiven Analyse erstellt werden (Standard: 1).")
+    arg_parser.add_argument("--models", default=defaults.PATH_MODELS_FILE, help="Datei mit den Modellen der Regressionsanalyse (Name, Regressionsgleichung, Ordner). Standard: {}.".format(defaults.PATH_MODELS_FILE))
+    arg_parser.add_argument("--bootstrap", type=int, default=0, metavar="N", help="Anzahl der Bootstrap-Stichproben, mit denen bei --regression zusätzlich Standardfehler und Konfidenzintervalle der Koeffizienten ermittelt werden (mit --cluster werden ganze Cluster gezogen). Standard: 0 (kein Bootstrap).")
+    arg_parser.add_argument("--cluster", choices=sample_store.CATEGORICAL_COLUMNS, help="Ermittelt bei --regression zusätzlich cluster-robuste Standardfehler (CR1) mit Clustern nach der angegebenen Spalte.")
+    arg_parser.add_argument("--seed", type=int, default=defaults.BOOTSTRAP_SEED, help="Startwert für die Bootstrap-Stichproben. Standard: {}.".format(defaults.BOOTSTRAP_SEED))
+    arg_parser.add_argument("--spec-curve", action="store_true", help="Wenn die Option gesetzt ist, wird bei --regression statt der Modelle eine Spezifikationskurve über alle Kombinationen der Kontrollvariablen (Abschnitt \"spec_curve\" der Datei mit den Modellen) erstellt.")
+    arg_parser.add_argument("--spec-curve-summaries", type=int, nargs="+", default=[], metavar="SPEC", help="Nummern der Spezifikationen (Spalte SPEC der Ergebnistabelle), für die bei --spec-curve zusätzlich die vollständigen Ergebnisse gespeichert werden.")
+    arg_parser.add_argument("-e", "--engine", choices=defaults.ENGINES, default=defaults.ENGINE_ARELLE, help="Engine zum Lesen der Tags: \"arelle\" (Referenz, lädt die vollständige DTS) oder \"stream\" (liest nur die Berichtsdatei). Standard: arelle.")
+    arg_parser.add_argument("--max-packages-per-worker", type=int, default=0, metavar="N", help="Erneuert die Worker-Prozesse, nachdem ein Worker jeweils N ESEF-Pakete gelesen hat, sodass der Arbeitsspeicher über einen großen Import hinweg nicht anwächst. Standard: 0 (keine Erneuerung).")
+    arg_parser.add_argument("--max-worker-rss-mb", type=int, default=0, metavar="MB", help="Erneuert die Worker-Prozesse, sobald ein Worker nach dem Lesen eines ESEF-Pakets mehr als MB Arbeitsspeicher (RSS) belegt. Standard: 0 (keine Erneuerung).")
+    arg_parser.add_argument("--package-timeout", type=float, default=0, metavar="SECONDS", help="Zeitlimit je ESEF-Paket. Jedes Paket wird in einem überwachten Worker-Prozess gelesen, der bei Überschreitung beendet wird. Das Paket wird als nicht einlesbar erfasst. Standard: 0 (kein Limit).")
+    arg_parser.add_argument("--package-memory-mb", type=int, default=0, metavar="MB", help="Speicherlimit (RSS) des Worker-Prozesses beim Lesen eines ESEF-Pakets. Bei Überschreitung wird der Worker-Prozess beendet und das Paket als nicht einlesbar erfasst. Standard: 0 (kein Limit).")
+    arg_parser.add_argument("--quarantine", action="store_true", help="Wenn die Option gesetzt ist, werden ESEF-Pakete, deren Lesen wegen Zeit- oder Speicherlimit abgebrochen wurde, in den Ordner \"quarantine\" des Samples verschoben.")
+    arg_parser.add_argument("--tag-values", choices=tag_store.VALUES_MODES, default=tag_store.VALUES_TEXT, help="Speicherung der Werte der Tags im Ordner \"reports\": \"text\" (vollständige Werte) oder \"hash\" (nur SHA1-Prüfsumme der Werte). Standard: text.")
+    arg_parser.add_argument("-b", "--eikon-batch-size", type=int, default=0, help="Wenn ein Wert größer 0 angegeben ist, werden die Unternehmensdaten gebündelt je Abschlussstichtag mit höchstens dieser Anzahl an Instrumenten je Abfrage aus Refinitiv Eikon heruntergeladen (z.B. 100). Standard: 0 (Abruf je Bericht).")
+    arg_parser.add_argument("--max-age", type=float, metavar="DAYS", help="Bei --update werden zusätzlich zu den leeren Feldern alle Felder der Unternehmensdaten erneut abgerufen, die vor mehr als DAYS Tagen aktualisiert wurden oder deren Alter unbekannt ist (0: alle Felder).")
+    arg_parser.add_argument("--eikon-workers", type=int, default=1, help="Anzahl der Threads, mit denen die Unternehmensdaten nebenläufig aus Refinitiv Eikon heruntergeladen werden. Das Zugriffslimit (5 Anfragen je Sekunde) wird dabei gemeinsam eingehalten (Standard: 1).")
+    arg_parser.add_argument("--no-eikon-cache", action="store_true", help="Wenn die Option gesetzt ist, wird der Cache für die Antworten von Refinitiv Eikon weder gelesen noch geschrieben.")
+    arg_parser.add_argument("--invalidate-eikon-cache", nargs="*", metavar="TR_FIELD", help="Entfernt vor dem Datenabruf alle Einträge (ohne Angabe) bzw. die Einträge der angegebenen Datenfelder (z.B. TR.FreeFloatPct) aus dem Cache für Refinitiv Eikon.")
+    arg_parser.add_argument("--pipeline", action="store_true", help="Wenn die Option gesetzt ist, werden die Unternehmensdaten bereits während des Lesens der ESEF-Pakete abgerufen. Gelesene Berichte warten dabei in einer begrenzten Warteschlange auf den Abruf.")
+    arg_parser.add_argument("--pipeline-queue-size", type=int, default=defaults.PIPELINE_QUEUE_SIZE, metavar="N", help="Maximale Anzahl gelesener Berichte, die bei --pipeline auf den Abruf der Unternehmensdaten warten. Ist die Warteschlange voll, wird das Lesen angehalten. Standard: {}.".format(defaults.PIPELINE_QUEUE_SIZE))
+    arg_parser.add_argument("--resume", action="store_true", help="Setzt einen abgebrochenen Lauf zum Hinzufügen von Berichten (--append) anhand des Journals im Ordner des Samples fort. Bereits gelesene Pakete werden nicht erneut gelesen, bereits abgerufene Unternehmensdaten nicht erneut abgerufen.")
+    arg_parser.add_argument("--metrics", nargs="+", choices=metrics.SINKS, metavar="SINK", help="Misst die Laufzeit der Verarbeitungsstufen (je Paket bzw. Bericht) und gibt die Messwerte aus: \"jsonl\" (Protokoll des Laufs in metrics.jsonl), \"prometheus\" (Textdatei metrics.prom für den Node Exporter) und/oder \"summary\" (Tabelle am Ende des Laufs). Die Dateien werden im Ordner des Samples abgelegt.")
+    arg_parser.add_argument("--parity-check", action="store_true", help="Wenn die Option gesetzt ist, wird jeder Bericht zusätzlich mit der jeweils anderen Engine gelesen und die Anzahl der Tags wird verglichen.")
 
     args = arg_parser.parse_args()
 
+    if args.workers < 1:
+        arg_parser.error("Die Anzahl der Worker-Prozesse muss mindestens 1 betragen.")
+
+    if args.eikon_workers < 1:
+        arg_parser.error("Die Anzahl der Threads für Refinitiv Eikon muss mindestens 1 betragen.")
+
+    if args.max_packages_per_worker < 0 or args.max_worker_rss_mb < 0:
+        arg_parser.error("Die Grenzen für die Erneuerung der Worker-Prozesse dürfen nicht negativ sein.")
+
+    if args.package_timeout < 0 or args.package_memory_mb < 0:
+        arg_parser.error("Zeit- und Speicherlimit je ESEF-Paket dürfen nicht negativ sein.")
+
+    if (args.max_worker_rss_mb > 0 or args.package_memory_mb > 0) and not package_supervisor.is_memory_monitoring_supported():
+        arg_parser.error("Der Arbeitsspeicher der Worker-Prozesse kann auf diesem System nicht überwacht werden (/proc fehlt). --max-worker-rss-mb und --package-memory-mb werden nicht unterstützt.")
+
+    if args.pipeline_queue_size < 1:
+        arg_parser.error("Die Größe der Warteschlange muss mindestens 1 betragen.")
+
+    if args.bootstrap < 0:
+        arg_parser.error("Die Anzahl der Bootstrap-Stichproben darf nicht negativ sein.")
+
     paths_sample_dirs = get_paths_sample_dirs(args.sample_name)
 
     for path in paths_sample_dirs:
@@ -52,34 +114,97 @@ def main():
         path_sample_regression_analyses_dir,
         *x) = paths_sample_dirs
 
+    if args.metrics:
+        metrics.enable(metrics.create_sinks(args.metrics, path_sample_dir))
+
     df = None
-    columns = pd.array(["ESEF_PACKAGE_NAME", "LEI", "PERIOD_END", "ALL_TAGS", "PCT_ALL_TAGS", "ESEF_TAGS", "PCT_ESEF_TAGS", "EXT_TAGS", "PCT_EXT_TAGS", "SHA1", "ISIN", "COMPANY","SECTOR", "COUNTRY", "MARKET_CAP", "FREE_FLOAT", "AUDITOR", "AUDITOR_FEES", "EMPLOYEES", "FOUNDED", "ANALYSTS_FOLLOWING", "TOTAL_ASSETS", "TOTAL_DEBT", "INCOME", "TOTAL_ASSETS_T-1"])
+    columns = sample_store.COLUMNS
 
     path_sample_data_data_file = "{}/{}.xlsx".format(path_sample_data_dir, args.sample_name)
+    path_sample_store_file = sample_store.get_path_sample_store_file(path_sample_data_dir, args.sample_name)
 
+    # Ein Sample, das bisher nur als Excel-Datei vorliegt, wird einmalig in den Datenspeicher übernommen.
     try:
-        df = pd.read_excel(path_sample_data_data_file, sheet_name="DATA", index_col=0)
-    except FileNotFoundError:
-        df = pd.DataFrame(columns=columns)
+        if sample_store.import_excel(path_sample_store_file, path_sample_data_data_file):
+            print("\nDie Stichprobe \"{}\" wurde aus der Datei \"{}\" in den Datenspeicher \"{}\" übernommen.".format(args.sample_name, path_sample_data_data_file, path_sample_store_file))
     except PermissionError:
         print("\nStellen Sie sicher, dass die Datei \"{}\" nicht geöffnet ist.".format(path_sample_data_data_file))
         _exit_with_error()
 
+    # Es werden nur die Spalten gelesen, die für den jeweiligen Modus benötigt werden.
+    if args.regression:
+        df = sample_store.load(path_sample_store_file, REGRESSION_COLUMNS)
+    elif args.analyze or args.update:
+        df = sample_store.load(path_sample_store_file)
+    else:
+        df = sample_store.load(path_sample_store_file, [sample_store.KEY_COLUMN])
+
+    if args.export:
+        _check_if_sample_is_empty(df, args.sample_name)
+
+        # Das vollständige Sample wird erst beim Export gelesen.
+        try:
+            sample_store.export_excel(path_sample_store_file, path_sample_data_data_file)
+        except PermissionError:
+            print("\nStellen Sie sicher, dass die Datei \"{}\" nicht geöffnet ist.".format(path_sample_data_data_file))
+            _exit_with_error()
+
+        print("\nStichprobe exportiert nach \"{}\".".format(path_sample_data_data_file))
+
+        _exit_gracefully()
+
     if args.analyze:
         _check_if_sample_is_empty(df, args.sample_name)
 
-        _descriptive_analysis(df, args.sample_name, path_sample_descriptive_analyses_dir)
+        _descriptive_analysis(df, args.sample_name, path_sample_descriptive_analyses_dir, args.workers)
 
         _exit_gracefully()
 
     if args.regression:
         _check_if_sample_is_empty(df, args.sample_name)
 
-        _regression_analysis(df, args.sample_name, path_sample_regression_analyses_dir)
+        import inference
+
+        _regression_analysis(df, args.sample_name, path_sample_regression_analyses_dir, args.models, args.workers, args.spec_curve, args.spec_curve_summaries, inference.InferenceSettings(args.bootstrap, args.cluster, args.seed))
 
         _exit_gracefully()
 
-    if not eikon_database.setup():
+    # Jeder Verarbeitungsschritt beim Hinzufügen von Berichten wird je Paket im Journal festgehalten (siehe ingestion_journal).
+    journal = ingestion_journal.IngestionJournal(ingestion_journal.get_path_journal_file(path_sample_dir))
+
+    if journal.pending() > 0 and not args.resume and not args.update:
+        print("\nDer letzte Lauf für die Stichprobe \"{}\" wurde nicht abgeschlossen. {} Bericht(e) im Journal \"{}\" sind noch nicht im Datenspeicher. Setzen Sie den Lauf mit der Option --resume fort.".format(args.sample_name, journal.pending(), journal.path_journal_file))
+        _exit_with_error()
+
+    import eikon_cache
+    import eikon_client
+    import eikon_database
+
+    if not args.no_eikon_cache:
+        cache = eikon_cache.EikonCache(eikon_cache.get_path_cache_file(path_sample_dir))
+
+        if args.invalidate_eikon_cache is not None:
+            print("\nEs wurden {} Einträge aus dem Cache für Refinitiv Eikon entfernt.".format(cache.invalidate(args.invalidate_eikon_cache)))
+
+        eikon_database.set_cache(cache)
+
+    # Die Anzahl der Anfragen des aktuellen Tages wird programmübergreifend gezählt, damit das Tageslimit der Eikon Data API nicht überschritten wird.
+    quota_ledger = eikon_client.QuotaLedger()
+
+    eikon_database.set_quota_ledger(quota_ledger)
+
+    # Das Journal verbucht Anfragen im Voraus und schreibt beim Programmende den genauen Stand.
+    atexit.register(quota_ledger.close)
+
+    print("\nVerbleibende Anfragen an Refinitiv Eikon für heute: {} (von {}, davon {} als Reserve).".format(quota_ledger.remaining_today, quota_ledger.limit, quota_ledger.reserve))
+
+    try:
+        connected = eikon_database.setup()
+    except eikon_client.QuotaExhaustedError as e:
+        print("\n{}".format(e))
+        _exit_with_error()
+
+    if not connected:
         print("\nRefinitiv Eikon muss für die Verwendung des Programms gestartet sein. Falls Refinitv Eikon gestartet ist, überprüfen Sie auch den in der Datei \"config.yml\" hinterlegten App-Key.")
         _exit_with_error()
 
@@ -88,46 +213,81 @@ def main():
         
         print("\nDie Unternehmensdaten der Stichprobe \"{}\" werden nun aktualisiert.".format(args.sample_name))
 
-        columns_to_drop = ["ISIN", "COMPANY", "SECTOR", "COUNTRY", "MARKET_CAP", "FREE_FLOAT", "AUDITOR", "AUDITOR_FEES", "EMPLOYEES", "FOUNDED", "ANALYSTS_FOLLOWING", "TOTAL_ASSETS", "TOTAL_DEBT", "INCOME", "TOTAL_ASSETS_T-1"]
-        df = df.drop(columns=columns_to_drop)
+        # Abgerufen werden nur leere Felder sowie (mit --max-age) Felder, deren letzte Aktualisierung länger als die angegebene Anzahl an Tagen zurückliegt.
+        # Nur die veralteten Felder werden unabhängig vom Cache abgerufen.
+        field_updates = sample_store.load_field_updates(path_sample_store_file)
 
-        reports = df.to_numpy().tolist()
+        fields_to_update = sample_store.find_fields_to_update(df, field_updates, eikon_database.COMPANY_DATA_COLUMNS, args.max_age)
+        stale_fields = sample_store.find_stale_fields(df, field_updates, eikon_database.COMPANY_DATA_COLUMNS, args.max_age) if args.max_age is not None else None
 
-        eikon_database.get_company_data(reports)
+        print("\n{} von {} Feldern der Unternehmensdaten ({} Bericht(e)) werden abgerufen.".format(int(fields_to_update.to_numpy().sum()), fields_to_update.size, int(fields_to_update.any(axis=1).sum())))
 
-        df = pd.DataFrame(reports, columns=columns)
+        updates = eikon_database.update_company_data(df, fields_to_update, args.eikon_batch_size if args.eikon_batch_size > 0 else 1, args.eikon_workers, stale_fields)
 
-        # df = pd.DataFrame(columns=columns)
+        updated = _merge_company_data(df, updates)
 
-        # df = pd.concat([df, df_reports], ignore_index=True)
+        # Die Unternehmensdaten werden zeilenweise über die SHA1-Prüfsumme des Berichts im Datenspeicher aktualisiert.
+        rows = updated.any(axis=1)
 
-        df.to_excel(path_sample_data_data_file, sheet_name="DATA")
+        sample_store.update(path_sample_store_file, df.loc[rows], [column for column in updated.columns if updated[column].any()])
+        sample_store.record_field_updates(path_sample_store_file, df, updated.loc[rows])
 
-        print("\nDie Unternehmensdaten der Stichprobe \"{}\" wurden aktualisiert.".format(args.sample_name))
-        print("\nStichprobe gespeichert in \"{}\".".format(path_sample_data_data_file))
+        print("\nDie Unternehmensdaten der Stichprobe \"{}\" wurden aktualisiert ({} Feld(er) in {} Bericht(en)).".format(args.sample_name, len(updates), int(rows.sum())))
+        print("\nStichprobe gespeichert in \"{}\".".format(path_sample_store_file))
         
         _exit_gracefully()
 
-    if df.empty or args.append:
+    if df.empty or args.append or args.resume:
+        if args.resume:
+            if journal.pending() > 0:
+                print("\nDer abgebrochene Lauf wird fortgesetzt: {} Bericht(e) gelesen, {} Bericht(e) mit Unternehmensdaten.".format(len(journal.reports(ingestion_journal.STATE_PARSED)), len(journal.reports(ingestion_journal.STATE_ENRICHED))))
+            else:
+                print("\nEs ist kein abgebrochener Lauf vorhanden.")
+
         print("\nESEF-Pakete werden nun geladen.")
 
-        reports = reporting.load_reports(df["SHA1"], path_sample_esef_packages_dir, path_sample_reports_dir)
+        import reporting
+
+        # Quarantäne-Ordner für ESEF-Pakete, deren Lesen abgebrochen wurde
+        path_quarantine_dir = path_sample_dir + "/quarantine" if args.quarantine else None
+
+        # Unternehmensdaten werden für alle gelesenen Berichte abgerufen, auch für die eines abgebrochenen Laufs. Mit --pipeline erfolgt der Abruf
+        # bereits während des Lesens, sonst im Anschluss.
+        if args.pipeline:
+            with eikon_database.EnrichmentPipeline(args.pipeline_queue_size, args.eikon_batch_size, args.eikon_workers, functools.partial(_record_enriched, journal)) as pipeline:
+                for report in journal.reports(ingestion_journal.STATE_PARSED):
+                    pipeline.put(report)
+
+                reporting.load_reports(df["SHA1"], path_sample_esef_packages_dir, path_sample_reports_dir, args.workers, args.engine, args.parity_check, package_manifest.get_path_manifest_file(path_sample_dir), args.tag_values, journal, pipeline.put, args.max_packages_per_worker, args.max_worker_rss_mb, args.package_timeout, args.package_memory_mb, path_quarantine_dir)
+        else:
+            reporting.load_reports(df["SHA1"], path_sample_esef_packages_dir, path_sample_reports_dir, args.workers, args.engine, args.parity_check, package_manifest.get_path_manifest_file(path_sample_dir), args.tag_values, journal, max_packages_per_worker=args.max_packages_per_worker, max_worker_rss_mb=args.max_worker_rss_mb, package_timeout_s=args.package_timeout, package_memory_mb=args.package_memory_mb, path_quarantine_dir=path_quarantine_dir)
 
-        eikon_database.get_company_data(reports)
+            _get_company_data(journal.reports(ingestion_journal.STATE_PARSED), args.eikon_batch_size, args.eikon_workers, journal)
+
+        # Berichte, die vor einem Abbruch bereits in den Datenspeicher übernommen, aber nicht mehr als gespeichert vermerkt wurden, werden nicht erneut angehängt.
+        existing_sha1_checksums = set(df[sample_store.KEY_COLUMN].dropna())
+
+        reports_enriched = journal.reports(ingestion_journal.STATE_ENRICHED)
+        reports = [report for report in reports_enriched if report[INDEX_SHA1] not in existing_sha1_checksums]
 
         df_reports = pd.DataFrame(reports, columns=columns)
 
-        df = pd.concat([df, df_reports], ignore_index=True)
+        # Die neuen Berichte werden an den bestehenden Datenspeicher angehängt, ohne das Sample vollständig neu zu schreiben.
+        sample_store.append(path_sample_store_file, df_reports)
+        sample_store.record_field_updates(path_sample_store_file, df_reports, ~sample_store.find_fields_to_update(df_reports, None, eikon_database.COMPANY_DATA_COLUMNS))
 
-        df.to_excel(path_sample_data_data_file, sheet_name="DATA")
+        journal.record_many([report[INDEX_SHA1] for report in reports_enriched], ingestion_journal.STATE_STORED)
+        journal.clear()
 
         print("\nEs wurde(n) {} Bericht(e) geladen.".format(len(reports)))
 
         if(len(reports) > 0):
-            print("\nStichprobe gespeichert in \"{}\".".format(path_sample_data_data_file))
+            print("\nStichprobe gespeichert in \"{}\".".format(path_sample_store_file))
     else:
         print("\nDie Stichprobe \"{}\" ist bereits vorhanden. Bitte wählen Sie einen anderen Namen.\nHinweis: Möchten Sie Elemente zur Stichprobe hinzufügen, verwenden Sie bitte die Option -ap oder --append.".format(args.sample_name))
 
+    metrics.close()
+
     print("")
 
 def get_paths_sample_dirs(sample_name: str) -> Tuple[str, str, str, str, str, str, str, str, str, str]:
@@ -159,20 +319,67 @@ def get_paths_sample_dirs(sample_name: str) -> Tuple[str, str, str, str, str, st
         path_sample_regression_analysis_dir + "/model10"
     )
 
+def _get_company_data(reports: list, eikon_batch_size: int, eikon_workers: int, journal: Optional[ingestion_journal.IngestionJournal] = None):
+    import eikon_database
+
+    # Beim Einzelabruf wird jeder Bericht nach seinem Abruf im Journal vermerkt, beim gebündelten Abruf alle Berichte nach dem Abruf.
+    if eikon_batch_size > 0:
+        eikon_database.get_company_data_batched(reports, eikon_batch_size, eikon_workers)
+
+        for report in reports:
+            _record_enriched(journal, report)
+    else:
+        eikon_database.get_company_data(reports, eikon_workers, functools.partial(_record_enriched, journal))
+
+def _record_enriched(journal: ingestion_journal.IngestionJournal, report: list):
+    import eikon_database
+
+    if journal is not None:
+        journal.record(report[INDEX_SHA1], ingestion_journal.STATE_ENRICHED, report[eikon_database.INDEX_ESEF_PACKAGE_NAME], report)
+
+def _merge_company_data(df: pd.DataFrame, updates: dict) -> pd.DataFrame:
+    # Übernimmt die abgerufenen Werte je (Index, Spalte) in das bestehende Sample und liefert die aktualisierten Felder (True = aktualisiert).
+    import eikon_database
+
+    updated = pd.DataFrame(False, index=df.index, columns=eikon_database.COMPANY_DATA_COLUMNS)
+
+    for column in eikon_database.COMPANY_DATA_COLUMNS:
+        values = pd.Series({index: value for (index, update_column), value in updates.items() if update_column == column}, dtype=object)
+
+        if values.empty:
+            continue
+
+        # Neue Ausprägungen kategorialer Spalten (z.B. ein neuer Abschlussprüfer) müssen zunächst als Kategorie ergänzt werden.
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].cat.add_categories(pd.Index(values.unique()).difference(df[column].cat.categories))
+        elif sample_store.COLUMN_TYPES[column] != "TEXT":
+            values = pd.to_numeric(values, errors="coerce")
+
+        df.loc[values.index, column] = values
+        updated.loc[values.index, column] = True
+
+    return updated
+
 def _check_if_sample_is_empty(df: pd.DataFrame, sample_name: str):
     if df.empty:
             print("\nDie Stichprobe \"{}\" ist nicht vorhanden.".format(sample_name))
             _exit_with_error()
 
 def _exit_gracefully():
+        metrics.close()
+
         print("")
         sys.exit(0)
 
 def _exit_with_error():
+        metrics.close()
+
         print("")       
         sys.exit(1)
 
-def _descriptive_analysis(df: pd.DataFrame, sample_name: str, path_sample_descriptive_analyses_dir: str):
+def _descriptive_analysis(df: pd.DataFrame, sample_name: str, path_sample_descriptive_analyses_dir: str, workers: int = 1):
+    import charts
+    import descriptive_stats
 
     paths_sample_dirs = get_paths_sample_dirs(sample_name)
 
@@ -185,369 +392,114 @@ def _descriptive_analysis(df: pd.DataFrame, sample_name: str, path_sample_descri
         df["ALL_TAGS"].describe().to_excel(writer, sheet_name="ALL_TAGS")
         df["PCT_EXT_TAGS"].describe().to_excel(writer, sheet_name="PCT_EXT_TAGS")
 
-    #######################
-    ### Ländervergleich ###
-    #######################
-
-    path_s_d_a_ca_dir = paths_sample_dirs[5]
-
-    path_s_d_a_ca_summary_file = path_s_d_a_ca_dir + "/ca_{}_summary.xlsx".format(sample_name)
-    path_s_d_a_ca_plt_all_tags_file = path_s_d_a_ca_dir + "/ca_{}_plt_all_tags.pdf".format(sample_name)
-    path_s_d_a_ca_plt_pct_ext_tags_file = path_s_d_a_ca_dir + "/ca_{}_plt_pct_ext_tags.pdf".format(sample_name)
-
-    grouped_by_country = df.groupby(df["COUNTRY"])
-
-    with pd.ExcelWriter(path_s_d_a_ca_summary_file) as writer:
-        grouped_by_country["ALL_TAGS"].describe().to_excel(writer, sheet_name="ALL_TAGS")
-        grouped_by_country["PCT_EXT_TAGS"].describe().to_excel(writer, sheet_name="PCT_EXT_TAGS")
-
-    grouped_by_country["ALL_TAGS"].mean().plot.bar(xlabel="Land", ylabel="\u00D8 Anzahl verwendeter Tags")
-    plt.tight_layout()
-    fig = plt.gcf()
-    fig.savefig(path_s_d_a_ca_plt_all_tags_file)
-    plt.close(fig)
-
-    grouped_by_country["PCT_EXT_TAGS"].mean().plot.bar(xlabel="Land", ylabel="\u00D8 Anteil an ETEs (%)")
-    plt.tight_layout()
-    fig = plt.gcf()
-    fig.savefig(path_s_d_a_ca_plt_pct_ext_tags_file)
-    plt.close(fig)
-
-    #######################
-    ### Sektorenanalyse ###
-    #######################
-
-    path_s_d_a_sa_dir = paths_sample_dirs[6]
-
-    path_s_d_a_sa_summary_file = path_s_d_a_sa_dir + "/sa_{}_summary.xlsx".format(sample_name)
-    path_s_d_a_sa_plt_all_tags_file = path_s_d_a_sa_dir + "/sa_{}_plt_all_tags.pdf".format(sample_name)
-    path_s_d_a_sa_plt_pct_ext_tags_file = path_s_d_a_sa_dir + "/sa_{}_plt_pct_ext_tags.pdf".format(sample_name)
-
-    grouped_by_naics_sector = df.groupby(df["SECTOR"])
-
-    with pd.ExcelWriter(path_s_d_a_sa_summary_file) as writer:
-        grouped_by_naics_sector["ALL_TAGS"].describe().sort_values("mean", ascending=False).to_excel(writer, sheet_name="ALL_TAGS")
-        grouped_by_naics_sector["PCT_EXT_TAGS"].describe().sort_values("mean", ascending=False).to_excel(writer, sheet_name="PCT_EXT_TAGS")
-
-    grouped_by_naics_sector["ALL_TAGS"].mean().sort_values(ascending=False).plot.bar(xlabel="Sektor (TRBC)", ylabel="\u00D8 Anzahl verwendeter Tags")
-    plt.xticks(fontsize=6, rotation=20, ha="right")
-    plt.tight_layout()
-    fig = plt.gcf()
-    fig.savefig(path_s_d_a_sa_plt_all_tags_file)
-    plt.close(fig)
-
-    grouped_by_naics_sector["PCT_EXT_TAGS"].mean().sort_values(ascending=False).plot.bar(xlabel="Sektor (TRBC)", ylabel="\u00D8 Anteil an ETEs (%)")
-    plt.xticks(fontsize=6, rotation=20, ha="right")
-    plt.tight_layout()
-    fig = plt.gcf()
-    fig.savefig(path_s_d_a_sa_plt_pct_ext_tags_file)
-    plt.close(fig)
-
-    ############################################
-    ### Analyse nach Unternehmensgröße (MVA) ###
-    ############################################
-
-    path_s_d_a_mca_dir = paths_sample_dirs[7]
-
-    path_s_d_a_mca_data_file = path_s_d_a_mca_dir + "/mca_{}.xlsx".format(sample_name)
-    path_s_d_a_mca_summary_file = path_s_d_a_mca_dir + "/mca_{}_summary.xlsx".format(sample_name)
-    path_s_d_a_mca_plt_all_tags_file = path_s_d_a_mca_dir + "/mca_{}_plt_all_tags.pdf".format(sample_name)
-    path_s_d_a_mca_plt_pct_ext_tags_file = path_s_d_a_mca_dir + "/mca_{}_plt_pct_ext_tags.pdf".format(sample_name)
-
-    df_market_cap = df.copy(deep=True)
-    df_market_cap["MARKET_CAP_CAT"] = df_market_cap["MARKET_CAP"].transform(lambda x: pd.qcut(x, 5))
-
-    df_market_cap.to_excel(path_s_d_a_mca_data_file, sheet_name="DATA")
-
-    grouped_by_market_cap = df_market_cap.groupby(df_market_cap["MARKET_CAP_CAT"])
-
-    with pd.ExcelWriter(path_s_d_a_mca_summary_file) as writer:
-        grouped_by_market_cap["ALL_TAGS"].describe().to_excel(writer, sheet_name="ALL_TAGS")
-        grouped_by_market_cap["PCT_EXT_TAGS"].describe().to_excel(writer, sheet_name="PCT_EXT_TAGS")
-
-    grouped_by_market_cap["ALL_TAGS"].mean().plot.bar(xlabel="Marktkapitalisierung zum Abschlussstichtag (Mio. EUR)", ylabel="\u00D8 Anzahl verwendeter Tags")
-    plt.xticks(fontsize=6, rotation=20, ha="right")
-    plt.tight_layout()
-    fig = plt.gcf()
-    fig.savefig(path_s_d_a_mca_plt_all_tags_file)
-    plt.close(fig)
-
-    grouped_by_market_cap["PCT_EXT_TAGS"].mean().plot.bar(xlabel="Marktkapitalisierung zum Abschlussstichtag (Mio. EUR)", ylabel="\u00D8 Anteil an ETEs (%)")
-    plt.xticks(fontsize=6, rotation=20, ha="right")
-    plt.tight_layout()
-    fig = plt.gcf()
-    fig.savefig(path_s_d_a_mca_plt_pct_ext_tags_file)
-    plt.close(fig)
-
-    ###############################
-    ### Analyse nach Free Float ###
-    ###############################
-
-    path_s_d_a_ffa_dir = paths_sample_dirs[8]
-
-    path_s_d_a_ffa_data_file = path_s_d_a_ffa_dir + "/ffa_{}.xlsx".format(sample_name)
-    path_s_d_a_ffa_summary_file = path_s_d_a_ffa_dir + "/ffa_{}_summary.xlsx".format(sample_name)
-    path_s_d_a_ffa_plt_all_tags_file = path_s_d_a_ffa_dir + "/ffa_{}_plt_all_tags.pdf".format(sample_name)
-    path_s_d_a_ffa_plt_pct_ext_tags_file = path_s_d_a_ffa_dir + "/ffa_{}_plt_pct_ext_tags.pdf".format(sample_name)
-
-    df_free_float = df.copy(deep=True)
-    df_free_float["FREE_FLOAT_CAT"] = df_free_float["FREE_FLOAT"].transform(lambda x: pd.qcut(x, 5))
-
-    df_free_float.to_excel(path_s_d_a_ffa_data_file, sheet_name="DATA")
+    # Alle Kennzahlen je Dimension werden in einem Durchlauf ermittelt (descriptive_stats.DIMENSIONS).
+    stats, groups = descriptive_stats.compute(df)
 
-    grouped_by_free_float = df_free_float.groupby(df_free_float["FREE_FLOAT_CAT"])
+    chart_specs = []
+    workbooks = {}
 
-    with pd.ExcelWriter(path_s_d_a_ffa_summary_file) as writer:
-        grouped_by_free_float["ALL_TAGS"].describe().to_excel(writer, sheet_name="ALL_TAGS")
-        grouped_by_free_float["PCT_EXT_TAGS"].describe().to_excel(writer, sheet_name="PCT_EXT_TAGS")
+    for dimension in descriptive_stats.DIMENSIONS:
+        path_s_d_a_dimension_dir = "{}/{}".format(path_sample_descriptive_analyses_dir, dimension.dir)
 
-    grouped_by_free_float["ALL_TAGS"].mean().plot.bar(xlabel="Streubesitz zum Abschlussstichtag (%)", ylabel="\u00D8 Anzahl verwendeter Tags")
-    plt.xticks(fontsize=6, rotation=20, ha="right")
-    plt.tight_layout()
-    fig = plt.gcf()
-    fig.savefig(path_s_d_a_ffa_plt_all_tags_file)
-    plt.close(fig)
+        os.makedirs(path_s_d_a_dimension_dir, exist_ok=True)
 
-    grouped_by_free_float["PCT_EXT_TAGS"].mean().plot.bar(xlabel="Streubesitz zum Abschlussstichtag (%)", ylabel="\u00D8 Anteil an ETEs (%)")
-    plt.xticks(fontsize=6, rotation=20, ha="right")
-    plt.tight_layout()
-    fig = plt.gcf()
-    fig.savefig(path_s_d_a_ffa_plt_pct_ext_tags_file)
-    plt.close(fig)
+        # Das Sample wird inkl. der Klassen gespeichert.
+        if dimension.export_data:
+            df.assign(**{dimension.name: groups[dimension.name]}).to_excel(path_s_d_a_dimension_dir + "/{}_{}.xlsx".format(dimension.prefix, sample_name), sheet_name="DATA")
 
-    ###########################
-    ### Analyse nach Prüfer ###
-    ###########################
+        path_s_d_a_dimension_summary_file = path_s_d_a_dimension_dir + "/{}_{}_summary.xlsx".format(dimension.prefix, sample_name)
 
-    path_s_d_a_aa_dir = paths_sample_dirs[9]
+        for metric in descriptive_stats.METRICS:
+            df_stats = stats[(dimension.name, metric)]
 
-    path_s_d_a_aa_summary_file = path_s_d_a_aa_dir + "/aa_{}_summary.xlsx".format(sample_name)
-    path_s_d_a_aa_plt_all_tags_file = path_s_d_a_aa_dir + "/aa_{}_plt_all_tags.pdf".format(sample_name)
-    path_s_d_a_aa_plt_pct_ext_tags_file = path_s_d_a_aa_dir + "/aa_{}_plt_pct_ext_tags.pdf".format(sample_name)
-    path_s_d_a_aa_plt_all_tags_alt1_file = path_s_d_a_aa_dir + "/aa_{}_plt_all_tags_alt1.pdf".format(sample_name)
-    path_s_d_a_aa_plt_pct_ext_tags_alt1_file = path_s_d_a_aa_dir + "/aa_{}_plt_pct_ext_tags_alt1.pdf".format(sample_name)
+            if dimension.sort_by_mean:
+                df_stats = df_stats.sort_values("mean", ascending=False)
 
-    big4 = ["EY", "Deloitte", "PWC", "KPMG"]
-    column_auditor_agg = pd.Series(np.where(df["AUDITOR"].isin(big4), df["AUDITOR"], "Non Big-4"))
-    df = df.assign(AUDITOR_AGG=column_auditor_agg.values)
+            workbooks.setdefault(path_s_d_a_dimension_summary_file, []).append((metric + dimension.suffix.upper(), df_stats))
 
-    grouped_by_auditor = df.groupby(df["AUDITOR"])
-    grouped_by_auditor_alt1 = df.groupby(df["AUDITOR_AGG"])
+            path_s_d_a_plt_file = path_s_d_a_dimension_dir + "/{}_{}_plt_{}{}.pdf".format(dimension.prefix, sample_name, metric.lower(), dimension.suffix)
 
-    with pd.ExcelWriter(path_s_d_a_aa_summary_file) as writer:
-        grouped_by_auditor["ALL_TAGS"].describe().to_excel(writer, sheet_name="ALL_TAGS")
-        grouped_by_auditor["PCT_EXT_TAGS"].describe().to_excel(writer, sheet_name="PCT_EXT_TAGS")
-        grouped_by_auditor_alt1["ALL_TAGS"].describe().to_excel(writer, sheet_name="ALL_TAGS_ALT1")
-        grouped_by_auditor_alt1["PCT_EXT_TAGS"].describe().to_excel(writer, sheet_name="PCT_EXT_TAGS_ALT1")
+            chart_specs.append(charts.ChartSpec(path_s_d_a_plt_file, dimension.name, metric, dimension.xlabel, descriptive_stats.METRIC_LABELS[metric], dimension.sort_by_mean, dimension.small_ticks))
 
-    grouped_by_auditor["ALL_TAGS"].mean().plot.bar(xlabel="Abschlussprüfer", ylabel="\u00D8 Anzahl verwendeter Tags")
-    plt.xticks(fontsize=6, rotation=20, ha="right")
-    plt.tight_layout()
-    fig = plt.gcf()
-    fig.savefig(path_s_d_a_aa_plt_all_tags_file)
-    plt.close(fig)
+    # Dimensionen mit demselben Präfix werden in einer Arbeitsmappe zusammengefasst.
+    for path_s_d_a_dimension_summary_file, sheets in workbooks.items():
+        with pd.ExcelWriter(path_s_d_a_dimension_summary_file) as writer:
+            for sheet_name, df_stats in sheets:
+                df_stats.to_excel(writer, sheet_name=sheet_name)
 
-    grouped_by_auditor["PCT_EXT_TAGS"].mean().plot.bar(xlabel="Abschlussprüfer", ylabel="\u00D8 Anteil an ETEs (%)")
-    plt.xticks(fontsize=6, rotation=20, ha="right")
-    plt.tight_layout()
-    fig = plt.gcf()
-    fig.savefig(path_s_d_a_aa_plt_pct_ext_tags_file)
-    plt.close(fig)
+    # Diagramme, deren Werte sich seit dem letzten Lauf nicht geändert haben, werden nicht erneut erstellt.
+    count_rendered, count_skipped = charts.render(descriptive_stats.means(stats), chart_specs, path_sample_descriptive_analyses_dir, workers)
 
-    grouped_by_auditor_alt1["ALL_TAGS"].mean().plot.bar(xlabel="Abschlussprüfer", ylabel="\u00D8 Anzahl verwendeter Tags")
-    plt.xticks(fontsize=6, rotation=20, ha="right")
-    plt.tight_layout()
-    fig = plt.gcf()
-    fig.savefig(path_s_d_a_aa_plt_all_tags_alt1_file)
-    plt.close(fig)
+    print("\n{} Diagramme erstellt, {} unverändert.".format(count_rendered, count_skipped))
 
-    grouped_by_auditor_alt1["PCT_EXT_TAGS"].mean().plot.bar(xlabel="Abschlussprüfer", ylabel="\u00D8 Anteil an ETEs (%)")
-    plt.xticks(fontsize=6, rotation=20, ha="right")
-    plt.tight_layout()
-    fig = plt.gcf()
-    fig.savefig(path_s_d_a_aa_plt_pct_ext_tags_alt1_file)
-    plt.close(fig)
+def _regression_analysis(df: pd.DataFrame, sample_name: str, path_sample_regression_analyses_dir: str, path_models_file: str, workers: int, run_spec_curve: bool = False, spec_curve_summaries: Optional[list] = None, inference_settings: Optional[inference.InferenceSettings] = None):
+    import regression_models
 
-def _regression_analysis(df: pd.DataFrame, sample_name: str, path_sample_regression_analyses_dir: str):
+    if spec_curve_summaries is None:
+        spec_curve_summaries = []
 
     paths_sample_dirs = get_paths_sample_dirs(sample_name)
 
-    df = _prepare_data(df)
+    # Die aufbereiteten Variablen werden im Ordner "data" des Samples gespeichert und bei unveränderten Eingangsdaten wiederverwendet.
+    df = features.prepare(df, paths_sample_dirs[3])
 
     #_hist_exo_vars(df)
 
-    ###############
-    ### Model 1 ###
-    ###############
-
-    path_s_r_a_m1_dir = paths_sample_dirs[11]
-
-    # Erstellt auf Basis der Regressionsgleichung einen Vektor, der die abhängige Variable enthält und eine Matrix, die das Interzept und die unabhängigen Variable enthält. 
-    y, X = patsy.dmatrices("log_PCT_EXT_TAGS ~ log_ALL_TAGS + log_MARKET_CAP + IS_FIN + OLD_COMPANY + log_FREE_FLOAT + log_DEBT + log_ROA + COUNTRY", data=df, return_type="dataframe")
-
-    _run_model(sample_name, "m1", y, X, path_s_r_a_m1_dir)
-
-    ###############
-    ### Model 2 ###
-    ###############
-
-    path_s_r_a_m2_dir = paths_sample_dirs[12]
-
-    # Erstellt auf Basis der Regressionsgleichung einen Vektor, der die abhängige Variable enthält und eine Matrix, die das Interzept und die unabhängigen Variable enthält. 
-    y, X = patsy.dmatrices("log_PCT_EXT_TAGS ~ log_ALL_TAGS + log_TOTAL_ASSETS + IS_FIN + OLD_COMPANY + log_FREE_FLOAT + log_DEBT + log_ROA + COUNTRY", data=df, return_type="dataframe")
-
-    _run_model(sample_name, "m2", y, X, path_s_r_a_m2_dir)
-
-    ###############
-    ### Model 3 ###
-    ###############
-
-    path_s_r_a_m3_dir = paths_sample_dirs[13]
-
-    # Erstellt auf Basis der Regressionsgleichung einen Vektor, der die abhängige Variable enthält und eine Matrix, die das Interzept und die unabhängigen Variable enthält. 
-    y, X = patsy.dmatrices("log_PCT_EXT_TAGS ~ log_ALL_TAGS + log_MARKET_CAP + SECTOR + OLD_COMPANY + log_FREE_FLOAT + log_DEBT + log_ROA + COUNTRY", data=df, return_type="dataframe")
-
-    _run_model(sample_name, "m3", y, X, path_s_r_a_m3_dir)
-
-    ###############
-    ### Model 4 ###
-    ###############
-
-    path_s_r_a_m4_dir = paths_sample_dirs[14]
+    if run_spec_curve:
+        _spec_curve_analysis(df, sample_name, paths_sample_dirs[10], path_models_file, workers, spec_curve_summaries, inference_settings)
 
-    # Erstellt auf Basis der Regressionsgleichung einen Vektor, der die abhängige Variable enthält und eine Matrix, die das Interzept und die unabhängigen Variable enthält. 
-    y, X = patsy.dmatrices("log_PCT_EXT_TAGS ~ log_ALL_TAGS + log_TOTAL_ASSETS + SECTOR + OLD_COMPANY + log_FREE_FLOAT + log_DEBT + log_ROA + COUNTRY", data=df, return_type="dataframe")
+        return
 
-    _run_model(sample_name, "m4", y, X, path_s_r_a_m4_dir)
-
-    ###############
-    ### Model 5 ###
-    ###############
-
-    path_s_r_a_m5_dir = paths_sample_dirs[15]
-
-    # Erstellt auf Basis der Regressionsgleichung einen Vektor, der die abhängige Variable enthält und eine Matrix, die das Interzept und die unabhängigen Variable enthält. 
-    y, X = patsy.dmatrices("log_PCT_EXT_TAGS ~ log_ALL_TAGS + log_MARKET_CAP + SECTOR + OLD_COMPANY + log_FREE_FLOAT + log_DEBT + log_ROA + COUNTRY + AUDITOR_AGG", data=df, return_type="dataframe")
-
-    _run_model(sample_name, "m5", y, X, path_s_r_a_m5_dir)
-
-    ###############
-    ### Model 6 ###
-    ###############
-
-    path_s_r_a_m6_dir = paths_sample_dirs[16]
-
-    # Erstellt auf Basis der Regressionsgleichung einen Vektor, der die abhängige Variable enthält und eine Matrix, die das Interzept und die unabhängigen Variable enthält. 
-    y, X = patsy.dmatrices("log_PCT_EXT_TAGS ~ log_ALL_TAGS + log_TOTAL_ASSETS + SECTOR + OLD_COMPANY + log_FREE_FLOAT + log_DEBT + log_ROA + COUNTRY + AUDITOR_AGG", data=df, return_type="dataframe")
-
-    _run_model(sample_name, "m6", y, X, path_s_r_a_m6_dir)
-
-    ###############
-    ### Model 7 ###
-    ###############
-
-    path_s_r_a_m7_dir = paths_sample_dirs[17]
-
-    # Erstellt auf Basis der Regressionsgleichung einen Vektor, der die abhängige Variable enthält und eine Matrix, die das Interzept und die unabhängigen Variable enthält. 
-    y, X = patsy.dmatrices("log_PCT_EXT_TAGS ~ log_ALL_TAGS + log_MARKET_CAP + IS_FIN + OLD_COMPANY + log_FREE_FLOAT + log_DEBT + log_ROA", data=df, return_type="dataframe")
-
-    _run_model(sample_name, "m7", y, X, path_s_r_a_m7_dir)
-
-    ###############
-    ### Model 8 ###
-    ###############
-
-    path_s_r_a_m8_dir = paths_sample_dirs[18]
+    # Die Modelle (Name, Regressionsgleichung, Ordner) sind in der Datei "models.yml" hinterlegt.
+    try:
+        specs = regression_models.load_specs(path_models_file)
+    except (OSError, ValueError) as err:
+        print("\nDie Modelle der Regressionsanalyse konnten nicht aus der Datei \"{}\" gelesen werden: {}".format(path_models_file, err))
+        _exit_with_error()
 
-    # Erstellt auf Basis der Regressionsgleichung einen Vektor, der die abhängige Variable enthält und eine Matrix, die das Interzept und die unabhängigen Variable enthält. 
-    y, X = patsy.dmatrices("log_PCT_EXT_TAGS ~ log_ALL_TAGS + log_TOTAL_ASSETS + IS_FIN + OLD_COMPANY + log_FREE_FLOAT + log_DEBT + log_ROA", data=df, return_type="dataframe")
+    summaries = regression_models.run_models(df, specs, sample_name, paths_sample_dirs[10], workers, inference_settings)
 
-    _run_model(sample_name, "m8", y, X, path_s_r_a_m8_dir)
+    # Ausgabe der Ergebnisse auf der Konsole
+    for summary in summaries:
+        print(summary)
 
-    ###############
-    ### Model 9 ###
-    ###############
+    # Kontrolldiagramm: Teilregression PCT_EXT_TAGS ~ log_MARKET_CAP
+    # figure = sm.graphics.plot_regress_exog(res, "log_MARKET_CAP")
+    # plt.show()
 
-    path_s_r_a_m9_dir = paths_sample_dirs[19]
+def _spec_curve_analysis(df: pd.DataFrame, sample_name: str, path_sample_regression_analyses_dir: str, path_models_file: str, workers: int, spec_curve_summaries: list, inference_settings: Optional[inference.InferenceSettings] = None):
+    import spec_curve
 
-    # Erstellt auf Basis der Regressionsgleichung einen Vektor, der die abhängige Variable enthält und eine Matrix, die das Interzept und die unabhängigen Variable enthält. 
-    y, X = patsy.dmatrices("log_PCT_EXT_TAGS ~ log_ALL_TAGS + log_MARKET_CAP + SECTOR + OLD_COMPANY + log_FREE_FLOAT + log_DEBT + log_ROA", data=df, return_type="dataframe")
+    try:
+        config = spec_curve.load_config(path_models_file)
+    except (OSError, ValueError) as err:
+        print("\nDie Spezifikationskurve konnte nicht aus der Datei \"{}\" gelesen werden: {}".format(path_models_file, err))
+        _exit_with_error()
 
-    _run_model(sample_name, "m9", y, X, path_s_r_a_m9_dir)
+    print("\nEs werden {} Spezifikationen geschätzt.".format(len(spec_curve.get_specifications(config))))
 
-    ###############
-    ### Model 10 ###
-    ###############
+    try:
+        df_results, summaries = spec_curve.run(df, config, sample_name, path_sample_regression_analyses_dir, spec_curve_summaries, workers, inference_settings)
+    except ValueError as err:
+        print("\n{}".format(err))
+        _exit_with_error()
 
-    path_s_r_a_m10_dir = paths_sample_dirs[20]
+    df_valid = df_results.dropna(subset=["COEF"])
 
-    # Erstellt auf Basis der Regressionsgleichung einen Vektor, der die abhängige Variable enthält und eine Matrix, die das Interzept und die unabhängigen Variable enthält. 
-    y, X = patsy.dmatrices("log_PCT_EXT_TAGS ~ log_ALL_TAGS + log_TOTAL_ASSETS + SECTOR + OLD_COMPANY + log_FREE_FLOAT + log_DEBT + log_ROA", data=df, return_type="dataframe")
+    print("\nKoeffizient {}: Median {:.4f}, Minimum {:.4f}, Maximum {:.4f}, signifikant (p < 0,05) in {} von {} Spezifikationen.".format(config.focal, df_valid["COEF"].median(), df_valid["COEF"].min(), df_valid["COEF"].max(), int((df_valid["P"] < 0.05).sum()), len(df_valid)))
 
-    _run_model(sample_name, "m10", y, X, path_s_r_a_m10_dir)
+    if len(df_valid) < len(df_results):
+        print("\n{} Spezifikationen konnten nicht geschätzt werden (Design-Matrix nicht vollrangig).".format(len(df_results) - len(df_valid)))
 
-    # Kontrolldiagramm: Teilregression PCT_EXT_TAGS ~ log_MARKET_CAP
-    # figure = sm.graphics.plot_regress_exog(res, "log_MARKET_CAP")
-    # plt.show()
+    print("\nErgebnisse gespeichert im Ordner \"{}/{}\".".format(path_sample_regression_analyses_dir, spec_curve.SPEC_CURVE_DIR_NAME))
 
-def _prepare_data(df: pd.DataFrame) -> pd.DataFrame:
-    # Entfernt alle Einträge, die leere Zellen enthalten.
-    # df = df.dropna()
-    df = df.dropna(subset=["COUNTRY", "SECTOR", "MARKET_CAP", "FREE_FLOAT", "AUDITOR", "FOUNDED", "TOTAL_ASSETS", "TOTAL_DEBT", "INCOME", "TOTAL_ASSETS_T-1"])
-
-    # Fügt eine neue Spalte hinzu, welche den log-Wert der Spalte MARKET_CAP enthält. Die Verteilung der Daten der Variable MARKET_CAP ist rechtsschief. Ich habe gelesen, dass die Logarithmesierung die Verteilung normalisieren kann.
-    df = df.assign(log_PCT_EXT_TAGS=pd.Series(np.log(df["PCT_EXT_TAGS"] + 1)).values)
-    df = df.assign(log_MARKET_CAP=pd.Series(np.log(df["MARKET_CAP"])).values)
-    df = df.assign(log_TOTAL_ASSETS=pd.Series(np.log(df["TOTAL_ASSETS"])).values)
-    df = df.assign(log_AUDITOR_FEES=pd.Series(np.log(df["AUDITOR_FEES"])).values)
-    df = df.assign(log_EMPLOYEES=pd.Series(np.log(df["EMPLOYEES"] + 1)).values)
-    df = df.assign(log_ALL_TAGS=pd.Series(np.log(df["ALL_TAGS"] + 1)).values)
-    df = df.assign(log_FREE_FLOAT=pd.Series(np.log(df["FREE_FLOAT"] + 1)).values)
-    df = df.assign(log_ANALYSTS_FOLLOWING=pd.Series(np.log(df["ANALYSTS_FOLLOWING"] + 1)).values)
-    
-    #df["log_PCT_EXT_TAGS"] = np.log(df["PCT_EXT_TAGS"] + 1)
-    #df["log_MARKET_CAP"] = np.log(df["MARKET_CAP"])
-    #df["log_TOTAL_ASSETS"] = np.log(df["TOTAL_ASSETS"])
-    #df["log_AUDITOR_FEES"] = np.log(df["AUDITOR_FEES"])
-    #df["log_EMPLOYEES"] = np.log(df["EMPLOYEES"] + 1)
-    #df["log_ALL_TAGS"] = np.log(df["ALL_TAGS"] + 1)
-    #df["log_FREE_FLOAT"] = np.log(df["FREE_FLOAT"] + 1)
-    #df["log_ANALYSTS_FOLLOWING"] = np.log(df["ANALYSTS_FOLLOWING"] + 1)
-
-    # Fügt eine neue Spalte hinzu, welche die Dummy-Variable "IS_FIN" darstellt. Für jeden Eintrag, der zu dem Sektor "Finance and Insurance" oder "Real Estate and Rental and Leasing" gehört, wird die Dummy-Variable auf "Wahr" gesetzt.
-    df = df.assign(IS_FIN=pd.Series(df["SECTOR"].isin(["Financials", "Real Estate"])).values)
-    #df["IS_FIN"] = (
-        #(df["SECTOR"] == "Financials")
-    #)
-
-    df = df.assign(OLD_COMPANY=pd.Series((2022 - df["FOUNDED"] > 10)).values)
-    #df["OLD_COMPANY"] = (
-        #(2022 - df["FOUNDED"] > 10)
-    #)
-
-    df = df.assign(ROA=pd.Series((df["INCOME"] / (0.5 * (df["TOTAL_ASSETS_T-1"] + df["TOTAL_ASSETS"])))).values)
-    #df["ROA"] = (
-        #df["INCOME"] / df["TOTAL_ASSETS_T-1"]
-    #)
-
-    df = df.assign(DEBT=pd.Series((df["TOTAL_DEBT"] / df["TOTAL_ASSETS"])).values)
-    #df["DEBT"] = (
-        #df["TOTAL_DEBT"] / df["TOTAL_ASSETS"]
-    #)
-
-    df = df.assign(log_ROA=pd.Series(np.log(df["ROA"] + 1)).values)
-    #df["log_ROA"] = np.log(df["ROA"] + 1)
-
-    df = df.assign(log_DEBT=pd.Series(np.log(df["DEBT"] + 1)).values)
-    #df["log_DEBT"] = np.log(df["DEBT"] + 1)
-
-    big4 = ["EY", "Deloitte", "PWC", "KPMG"]
-    column_auditor_agg = pd.Series(np.where(df["AUDITOR"].isin(big4), df["AUDITOR"], "Non Big-4"))
-    df = df.assign(AUDITOR_AGG=column_auditor_agg.values)
-
-    return df
+    # Ausgabe der ausgewählten Spezifikationen auf der Konsole
+    for summary in summaries:
+        print(summary)
 
 def _hist_exo_vars(df: pd.DataFrame):
+    import matplotlib.pyplot as plt
+
     # Kontrolldiagramm: Verteilung der Variable log_MARKET_CAP
     df.hist("log_MARKET_CAP", figsize=(8,5))
     plt.tight_layout()
@@ -560,39 +512,5 @@ def _hist_exo_vars(df: pd.DataFrame):
     plt.show()
 
 
-def _run_model(sample_name:str, model_name: str, y: pd.DataFrame, X: pd.DataFrame, dir: str):
-    # Hinterlegung von Dateipfaden zur Speicherung der abhängigen Variable, der unabhängigen Variablen und des Ergebnisses
-    path_s_r_a_pearson_file = dir + "/{}_{}_pearson.xlsx".format(model_name, sample_name)
-    path_s_r_a_model_file = dir + "/{}_{}_model.xlsx".format(model_name, sample_name)
-    path_s_r_a_summary_html_file = dir + "/{}_{}_summary.html".format(model_name, sample_name)
-    path_s_r_a_summary_text_file = dir + "/{}_{}_summary.txt".format(model_name, sample_name)
-
-    X.corr().to_excel(path_s_r_a_pearson_file, sheet_name="PEARSON_CORR")
-
-    # Speichert den Vektor und die Matrix jeweils in einer Excel-Datei.
-    with pd.ExcelWriter(path_s_r_a_model_file) as writer:
-        y.to_excel(writer, sheet_name="y")
-        X.to_excel(writer, sheet_name="X")
-
-    # Erzeugt ein OLS-Objekt.
-    mod = sm.OLS(y, X)
-
-    # Führt die Schätzung der Regressionsgeraden durch.
-    res = mod.fit()
-
-    # Speichert das Ergebnis der Regression in der Variable "summary"
-    summary = res.summary()
-
-    # Speicher das Ergebnis als HTML-Datei
-    with open(path_s_r_a_summary_html_file, "w") as file:
-        file.write(summary.as_html())
-
-    # Speicher das Ergebnis als Text-Datei
-    with open(path_s_r_a_summary_text_file, "w") as file:
-        file.write(summary.as_text())
-
-    # Ausgabe des Ergebnisses auf der Konsole
-    print(summary)
-
 if __name__ == "__main__":
     main()
\ No newline at end of file
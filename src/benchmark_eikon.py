@@ -0,0 +1,117 @@
+import argparse
+import contextlib
+import copy
+import hashlib
+import logging
+import os
+import tempfile
+import time
+
+import eikon_cache
+import eikon_client
+import eikon_database
+import eikon_standin
+
+# Benchmark für den Abruf der Unternehmensdaten (eikon_database) gegen den lokalen Stand-in der Eikon Data API (eikon_standin).
+# Gemessen werden die Anzahl der Anfragen, die Laufzeit und die Anzahl der Wiederholungen (Fehlerantworten) für N synthetische LEIs.
+#
+# Aufruf aus dem Stammverzeichnis, z.B.: python src/benchmark_eikon.py -n 200 --latency 0.05 --error-rate 0.02 -b 100 --eikon-workers 4
+
+# Abschlussstichtage der synthetischen Berichte (die meisten Berichte haben einen der wenigen üblichen Stichtage)
+PERIOD_ENDS = ("20211231", "20211231", "20211231", "20220331", "20210630", "20200930")
+
+def main():
+    logging.root.setLevel(100)
+
+    arg_parser = argparse.ArgumentParser(description="Benchmark für den Abruf der Unternehmensdaten gegen einen lokalen Stand-in der Eikon Data API.")
+    arg_parser.add_argument("-n", "--reports", type=int, default=100, help="Anzahl der synthetischen Berichte (LEIs). Standard: 100.")
+    arg_parser.add_argument("-b", "--eikon-batch-size", type=int, default=0, help="Paketgröße für den gebündelten Abruf (0: Abruf je Bericht). Standard: 0.")
+    arg_parser.add_argument("--eikon-workers", type=int, default=1, help="Anzahl der Threads für den Abruf. Standard: 1.")
+    arg_parser.add_argument("--latency", type=float, default=0.0, help="Antwortzeit des Stand-ins je Anfrage in Sekunden. Standard: 0.")
+    arg_parser.add_argument("--latency-per-instrument", type=float, default=0.0, help="Zusätzliche Antwortzeit je Instrument in Sekunden. Standard: 0.")
+    arg_parser.add_argument("--error-rate", type=float, default=0.0, help="Anteil der Anfragen, die mit einem EikonError beantwortet werden. Standard: 0.")
+    arg_parser.add_argument("--unknown-rate", type=float, default=0.0, help="Anteil der LEIs ohne ISIN. Standard: 0.")
+    arg_parser.add_argument("--rate", type=float, default=eikon_client.REQUESTS_PER_SECOND, help="Zugriffslimit (Anfragen je Sekunde) des Stand-ins und des Token-Buckets. Standard: 5.")
+    arg_parser.add_argument("--cache", action="store_true", help="Wenn die Option gesetzt ist, wird der Cache für Refinitiv Eikon verwendet und der Abruf ein zweites Mal (mit gefülltem Cache) gemessen.")
+    arg_parser.add_argument("--seed", type=int, default=0, help="Startwert für die synthetischen Daten und die Fehlerinjektion. Standard: 0.")
+
+    args = arg_parser.parse_args()
+
+    stand_in = eikon_standin.install(eikon_standin.EikonStandIn(
+        latency=args.latency,
+        latency_per_instrument=args.latency_per_instrument,
+        error_rate=args.error_rate,
+        requests_per_second=int(args.rate) if args.rate > 0 else None,
+        unknown_rate=args.unknown_rate,
+        seed=args.seed))
+
+    eikon_database.set_rate_limiter(eikon_client.TokenBucket(args.rate))
+    eikon_database.set_quota_ledger(None)
+
+    reports = create_reports(args.reports)
+
+    with tempfile.TemporaryDirectory() as path_tmp_dir:
+        cache = eikon_cache.EikonCache(eikon_cache.get_path_cache_file(path_tmp_dir)) if args.cache else None
+
+        eikon_database.set_cache(cache)
+
+        results = [("ohne Cache" if not args.cache else "Cache leer", run(stand_in, reports, args.eikon_batch_size, args.eikon_workers))]
+
+        if args.cache:
+            results.append(("Cache gefüllt", run(stand_in, reports, args.eikon_batch_size, args.eikon_workers)))
+
+            eikon_database.set_cache(None)
+            cache.close()
+
+    eikon_standin.uninstall()
+
+    print("\nBenchmark Unternehmensdaten: {} Bericht(e), Abruf {}, {} Thread(s), Latenz {} s, Fehlerquote {}, Zugriffslimit {}/s".format(
+        args.reports, "je Bericht" if args.eikon_batch_size <= 0 else "gebündelt ({} je Anfrage)".format(args.eikon_batch_size), args.eikon_workers, args.latency, args.error_rate, args.rate))
+
+    print("\n{:<16}{:>10}{:>14}{:>14}{:>18}{:>14}{:>12}".format("Lauf", "Anfragen", "Instrumente", "Wiederhol.", "davon Limit (429)", "vollständig", "Dauer (s)"))
+
+    for name, result in results:
+        print("{:<16}{:>10}{:>14}{:>14}{:>18}{:>14}{:>12.2f}".format(name, result["calls"], result["instruments"], result["errors"], result["rate_limit_errors"], result["complete"], result["duration"]))
+
+def create_reports(count: int) -> list:
+    # Synthetische Berichte mit den Feldern bis einschließlich der SHA1-Prüfsumme (INDEX_ISIN Felder), an die die Unternehmensdaten angehängt werden.
+    reports = []
+
+    for i in range(count):
+        lei = hashlib.sha1("LEI{}".format(i).encode("utf-8")).hexdigest()[:20].upper()
+
+        report = [""] * eikon_database.INDEX_ISIN
+        report[eikon_database.INDEX_ESEF_PACKAGE_NAME] = "{}-{}-ESEF-DE-0".format(lei, PERIOD_ENDS[i % len(PERIOD_ENDS)][:4])
+        report[eikon_database.INDEX_LEI] = lei
+        report[eikon_database.INDEX_PERIOD_END] = PERIOD_ENDS[i % len(PERIOD_ENDS)]
+
+        reports.append(report)
+
+    return reports
+
+def run(stand_in: eikon_standin.EikonStandIn, reports: list, eikon_batch_size: int, eikon_workers: int) -> dict:
+    reports = copy.deepcopy(reports)
+    statistics = stand_in.statistics()
+
+    # Die Ausgaben des Abrufs werden während der Messung unterdrückt.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.time()
+
+        if eikon_batch_size > 0:
+            eikon_database.get_company_data_batched(reports, eikon_batch_size, eikon_workers)
+        else:
+            eikon_database.get_company_data(reports, eikon_workers)
+
+        duration = time.time() - start
+
+    result = {key: value - statistics[key] for key, value in stand_in.statistics().items()}
+    result["duration"] = duration
+    result["complete"] = sum(1 for report in reports if all(_has_value(value) for value in report[eikon_database.INDEX_ISIN:]))
+
+    return result
+
+def _has_value(value) -> bool:
+    return value is not None and str(value) not in ("", "<NA>", "nan")
+
+if __name__ == "__main__":
+    main()
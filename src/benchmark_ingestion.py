@@ -0,0 +1,204 @@
+import argparse
+import contextlib
+import functools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional
+
+try:
+    import resource
+except ImportError:
+    # Unter Windows steht das Modul resource nicht zur Verfügung. Der maximale Speicherbedarf wird dann nicht ermittelt.
+    resource = None
+
+import pandas as pd
+
+import esef_archive
+import esef_package_generator
+import reporting
+import tag_store
+
+# Benchmark für das Einlesen der ESEF-Pakete (reporting.load_reports) anhand synthetischer Pakete (esef_package_generator).
+# Je Stufe werden Pakete/s, Fakten/s und der maximale Speicherbedarf (Peak RSS) gemessen. Jede Stufe wird in einem eigenen Prozess ausgeführt,
+# damit sich der Speicherbedarf der Stufen nicht gegenseitig beeinflusst. Die Ergebnisse werden je Lauf als JSON-Zeile (inkl. Commit) an die
+# Ergebnisdatei angehängt, sodass Läufe über mehrere Commits hinweg verglichen werden können.
+#
+# Aufruf aus dem Stammverzeichnis, z.B.: python src/benchmark_ingestion.py -n 20 --facts 2000 --extension-share 0.1 -w 4
+
+PATH_RESULTS_FILE = "./benchmark_ingestion.jsonl"
+
+STAGE_DISCOVER = "discover"
+STAGE_PARSE = "parse"
+STAGE_LOAD_REPORTS = "load_reports"
+STAGES = (STAGE_DISCOVER, STAGE_PARSE, STAGE_LOAD_REPORTS)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark für das Einlesen von ESEF-Paketen anhand synthetischer Pakete.")
+    arg_parser.add_argument("-n", "--packages", type=int, default=10, help="Anzahl der synthetischen ESEF-Pakete. Standard: 10.")
+    arg_parser.add_argument("--facts", type=int, default=1000, help="Anzahl der Fakten je Bericht. Standard: 1000.")
+    arg_parser.add_argument("--extension-share", type=float, default=0.1, help="Anteil der Fakten mit Elementen der Erweiterungstaxonomie. Standard: 0.1.")
+    arg_parser.add_argument("--text-block-share", type=float, default=0.05, help="Anteil der Fakten, die Textblöcke sind. Standard: 0.05.")
+    arg_parser.add_argument("--text-block-bytes", type=int, default=2000, help="Größe eines Textblocks in Bytes. Standard: 2000.")
+    arg_parser.add_argument("-e", "--engines", nargs="+", choices=reporting.ENGINES, default=list(reporting.ENGINES), help="Engines, mit denen die Pakete gelesen werden. Standard: alle.")
+    arg_parser.add_argument("-w", "--workers", type=int, default=1, help="Anzahl der Worker-Prozesse für load_reports. Standard: 1.")
+    arg_parser.add_argument("-s", "--stages", nargs="+", choices=STAGES, default=list(STAGES), help="Zu messende Stufen. Standard: alle.")
+    arg_parser.add_argument("--max-packages-per-worker", type=int, default=0, help="Erneuerung der Worker-Prozesse nach N Paketen je Worker für load_reports (0: deaktiviert). Standard: 0.")
+    arg_parser.add_argument("--max-worker-rss-mb", type=int, default=0, help="Erneuerung der Worker-Prozesse ab diesem Arbeitsspeicher (RSS) je Worker für load_reports (0: deaktiviert). Standard: 0.")
+    arg_parser.add_argument("--tag-values", choices=tag_store.VALUES_MODES, default=tag_store.VALUES_TEXT, help="Speicherung der Werte der Tags. Standard: text.")
+    arg_parser.add_argument("-o", "--output", default=PATH_RESULTS_FILE, help="Datei, an die die Ergebnisse als JSON-Zeile angehängt werden. Standard: {}.".format(PATH_RESULTS_FILE))
+    arg_parser.add_argument("--seed", type=int, default=0, help="Startwert für die synthetischen Pakete. Standard: 0.")
+    arg_parser.add_argument("--zip", action="store_true", help="Wenn die Option gesetzt ist, werden die synthetischen Pakete als ZIP-Archiv abgelegt und ohne Entpacken gelesen.")
+
+    args = arg_parser.parse_args()
+
+    parameters = {
+        "packages": args.packages,
+        "facts": args.facts,
+        "extension_share": args.extension_share,
+        "text_block_share": args.text_block_share,
+        "text_block_bytes": args.text_block_bytes,
+        "workers": args.workers,
+        "tag_values": args.tag_values,
+        "max_packages_per_worker": args.max_packages_per_worker,
+        "max_worker_rss_mb": args.max_worker_rss_mb,
+        "seed": args.seed,
+        "zip": args.zip,
+    }
+
+    results = []
+
+    with tempfile.TemporaryDirectory() as path_tmp_dir:
+        path_packages_dir = os.path.join(path_tmp_dir, "packages")
+        os.mkdir(path_packages_dir)
+
+        start = time.time()
+
+        packages = [esef_package_generator.generate_package(path_packages_dir, i, args.facts, args.extension_share, args.text_block_share, args.text_block_bytes, seed=args.seed, archive=args.zip) for i in range(args.packages)]
+
+        print("\n{} synthetische ESEF-Pakete ({:.1f} MB, {} Fakten je Bericht) in {:.2f} s erzeugt.".format(len(packages), sum(package.size_bytes for package in packages) / 1024 / 1024, args.facts, time.time() - start))
+
+        count_facts = sum(package.facts for package in packages)
+        paths = [package.path for package in packages]
+
+        if STAGE_DISCOVER in args.stages:
+            results.append(_run_stage(STAGE_DISCOVER, None, len(paths), count_facts, _stage_discover, paths))
+
+        if STAGE_PARSE in args.stages:
+            for engine in args.engines:
+                results.append(_run_stage(STAGE_PARSE, engine, len(paths), count_facts, _stage_parse, paths, engine, args.tag_values, path_tmp_dir))
+
+        if STAGE_LOAD_REPORTS in args.stages:
+            for engine in args.engines:
+                results.append(_run_stage(STAGE_LOAD_REPORTS, engine, len(paths), count_facts, _stage_load_reports, paths, engine, args.workers, args.tag_values, args.max_packages_per_worker, args.max_worker_rss_mb, path_tmp_dir))
+
+    run = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "stages": results,
+    }
+
+    with open(args.output, "a", encoding="utf-8") as file:
+        file.write(json.dumps(run) + "\n")
+
+    print("\n" + pd.DataFrame(results).to_string(index=False))
+    print("\nErgebnisse angehängt an \"{}\".".format(args.output))
+
+def _run_stage(stage: str, engine: Optional[str], count_packages: int, count_facts: int, function, *args) -> dict:
+    # Jede Stufe wird in einem neuen Prozess ausgeführt, damit der maximale Speicherbedarf (Peak RSS) je Stufe ermittelt werden kann.
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        duration, count_loaded, peak_rss_mb = executor.submit(_measure, function, *args).result()
+
+    print("\nStufe \"{}\"{}: {:.2f} s".format(stage, " ({})".format(engine) if engine else "", duration))
+
+    return {
+        "stage": stage,
+        "engine": engine,
+        "packages": count_packages,
+        "loaded": count_loaded,
+        "facts": count_facts,
+        "duration_s": round(duration, 4),
+        "packages_per_s": round(count_packages / duration, 2) if duration > 0 else None,
+        "facts_per_s": round(count_facts / duration, 1) if duration > 0 else None,
+        "peak_rss_mb": peak_rss_mb,
+    }
+
+def _measure(function, *args):
+    start = time.time()
+
+    # Die Ausgaben der Verarbeitung (und von Arelle) werden während der Messung unterdrückt.
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        count_loaded = function(*args)
+
+    return time.time() - start, count_loaded, _get_peak_rss_mb()
+
+def _get_peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+
+    # Maximum aus dem eigenen Prozess und den (beendeten) Worker-Prozessen. ru_maxrss ist unter Linux in KB, unter macOS in Bytes angegeben.
+    peak_rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+    return round(peak_rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def _stage_discover(paths: List[str]) -> int:
+    # Suche nach den Dateien und Berechnung der Prüfsumme wie in reporting.load_reports (ohne Manifest)
+    with ThreadPoolExecutor() as executor:
+        discovered_esef_packages = list(executor.map(functools.partial(reporting._discover_esef_package, {}), paths))
+
+    return sum(1 for discovered_esef_package in discovered_esef_packages if discovered_esef_package[2])
+
+def _stage_parse(paths: List[str], engine: str, tag_values_mode: str, path_tmp_dir: str) -> int:
+    # Lesen der Tags und Speichern der Berichte im aktuellen Prozess (ohne Prüfung auf Duplikate und ohne Verschieben der Pakete)
+    path_reports_dir = tempfile.mkdtemp(dir=path_tmp_dir)
+
+    reporting._init_worker(tag_values_mode)
+
+    count_loaded = 0
+
+    for path in paths:
+        url_report_file, url_taxonomy_package_file, *x = reporting._discover_esef_package({}, path)
+
+        report, err, parity_differences, metric_events = reporting._parse_esef_package(esef_archive.get_package_name(os.path.basename(path)), url_report_file, url_taxonomy_package_file, path_reports_dir, engine, False)
+
+        if err is None and report:
+            count_loaded += 1
+
+    return count_loaded
+
+def _stage_load_reports(paths: List[str], engine: str, workers: int, tag_values_mode: str, max_packages_per_worker: int, max_worker_rss_mb: int, path_tmp_dir: str) -> int:
+    # Vollständiger Durchlauf von reporting.load_reports. Da die Pakete nach dem Laden verschoben werden, wird mit einer Kopie gearbeitet.
+    path_import_dir = tempfile.mkdtemp(dir=path_tmp_dir)
+    path_esef_packages_dir = tempfile.mkdtemp(dir=path_tmp_dir)
+    path_reports_dir = tempfile.mkdtemp(dir=path_tmp_dir)
+
+    for path in paths:
+        if esef_archive.is_archive(path):
+            shutil.copy2(path, path_import_dir)
+        else:
+            shutil.copytree(path, os.path.join(path_import_dir, os.path.basename(path)))
+
+    reporting.PATH_IMPORT_DIR = path_import_dir
+
+    reports = reporting.load_reports(pd.Series([], dtype=object), path_esef_packages_dir, path_reports_dir, workers, engine, tag_values_mode=tag_values_mode, max_packages_per_worker=max_packages_per_worker, max_worker_rss_mb=max_worker_rss_mb)
+
+    return len(reports)
+
+def _get_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+if __name__ == "__main__":
+    main()
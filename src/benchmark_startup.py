@@ -0,0 +1,213 @@
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+import sample_store
+
+# Benchmark für den Programmstart (__main__). Je Modus wird das Programm mit "python -X importtime" für ein leeres Sample in einem temporären
+# Verzeichnis aufgerufen, sodass es unmittelbar nach dem Aufbau der Kommandozeile und dem Lesen des Datenspeichers endet. Gemessen werden die
+# Laufzeit des Aufrufs sowie die Summe der Importzeiten. Der Benchmark schlägt fehl (Exit-Code 1), wenn die Importzeit eines Modus das Budget
+# überschreitet oder ein Modul mit langsamem Import (Arelle, Refinitiv Eikon, statsmodels, SciPy, matplotlib, ...) vor Beginn der eigentlichen
+# Verarbeitung importiert wird. Die Ergebnisse werden je Lauf als JSON-Zeile (inkl. Commit) an die Ergebnisdatei angehängt.
+#
+# Der Modus "export-sample" verwendet statt des leeren Samples ein Sample mit --sample-reports synthetischen Berichten im Datenspeicher. Gemessen
+# wird damit auch das Lesen eines gefüllten Datenspeichers und der Export nach Excel.
+#
+# Die Modi --append und --update werden nicht gemessen, da sie vor der Prüfung des Samples eine Verbindung zu Refinitiv Eikon herstellen.
+#
+# Aufruf aus dem Stammverzeichnis, z.B.: python src/benchmark_startup.py -n 5 --budget-ms 800
+
+PATH_RESULTS_FILE = "./benchmark_startup.jsonl"
+PATH_MAIN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__main__.py")
+
+SAMPLE_NAME = "benchmark_startup"
+FILLED_SAMPLE_NAME = "benchmark_startup_filled"
+
+# Argumente je Modus (ohne den Namen des Samples)
+MODES = {
+    "help": ["--help"],
+    "export": ["-x"],
+    "analyze": ["-an"],
+    "regression": ["-r"],
+    "export-sample": ["-x"],
+}
+
+# Modi, die mit dem gefüllten Sample gemessen werden
+FILLED_SAMPLE_MODES = ("export-sample", )
+
+DEFAULT_SAMPLE_REPORTS = 1000
+
+COUNTRIES = ("DE", "FR", "IT", "ES", "NL", "AT", "BE", "FI", "SE", "DK")
+SECTORS = ("Industrials", "Financials", "Technology", "Consumer Cyclicals", "Healthcare", "Utilities", "Basic Materials")
+AUDITORS = ("KPMG", "PwC", "EY", "Deloitte", "BDO", "Mazars", "Grant Thornton")
+
+DEFAULT_BUDGET_MS = 1000
+
+FORBIDDEN_MODULES = ["arelle", "eikon", "statsmodels", "patsy", "scipy", "sklearn", "matplotlib", "yaml"]
+
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark für den Programmstart (Importzeiten je Modus).")
+    arg_parser.add_argument("-m", "--modes", nargs="+", choices=list(MODES), default=list(MODES), help="Zu messende Modi. Standard: alle.")
+    arg_parser.add_argument("-n", "--repetitions", type=int, default=3, help="Anzahl der Aufrufe je Modus. Verwendet wird der schnellste Aufruf. Standard: 3.")
+    arg_parser.add_argument("--sample-reports", type=int, default=DEFAULT_SAMPLE_REPORTS, metavar="N", help="Anzahl der Berichte im gefüllten Sample (Modus export-sample). Standard: {}.".format(DEFAULT_SAMPLE_REPORTS))
+    arg_parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Maximale Summe der Importzeiten je Modus (ms). Standard: {}.".format(DEFAULT_BUDGET_MS))
+    arg_parser.add_argument("--forbidden", nargs="*", default=FORBIDDEN_MODULES, metavar="MODULE", help="Pakete, die beim Programmstart nicht importiert werden dürfen. Standard: {}.".format(" ".join(FORBIDDEN_MODULES)))
+    arg_parser.add_argument("-o", "--output", default=PATH_RESULTS_FILE, help="Datei, an die die Ergebnisse als JSON-Zeile angehängt werden. Standard: {}.".format(PATH_RESULTS_FILE))
+
+    args = arg_parser.parse_args()
+
+    if args.repetitions < 1:
+        arg_parser.error("Die Anzahl der Aufrufe muss mindestens 1 betragen.")
+
+    if args.sample_reports < 1:
+        arg_parser.error("Das gefüllte Sample muss mindestens einen Bericht enthalten.")
+
+    results = []
+
+    with tempfile.TemporaryDirectory() as path_tmp_dir:
+        # Das Programm erwartet den Ordner "samples" im Arbeitsverzeichnis.
+        os.mkdir(os.path.join(path_tmp_dir, "samples"))
+
+        if any(mode in FILLED_SAMPLE_MODES for mode in args.modes):
+            _create_filled_sample(path_tmp_dir, args.sample_reports)
+
+        for mode in args.modes:
+            sample_name = FILLED_SAMPLE_NAME if mode in FILLED_SAMPLE_MODES else SAMPLE_NAME
+
+            measurements = [_measure(sample_name, MODES[mode], path_tmp_dir) for i in range(args.repetitions)]
+
+            duration, import_time_ms, modules = min(measurements, key=lambda measurement: measurement[0])
+
+            forbidden = sorted(module for module in modules if module.split(".")[0] in args.forbidden)
+            slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:5]
+
+            results.append({
+                "mode": mode,
+                "duration_ms": round(duration * 1000, 1),
+                "import_time_ms": round(import_time_ms, 1),
+                "modules": len(modules),
+                "slowest": ["{} ({:.0f} ms)".format(module, cumulative_ms) for module, cumulative_ms in slowest],
+                "forbidden": forbidden,
+                "within_budget": import_time_ms <= args.budget_ms and not forbidden,
+            })
+
+    run = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {"repetitions": args.repetitions, "sample_reports": args.sample_reports, "budget_ms": args.budget_ms, "forbidden": args.forbidden},
+        "modes": results,
+    }
+
+    with open(args.output, "a", encoding="utf-8") as file:
+        file.write(json.dumps(run) + "\n")
+
+    for result in results:
+        print("\nModus \"{}\": {:.0f} ms (Importe: {:.0f} ms, {} Module)".format(result["mode"], result["duration_ms"], result["import_time_ms"], result["modules"]))
+        print("Langsamste Importe: {}".format(", ".join(result["slowest"])))
+
+        if result["forbidden"]:
+            print("Unzulässige Importe: {}".format(", ".join(result["forbidden"])))
+
+    print("\nErgebnisse angehängt an \"{}\".".format(args.output))
+
+    failed = [result["mode"] for result in results if not result["within_budget"]]
+
+    if failed:
+        print("\nBudget von {:.0f} ms bzw. unzulässige Importe in Modus/Modi: {}\n".format(args.budget_ms, ", ".join(failed)))
+        sys.exit(1)
+
+    print("")
+
+def _create_filled_sample(path_tmp_dir: str, reports: int):
+    # Legt den Datenspeicher des gefüllten Samples mit synthetischen Berichten an (Ordnerstruktur wie __main__.get_paths_sample_dirs).
+    path_sample_data_dir = os.path.join(path_tmp_dir, "samples", FILLED_SAMPLE_NAME, "data")
+
+    os.makedirs(path_sample_data_dir)
+
+    rng = np.random.default_rng(0)
+
+    leis = ["{:020X}".format(i) for i in range(reports)]
+    all_tags = rng.integers(200, 5000, size=reports)
+    ext_tags = (all_tags * rng.uniform(0, 0.3, size=reports)).astype(int)
+    total_assets = rng.lognormal(20, 2, size=reports)
+
+    df = pd.DataFrame({
+        "ESEF_PACKAGE_NAME": ["{}-2021-12-31-DE".format(lei) for lei in leis],
+        "LEI": leis,
+        "PERIOD_END": "20211231",
+        "ALL_TAGS": all_tags,
+        "PCT_ALL_TAGS": 100.0,
+        "ESEF_TAGS": all_tags - ext_tags,
+        "PCT_ESEF_TAGS": (all_tags - ext_tags) / all_tags * 100,
+        "EXT_TAGS": ext_tags,
+        "PCT_EXT_TAGS": ext_tags / all_tags * 100,
+        "SHA1": ["{:040x}".format(i) for i in range(reports)],
+        "ISIN": ["DE{:010d}".format(i) for i in range(reports)],
+        "COMPANY": ["Company {}".format(i) for i in range(reports)],
+        "SECTOR": rng.choice(SECTORS, size=reports),
+        "COUNTRY": rng.choice(COUNTRIES, size=reports),
+        "MARKET_CAP": rng.lognormal(19, 2, size=reports),
+        "FREE_FLOAT": rng.uniform(0, 100, size=reports),
+        "AUDITOR": rng.choice(AUDITORS, size=reports),
+        "AUDITOR_FEES": rng.lognormal(13, 1, size=reports),
+        "EMPLOYEES": rng.integers(10, 100000, size=reports).astype(float),
+        "FOUNDED": rng.integers(1850, 2020, size=reports).astype(float),
+        "ANALYSTS_FOLLOWING": rng.integers(0, 30, size=reports).astype(float),
+        "TOTAL_ASSETS": total_assets,
+        "TOTAL_DEBT": total_assets * rng.uniform(0, 0.6, size=reports),
+        "INCOME": total_assets * rng.normal(0.03, 0.05, size=reports),
+        "TOTAL_ASSETS_T-1": total_assets * rng.uniform(0.8, 1.2, size=reports),
+    })
+
+    sample_store.append(sample_store.get_path_sample_store_file(path_sample_data_dir, FILLED_SAMPLE_NAME), df)
+
+def _measure(sample_name: str, arguments: List[str], path_tmp_dir: str) -> Tuple[float, float, Dict[str, float]]:
+    # Liefert die Laufzeit (s), die Summe der Importzeiten (ms) und die kumulierte Importzeit (ms) je Paket der obersten Ebene.
+    start = time.time()
+
+    process = subprocess.run([sys.executable, "-X", "importtime", PATH_MAIN_FILE, sample_name] + arguments, cwd=path_tmp_dir, capture_output=True, text=True)
+
+    duration = time.time() - start
+
+    import_time_us = 0
+    modules = {}
+
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+
+        if match is None:
+            continue
+
+        self_us, cumulative_us, indent, module = match.groups()
+
+        import_time_us += int(self_us)
+
+        # Die Einrückung (zwei Leerzeichen je Ebene) gibt die Verschachtelung der Importe an. Für direkt importierte Module wird die kumulierte
+        # Zeit erfasst, für alle übrigen nur der Name.
+        modules[module] = int(cumulative_us) / 1000 if len(indent) <= 3 else modules.get(module, 0.0)
+
+    return duration, import_time_us / 1000, modules
+
+def _get_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Tuple
+
+import pandas as pd
+
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import result_cache
+
+# Erstellung der Balkendiagramme der deskriptiven Analyse. Die Diagramme werden als Liste von Spezifikationen (Dimension, Kennzahl, Beschriftung)
+# zusammen mit den dargestellten Werten übergeben und (ggf. parallel) in Worker-Prozessen ohne pyplot mit dem nicht-interaktiven Agg-Backend
+# erzeugt. Je Diagramm wird eine Prüfsumme der dargestellten Werte und der Beschriftung gespeichert. Diagramme, deren Prüfsumme unverändert ist und
+# deren Datei existiert, werden nicht erneut erstellt.
+
+CACHE_FILE_NAME = "charts_cache.json"
+
+# Bei Änderungen an der Darstellung ist die Version zu erhöhen, damit alle Diagramme erneut erstellt werden.
+CHARTS_VERSION = 1
+
+class ChartSpec(NamedTuple):
+    path: str
+    dimension: str
+    metric: str
+    xlabel: str
+    ylabel: str
+    # Sortierung der Balken absteigend nach Wert (sonst nach Ausprägung der Dimension)
+    sort_values: bool = False
+    # Kleine, gedrehte Beschriftung der Ausprägungen (für lange Bezeichnungen)
+    small_ticks: bool = True
+
+def render(aggregates: Dict[Tuple[str, str], pd.Series], specs: List[ChartSpec], path_cache_dir: str, workers: int = 1) -> Tuple[int, int]:
+    # Die dargestellten Werte je Dimension und Kennzahl werden übergeben (descriptive_stats). Liefert die Anzahl der erstellten und der
+    # übersprungenen Diagramme.
+    path_cache_file = "{}/{}".format(path_cache_dir, CACHE_FILE_NAME)
+
+    cache = result_cache.load(path_cache_file)
+
+    jobs = []
+
+    for spec in specs:
+        values = aggregates[(spec.dimension, spec.metric)]
+
+        if spec.sort_values:
+            values = values.sort_values(ascending=False)
+
+        key = _chart_key(spec, values)
+
+        if cache.get(spec.path) == key and os.path.exists(spec.path):
+            continue
+
+        jobs.append((spec, values, key))
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_init_worker) as executor:
+            list(executor.map(_render_chart, [spec for spec, values, key in jobs], [values for spec, values, key in jobs]))
+    else:
+        for spec, values, key in jobs:
+            _render_chart(spec, values)
+
+    for spec, values, key in jobs:
+        cache[spec.path] = key
+
+    result_cache.save(path_cache_file, cache)
+
+    return len(jobs), len(specs) - len(jobs)
+
+def _init_worker():
+    matplotlib.use("Agg")
+
+def _render_chart(spec: ChartSpec, values: pd.Series):
+    # Eigene Figure mit Agg-Canvas je Diagramm, ohne den globalen Zustand von pyplot
+    fig = Figure()
+    FigureCanvasAgg(fig)
+
+    ax = fig.add_subplot()
+
+    values.plot.bar(ax=ax, xlabel=spec.xlabel, ylabel=spec.ylabel)
+
+    if spec.small_ticks:
+        for label in ax.get_xticklabels():
+            label.set_fontsize(6)
+            label.set_rotation(20)
+            label.set_horizontalalignment("right")
+
+    fig.tight_layout()
+    fig.savefig(spec.path)
+
+def _chart_key(spec: ChartSpec, values: pd.Series) -> str:
+    sha1 = hashlib.sha1("{}|{}|{}|{}".format(CHARTS_VERSION, matplotlib.__version__, tuple(spec), list(map(str, values.index))).encode("utf-8"))
+
+    sha1.update(values.to_numpy(dtype="float64").tobytes())
+
+    return sha1.hexdigest()
@@ -0,0 +1,17 @@
+# Standardwerte und Auswahlmöglichkeiten, die bereits beim Aufbau der Kommandozeile (__main__) benötigt werden. Die Module, in denen sie verwendet
+# werden (reporting, regression_models, inference), importieren Arelle, statsmodels bzw. SciPy und werden daher erst in dem Modus
+# importiert, der sie benötigt. Dieses Modul darf nur Module der Standardbibliothek importieren.
+
+# Engines zum Lesen der Tags (reporting)
+ENGINE_ARELLE = "arelle"
+ENGINE_STREAM = "stream"
+ENGINES = (ENGINE_ARELLE, ENGINE_STREAM)
+
+# Datei mit den Modellen der Regressionsanalyse (regression_models, spec_curve)
+PATH_MODELS_FILE = "./models.yml"
+
+# Startwert für die Bootstrap-Stichproben (inference)
+BOOTSTRAP_SEED = 0
+
+# Maximale Anzahl gelesener Berichte, die beim Abruf der Unternehmensdaten parallel zum Lesen (--pipeline) auf den Abruf warten (eikon_database)
+PIPELINE_QUEUE_SIZE = 100
@@ -0,0 +1,142 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import features
+
+# Gruppierte Kennzahlen der deskriptiven Analyse. Je Dimension werden die Gruppen einmalig als Codes ermittelt. Für jede Kennzahl werden die
+# Werte einmal nach Gruppe und Wert sortiert, sodass alle Statistiken (count/mean/std/min/Quartile/max wie bei pandas describe) in einem Durchlauf
+# über die sortierten Werte folgen. Alle Tabellen und Diagramme der deskriptiven Analyse werden aus diesem Ergebnis erstellt.
+#
+# Eine weitere Dimension wird durch einen zusätzlichen Eintrag in DIMENSIONS ergänzt.
+
+METRICS = ["ALL_TAGS", "PCT_EXT_TAGS"]
+
+STATISTICS = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+QUANTILES = [0.25, 0.5, 0.75]
+
+METRIC_LABELS = {
+    "ALL_TAGS": "Ø Anzahl verwendeter Tags",
+    "PCT_EXT_TAGS": "Ø Anteil an ETEs (%)",
+}
+
+class Dimension(NamedTuple):
+    # Name der Gruppierung (Spaltenname in den Tabellen)
+    name: str
+    # Spalte des Samples, aus der die Gruppen gebildet werden
+    column: str
+    # Unterordner des Ordners "descriptive_analyses" und Präfix der Dateien
+    dir: str
+    prefix: str
+    xlabel: str
+    # Einteilung in Klassen gleicher Größe (Quantile) statt der Ausprägungen der Spalte
+    quantiles: Optional[int] = None
+    # Nur diese Ausprägungen werden übernommen, alle übrigen werden unter "other" zusammengefasst.
+    keep: Optional[List[str]] = None
+    other: str = ""
+    # Zusatz für Tabellenblätter und Diagramme weiterer Dimensionen in derselben Arbeitsmappe
+    suffix: str = ""
+    sort_by_mean: bool = False
+    small_ticks: bool = True
+    # Speichert das Sample inkl. der Klassen als Excel-Datei.
+    export_data: bool = False
+
+DIMENSIONS = [
+    Dimension("COUNTRY", "COUNTRY", "country_analysis", "ca", "Land", small_ticks=False),
+    Dimension("SECTOR", "SECTOR", "sector_analysis", "sa", "Sektor (TRBC)", sort_by_mean=True),
+    Dimension("MARKET_CAP_CAT", "MARKET_CAP", "market_cap_analysis", "mca", "Marktkapitalisierung zum Abschlussstichtag (Mio. EUR)", quantiles=5, export_data=True),
+    Dimension("FREE_FLOAT_CAT", "FREE_FLOAT", "free_float_analysis", "ffa", "Streubesitz zum Abschlussstichtag (%)", quantiles=5, export_data=True),
+    Dimension("AUDITOR", "AUDITOR", "auditor_analysis", "aa", "Abschlussprüfer"),
+    Dimension("AUDITOR_AGG", "AUDITOR", "auditor_analysis", "aa", "Abschlussprüfer", keep=features.BIG4, other="Non Big-4", suffix="_alt1"),
+]
+
+def derive(df: pd.DataFrame, dimension: Dimension) -> pd.Series:
+    # Gruppierungsmerkmal je Eintrag des Samples
+    values = df[dimension.column]
+
+    if dimension.quantiles is not None:
+        values = pd.qcut(values, dimension.quantiles)
+    elif dimension.keep is not None:
+        values = pd.Series(np.where(values.isin(dimension.keep), values.astype(object), dimension.other), index=df.index)
+
+    return values.rename(dimension.name)
+
+def factorize(groups: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    # Codes der Gruppen in der Reihenfolge von groupby (Kategorien bzw. sortierte Werte, ohne leere Kategorien und fehlende Werte)
+    if isinstance(groups.dtype, pd.CategoricalDtype):
+        codes = groups.cat.codes.to_numpy()
+        observed = np.unique(codes[codes >= 0])
+
+        remap = np.full(len(groups.cat.categories), -1)
+        remap[observed] = np.arange(len(observed))
+
+        return np.where(codes >= 0, remap[codes], -1), pd.Index(groups.cat.categories[observed], name=groups.name)
+
+    codes, uniques = pd.factorize(groups, sort=True)
+
+    return codes, pd.Index(uniques, name=groups.name)
+
+def describe(codes: np.ndarray, count_groups: int, values: np.ndarray) -> np.ndarray:
+    # Statistiken je Gruppe (count_groups x STATISTICS). Fehlende Werte werden wie bei pandas nicht berücksichtigt.
+    valid = (codes >= 0) & ~np.isnan(values)
+
+    codes = codes[valid]
+    values = values[valid]
+
+    # Sortierung nach Gruppe und innerhalb der Gruppe nach Wert
+    order = np.lexsort((values, codes))
+    sorted_values = values[order]
+
+    counts = np.bincount(codes, minlength=count_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.bincount(codes, weights=values, minlength=count_groups) / counts
+        stds = np.sqrt(np.bincount(codes, weights=(values - means[codes]) ** 2, minlength=count_groups) / (counts - 1))
+
+    stds[counts < 2] = np.nan
+
+    result = np.full((count_groups, len(STATISTICS)), np.nan)
+    result[:, 0] = counts
+    result[:, 1] = means
+    result[:, 2] = stds
+
+    non_empty = counts > 0
+
+    if non_empty.any():
+        first = starts[non_empty]
+        last = first + counts[non_empty] - 1
+
+        result[non_empty, 3] = sorted_values[first]
+        result[non_empty, 7] = sorted_values[last]
+
+        # Quantile mit linearer Interpolation zwischen den benachbarten Werten
+        for j, q in enumerate(QUANTILES):
+            position = q * (counts[non_empty] - 1)
+            lower = np.floor(position).astype(np.int64)
+            upper = np.ceil(position).astype(np.int64)
+
+            result[non_empty, 4 + j] = sorted_values[first + lower] + (sorted_values[first + upper] - sorted_values[first + lower]) * (position - lower)
+
+    return result
+
+def compute(df: pd.DataFrame, dimensions: List[Dimension] = DIMENSIONS, metrics: List[str] = METRICS) -> Tuple[Dict[Tuple[str, str], pd.DataFrame], Dict[str, pd.Series]]:
+    # Liefert je Dimension und Kennzahl die Statistiken (wie groupby(...).describe()) sowie je Dimension das Gruppierungsmerkmal.
+    metric_values = {metric: df[metric].to_numpy(dtype=np.float64) for metric in metrics}
+
+    stats = {}
+    groups = {}
+
+    for dimension in dimensions:
+        groups[dimension.name] = derive(df, dimension)
+
+        codes, index = factorize(groups[dimension.name])
+
+        for metric in metrics:
+            stats[(dimension.name, metric)] = pd.DataFrame(describe(codes, len(index), metric_values[metric]), index=index, columns=STATISTICS)
+
+    return stats, groups
+
+def means(stats: Dict[Tuple[str, str], pd.DataFrame]) -> Dict[Tuple[str, str], pd.Series]:
+    return {key: df_stats["mean"].rename(key[1]) for key, df_stats in stats.items()}
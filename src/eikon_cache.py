@@ -0,0 +1,132 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Persistenter Cache (SQLite) für die Antworten von Refinitiv Eikon. Jeder Wert wird über das Instrument, das Datenfeld (inkl. seiner Parameter)
+# und die Parameter der Abfrage (z.B. SDate) adressiert. Über eine feldabhängige Gültigkeitsdauer (TTL) wird festgelegt, wann ein Wert erneut
+# abgerufen werden muss. Historische Werte zu einem Stichtag (SDate) sowie unveränderliche Angaben (ISIN, Gründungsjahr) verfallen nicht.
+
+CACHE_FILE_NAME = "eikon_cache.sqlite"
+
+TABLE_NAME = "responses"
+
+# Gültigkeitsdauer in Tagen je Datenfeld. None bedeutet, dass der Wert nicht verfällt.
+FIELD_TTL_DAYS = {
+    "TR.ISIN": None,
+    "TR.OrgFoundedYear": None,
+    "TR.CommonName": 30,
+    "TR.TRBCEconomicSector": 30,
+    "TR.ExchangeCountry": 30,
+    "TR.NumberOfAnalysts": 30,
+    "TR.CompanyNumEmploy": 30,
+}
+
+# Gültigkeitsdauer für Datenfelder ohne eigene Angabe, die ohne Stichtag abgefragt werden
+DEFAULT_TTL_DAYS = 30
+
+# Platzhalter für einen nicht (mehr gültig) im Cache enthaltenen Wert
+MISSING = object()
+
+def get_path_cache_file(path_sample_dir: str) -> str:
+    return "{}/{}".format(path_sample_dir, CACHE_FILE_NAME)
+
+class EikonCache:
+    def __init__(self, path_cache_file: str):
+        self.path_cache_file = path_cache_file
+        self.hits = 0
+        self.misses = 0
+
+        # Der Zugriff kann aus mehreren Threads erfolgen (siehe gebündelter bzw. nebenläufiger Abruf).
+        self._connection = sqlite3.connect(path_cache_file, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS {} (INSTRUMENT TEXT, FIELD TEXT, FIELD_KEY TEXT, PARAMS TEXT, VALUE TEXT, FETCHED_AT REAL, PRIMARY KEY (INSTRUMENT, FIELD_KEY, PARAMS))".format(TABLE_NAME))
+
+    def get(self, instrument: str, tr_field: dict, params: Dict) -> Any:
+        with self._lock:
+            row = self._connection.execute("SELECT VALUE, FETCHED_AT FROM {} WHERE INSTRUMENT = ? AND FIELD_KEY = ? AND PARAMS = ?".format(TABLE_NAME), (instrument.upper(), _field_key(tr_field), _params_key(params))).fetchone()
+
+            if row is None or _is_expired(_field_name(tr_field), params, row[1]):
+                self.misses += 1
+
+                return MISSING
+
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def get_many(self, instrument: str, tr_fields: List[dict], params: Dict) -> List[Any]:
+        return [self.get(instrument, tr_field, params) for tr_field in tr_fields]
+
+    def put_many(self, instrument: str, tr_fields: List[dict], params: Dict, values: Iterable[Any]):
+        rows = []
+
+        for tr_field, value in zip(tr_fields, values):
+            value = _to_json_value(value)
+
+            # Leere Werte werden nicht gespeichert, damit sie bei der nächsten Abfrage erneut abgerufen werden.
+            if value is None or value == "":
+                continue
+
+            rows.append((instrument.upper(), _field_name(tr_field), _field_key(tr_field), _params_key(params), json.dumps(value), time.time()))
+
+        if not rows:
+            return
+
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO {} VALUES (?, ?, ?, ?, ?, ?)".format(TABLE_NAME), rows)
+
+    def invalidate(self, fields: Optional[List[str]] = None) -> int:
+        # Entfernt alle Einträge bzw. nur die Einträge der angegebenen Datenfelder (z.B. "TR.FreeFloatPct").
+        with self._lock, self._connection:
+            if not fields:
+                cursor = self._connection.execute("DELETE FROM {}".format(TABLE_NAME))
+            else:
+                cursor = self._connection.execute("DELETE FROM {} WHERE UPPER(FIELD) IN ({})".format(TABLE_NAME, ", ".join("?" * len(fields))), [field.upper() for field in fields])
+
+        return cursor.rowcount
+
+    def statistics(self) -> Tuple[int, int]:
+        return self.hits, self.misses
+
+    def close(self):
+        self._connection.close()
+
+def _field_name(tr_field: dict) -> str:
+    # ek.TR_Field liefert ein Dict der Form {"TR.F.TotAssets": {"params": {...}}}
+    return next(iter(tr_field))
+
+def _field_key(tr_field: dict) -> str:
+    return json.dumps(tr_field, sort_keys=True, default=str)
+
+def _params_key(params: Dict) -> str:
+    return json.dumps(params or {}, sort_keys=True, default=str)
+
+def _is_expired(field_name: str, params: Dict, fetched_at: float) -> bool:
+    # Werte zu einem Stichtag sind historische Werte und verfallen nicht.
+    if field_name in FIELD_TTL_DAYS:
+        ttl_days = FIELD_TTL_DAYS[field_name]
+    elif params and "SDate" in params:
+        ttl_days = None
+    else:
+        ttl_days = DEFAULT_TTL_DAYS
+
+    if ttl_days is None:
+        return False
+
+    return time.time() - fetched_at > ttl_days * 86400
+
+def _to_json_value(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        value = value.item()
+
+    if value is None or (not isinstance(value, str) and pd.isnull(value)):
+        return None
+
+    return value
@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+from datetime import date
+from typing import Optional
+
+# Hilfsmittel für den nebenläufigen Zugriff auf die Eikon Data API unter Einhaltung der Zugriffslimits (höchstens 5 Anfragen je Sekunde und
+# 10.000 Anfragen am Tag). Das Limit je Sekunde wird über einen gemeinsamen Token-Bucket eingehalten, das Tageslimit über ein Journal (Ledger),
+# das die Anzahl der Anfragen des aktuellen Tages über mehrere Programmläufe hinweg speichert. Fehlgeschlagene Anfragen werden mit exponentiell
+# wachsender Wartezeit wiederholt (retry_delay).
+
+# Das Tageslimit gilt für alle Stichproben gemeinsam, das Journal liegt daher direkt im Ordner "samples".
+PATH_QUOTA_FILE = "./samples/eikon_quota.json"
+
+REQUESTS_PER_SECOND = 5
+DAILY_REQUEST_LIMIT = 10000
+
+# Anzahl an Anfragen, die vom Tageslimit als Reserve zurückbehalten werden (z.B. für manuelle Abfragen in Eikon)
+DAILY_REQUEST_RESERVE = 100
+
+# Anzahl an Anfragen, die das Journal des Tageslimits je Schreibvorgang im Voraus verbucht. Die Datei wird so nur alle LEDGER_BLOCK_SIZE Anfragen
+# geschrieben. Bei einem Abbruch werden höchstens so viele Anfragen zu viel (nie zu wenig) gezählt. close() schreibt den genauen Stand.
+LEDGER_BLOCK_SIZE = 50
+
+# Wartezeit (s) vor der ersten Wiederholung einer fehlgeschlagenen Anfrage. Sie verdoppelt sich mit jedem weiteren Versuch bis RETRY_MAX_DELAY.
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+
+class QuotaExhaustedError(Exception):
+    def __init__(self, requests_today: int, limit: int):
+        super().__init__("Das Tageslimit der Eikon Data API ist nahezu erreicht ({} von {} Anfragen). Der Datenabruf kann morgen fortgesetzt werden.".format(requests_today, limit))
+
+        self.requests_today = requests_today
+        self.limit = limit
+
+class TokenBucket:
+    # Je Sekunde werden "rate" Token erzeugt, höchstens "capacity" Token werden vorgehalten. Jede Anfrage verbraucht ein Token.
+    # Mit der Standardkapazität von einem Token werden die Anfragen gleichmäßig verteilt, sodass auch in keinem gleitenden Zeitfenster von
+    # einer Sekunde mehr als "rate" Anfragen gesendet werden.
+    def __init__(self, rate: float = REQUESTS_PER_SECOND, capacity: Optional[int] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else 1
+
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+def retry_delay(tries: int) -> float:
+    # Wartezeit nach dem fehlgeschlagenen Versuch "tries" (1, 2, ...) vor dem nächsten Versuch
+    return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (tries - 1))
+
+class QuotaLedger:
+    def __init__(self, path_quota_file: str = PATH_QUOTA_FILE, limit: int = DAILY_REQUEST_LIMIT, reserve: int = DAILY_REQUEST_RESERVE, block_size: int = LEDGER_BLOCK_SIZE):
+        self.path_quota_file = path_quota_file
+        self.limit = limit
+        self.reserve = reserve
+        self.block_size = max(1, block_size)
+
+        self._lock = threading.Lock()
+        self._day, self._requests = self._load()
+
+        # Stand der Datei (inkl. der im Voraus verbuchten Anfragen)
+        self._requests_saved = self._requests
+
+    @property
+    def requests_today(self) -> int:
+        with self._lock:
+            self._roll_over()
+
+            return self._requests
+
+    @property
+    def remaining_today(self) -> int:
+        return max(0, self.limit - self.reserve - self.requests_today)
+
+    def reserve_request(self):
+        # Verbucht eine Anfrage vor dem Senden. Ist das Tageslimit (abzüglich Reserve) erreicht, wird die Anfrage nicht mehr zugelassen.
+        with self._lock:
+            self._roll_over()
+
+            if self._requests >= self.limit - self.reserve:
+                raise QuotaExhaustedError(self._requests, self.limit)
+
+            self._requests += 1
+
+            # Die Datei wird erst geschrieben, wenn die im Voraus verbuchten Anfragen verbraucht sind.
+            if self._requests > self._requests_saved:
+                self._save(min(self._requests + self.block_size - 1, self.limit - self.reserve))
+
+    def close(self):
+        # Schreibt die genaue Anzahl der Anfragen (ohne die im Voraus verbuchten Anfragen).
+        with self._lock:
+            if self._requests_saved != self._requests:
+                self._save(self._requests)
+
+    def _roll_over(self):
+        today = date.today().isoformat()
+
+        if self._day != today:
+            self._day = today
+            self._requests = 0
+            self._requests_saved = 0
+
+    def _load(self):
+        try:
+            with open(self.path_quota_file, "r") as file:
+                ledger = json.load(file)
+
+            if ledger.get("day") == date.today().isoformat():
+                return ledger["day"], int(ledger.get("requests", 0))
+        except (FileNotFoundError, json.JSONDecodeError, ValueError):
+            pass
+
+        return date.today().isoformat(), 0
+
+    def _save(self, requests: int):
+        path_quota_tmp_file = self.path_quota_file + ".tmp"
+
+        with open(path_quota_tmp_file, "w") as file:
+            json.dump({"day": self._day, "requests": requests}, file)
+
+        os.replace(path_quota_tmp_file, self.path_quota_file)
+
+        self._requests_saved = requests
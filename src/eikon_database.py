@@ -1,6 +1,9 @@
 import logging
+import queue
+import threading
 import time
-from typing import Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import yaml
 
@@ -8,6 +11,11 @@ import pandas as pd
 
 import eikon as ek
 
+import defaults
+import eikon_cache
+import eikon_client
+import metrics
+
 PATH_CONFIG_FILE = "./config.yml"
 
 INDEX_ESEF_PACKAGE_NAME = 0
@@ -15,6 +23,39 @@ INDEX_LEI = 1
 INDEX_PERIOD_END = 2
 INDEX_ISIN = 10
 
+# Spalten der Unternehmensdaten in der Reihenfolge, in der sie (ab INDEX_ISIN) an die Berichte angehängt werden
+COMPANY_DATA_COLUMNS = ["ISIN", "COMPANY", "SECTOR", "COUNTRY", "MARKET_CAP", "FREE_FLOAT", "AUDITOR", "AUDITOR_FEES", "EMPLOYEES", "FOUNDED", "ANALYSTS_FOLLOWING", "TOTAL_ASSETS", "TOTAL_DEBT", "INCOME", "TOTAL_ASSETS_T-1"]
+
+COUNT_COMPANY_DATA_FIELDS = len(COMPANY_DATA_COLUMNS)
+
+# Höchstanzahl an Instrumenten je Anfrage beim gebündelten Abruf
+DEFAULT_BATCH_SIZE = 100
+
+# Wartezeit (s), nach der die Pipeline (EnrichmentPipeline) ein unvollständiges Paket abruft, wenn keine weiteren Berichte eintreffen
+PIPELINE_FLUSH_TIMEOUT = 1.0
+
+# Cache für die Antworten von Refinitiv Eikon (siehe eikon_cache). Ohne Cache wird jeder Wert abgerufen.
+_cache: Optional[eikon_cache.EikonCache] = None
+
+# Gemeinsamer Token-Bucket aller Threads (höchstens 5 Anfragen je Sekunde) und Journal des Tageslimits
+_rate_limiter = eikon_client.TokenBucket(eikon_client.REQUESTS_PER_SECOND)
+_quota_ledger: Optional[eikon_client.QuotaLedger] = None
+
+def set_rate_limiter(rate_limiter: eikon_client.TokenBucket):
+    global _rate_limiter
+
+    _rate_limiter = rate_limiter
+
+def set_quota_ledger(quota_ledger: Optional[eikon_client.QuotaLedger]):
+    global _quota_ledger
+
+    _quota_ledger = quota_ledger
+
+def set_cache(cache: Optional[eikon_cache.EikonCache]):
+    global _cache
+
+    _cache = cache
+
 def setup() -> bool:
     eikon_app_key = ""
 
@@ -23,136 +64,543 @@ def setup() -> bool:
 
         eikon_app_key = config["eikon_app_key"]
 
-    # Test umzu überprüfen, ob Refinitiv Eikon gestartet ist und die Verbindung hergestellt ist.
+    # Test umzu überprüfen, ob Refinitiv Eikon gestartet ist und die Verbindung hergestellt ist. Ein erreichtes Tageslimit
+    # (eikon_client.QuotaExhaustedError) ist kein Verbindungsfehler und wird an den Aufrufer weitergereicht.
+    _acquire_request()
+
     try:
         ek.set_app_key(eikon_app_key)
 
         ek.get_data("529900NNUPAGGOMPXZ31@LEI", "TR.PriceClose")
 
         return True
-    except:
-            return False
-
-def get_company_data(reports: list):
-        for report in reports:
-            
-            # Definiere Datenfelder
-            trf_isin = ek.TR_Field("TR.ISIN")
-            trf_common_name = ek.TR_Field("TR.CommonName")
-            trf_sector = ek.TR_Field("TR.TRBCEconomicSector")
-            trf_country = ek.TR_Field("TR.ExchangeCountry")
-            trf_market_cap = ek.TR_Field("TR.CompanyMarketCap",
-                params = {
-                    "Scale" : 6,
-                    "Curn" : "EUR"
-                })
-            trf_free_float = ek.TR_Field("TR.FreeFloatPct")
-            trf_auditor = ek.TR_Field("TR.F.Auditor")
-            trf_auditor_fees = ek.TR_Field("TR.F.AuditorFees",
-                params = {
-                    "Curn" : "EUR"
-                })
-            trf_employees = ek.TR_Field("TR.CompanyNumEmploy")
-            trf_founded = ek.TR_Field("TR.OrgFoundedYear")
-            trf_analysts_following = ek.TR_Field("TR.NumberOfAnalysts")
-            trf_total_assets = ek.TR_Field("TR.F.TotAssets",
-                params = {
-                    "Scale" : "6",
-                    "Curn" : "EUR"
-                })
-            trf_total_debt = ek.TR_Field("TR.F.DebtTot",
-                params = {
-                    "Scale" : "6",
-                    "Curn" : "EUR"
-                })
-            trf_income = ek.TR_Field("TR.F.IncBefDiscOpsExordItems",
-                params = {
-                    "Scale" : "6",
-                    "Curn" : "EUR"
-                })
-            trf_total_assets_t_1 = ek.TR_Field("TR.F.TotAssets",
-                params = {
-                    "Scale" : "6",
-                    "Curn" : "EUR"
-                })
-
-            instrument_lei = report[INDEX_LEI] + "@LEI"
+    except (ek.EikonError, OSError):
+        return False
+
+def get_company_data(reports: list, workers: int = 1, on_report: Optional[Callable[[list], None]] = None):
+    # Die Berichte werden einzeln, bei mehreren Workern nebenläufig, abgefragt. Die Zugriffslimits werden über den gemeinsamen Token-Bucket und das Tageslimit eingehalten.
+    # Jeder abgeschlossene Bericht wird an on_report übergeben (z.B. zur Aufnahme in das Journal des Laufs).
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = list(executor.map(_get_report_company_data_or_pad, reports, [on_report] * len(reports)))
+
+    metrics.flush()
+
+    _print_quota_exhausted(results.count(False))
+
+def _print_quota_exhausted(count_quota_exhausted: int):
+    if count_quota_exhausted:
+        print("\n==> Das Tageslimit der Eikon Data API ist erreicht. Zu {} Bericht(en) wurden keine bzw. unvollständige Unternehmensdaten geladen. Diese können z.B. morgen über die Option --update nachgeladen werden.".format(count_quota_exhausted))
+
+def _get_report_company_data_or_pad(report: list, on_report: Optional[Callable[[list], None]] = None) -> bool:
+    # Ist das Tageslimit erreicht, wird der Datenabruf beendet und der Bericht um leere Werte ergänzt, damit die Spalten des Samples erhalten bleiben.
+    try:
+        _get_report_company_data(report)
+
+        complete = True
+    except eikon_client.QuotaExhaustedError:
+        metrics.count("enrichment.quota_exhausted")
+
+        complete = False
+    finally:
+        _pad_report(report)
+
+    if on_report is not None:
+        on_report(report)
+
+    return complete
+
+def _pad_report(report: list):
+    report.extend([""] * (INDEX_ISIN + COUNT_COMPANY_DATA_FIELDS - len(report)))
+
+def _get_report_company_data(report: list):
+    with metrics.timer("enrichment.report"):
+        _get_report_company_data_with_retries(report)
+
+def _get_report_company_data_with_retries(report: list):
+    # Definiere Datenfelder
+    trf_isin, trf_company_data, trf_total_assets_t_1 = _define_tr_fields()
+
+    instrument_lei = report[INDEX_LEI] + "@LEI"
+    instrument_isin = ""
+
+    # Abschlussstichtag der Berichtsperiode
+    period_end = str(report[INDEX_PERIOD_END])
+
+    # Abschlussstichtag des Vorjahres berechnen
+    period_end_t_1 = _calculate_period_end_t_1(period_end)
+
+    # Zäht die Anzahl der versuchten Datenabrufe und definiert die maximale Anzahl an Versuchen
+    tries = 1
+    max_tries = 5
+
+    print("\nDie zum ESEF-Paket \"{}\" zugehörigen Unternehmensdaten werden nun aus Refinitiv Eikon heruntergeladen.".format(report[INDEX_ESEF_PACKAGE_NAME]))
+
+    step1 = False
+    step2 = False
+
+    while True:
+        try:
+            if not step1:
+                _get_tr_fields(report, instrument_lei, trf_isin, {})
+
+                step1 = True
+
+                try:
+                    instrument_isin = report[INDEX_ISIN]
+
+                    if pd.isnull(instrument_isin):
+                        instrument_isin = ""
+                except IndexError:
+                    pass
+
+
+                # Gesammelte Abfrage für alle Unternehmen meiner Meinung nach nicht möglich, da Parameter Market Cap vom individuellen Stichtag des Unternehmens abhängig ist (je Abfrage kann nur ein Zeitpunkt angeben werden).
+                # Siehe aber get_company_data_batched: Unternehmen mit demselben Stichtag lassen sich gemeinsam abfragen.
+
+            if not step2:
+                # Zweiter Datenabruf notwendig, da das Datenfeld "TR.F.Auditor" und weitere Felder über den Identifier LEI nicht verfügbar sind. Hierfür muss im ersten Schritt die ISIN ermittelt werden.
+
+                _get_tr_fields(report, instrument_isin, trf_company_data, {"SDate" : period_end})
+
+                step2 = True
+
+            _get_tr_fields(report, instrument_isin, trf_total_assets_t_1, {"SDate" : period_end_t_1})
+
+            print("\n\t==> Unternehmendaten erfolgreich heruntergeladen.")
+            break          
+
+        except ek.EikonError as err:
+            print("\n\t==> Es ist ein Serverfehler (Error {}) beim Datenabruf von Refinitiv Eikon aufgetreten: {}".format(err.code, err.message))
+
+            metrics.count("enrichment.errors", code=err.code)
+
+        if tries < max_tries:
+            time.sleep(eikon_client.retry_delay(tries))
+
+            tries += 1
+            metrics.count("enrichment.retries")
+            print("\n\tDatenabruf wird erneut versucht... (Versuch {}/{})".format(tries, max_tries))
+        else:
+            print("\n\t==> Datenabruf für die zum ESEF-Paket \"{}\" gehörigen Unternehmensdaten nicht möglich. Unternehmen wird übersprungen.".format(report[INDEX_ESEF_PACKAGE_NAME]))
+
+            break
+
+def get_company_data_batched(reports: list, batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1):
+    # Gebündelter Abruf der Unternehmensdaten. Die meisten Berichte haben einen von wenigen Abschlussstichtagen, sodass die Unternehmen je Stichtag
+    # gemeinsam (in Paketen von höchstens batch_size Instrumenten) abgefragt werden können. Die Antworten werden über das Instrument den Berichten zugeordnet.
+    # Die Daten werden in derselben Reihenfolge an die Berichte angehängt wie bei get_company_data.
+    trf_isin, trf_company_data, trf_total_assets_t_1 = _define_tr_fields()
+
+    print("\nDie Unternehmensdaten zu {} Bericht(en) werden nun gebündelt (je Abfrage höchstens {} Instrumente) aus Refinitiv Eikon heruntergeladen.".format(len(reports), batch_size))
+
+    # Schritt 1: Ermittlung der ISIN über den LEI (unabhängig vom Stichtag)
+    instruments_lei = [report[INDEX_LEI] + "@LEI" for report in reports]
+
+    isins = _get_tr_fields_batched(sorted(set(instruments_lei)), trf_isin, {}, batch_size, workers)
+
+    instruments_isin = []
+
+    for report, instrument_lei in zip(reports, instruments_lei):
+        values = isins.get(instrument_lei, [""])
+        report.extend(values)
+
+        instrument_isin = values[0]
+
+        if pd.isnull(instrument_isin):
             instrument_isin = ""
 
-            # Abschlussstichtag der Berichtsperiode
-            period_end = str(report[INDEX_PERIOD_END])
+        instruments_isin.append(instrument_isin)
+
+    period_ends = [str(report[INDEX_PERIOD_END]) for report in reports]
+
+    # Schritt 2: Unternehmensdaten zum Abschlussstichtag, gruppiert nach Stichtag
+    _extend_reports_by_period_end(reports, instruments_isin, period_ends, trf_company_data, batch_size, workers)
+
+    # Schritt 3: Bilanzsumme zum Abschlussstichtag des Vorjahres, gruppiert nach diesem Stichtag
+    _extend_reports_by_period_end(reports, instruments_isin, [_calculate_period_end_t_1(period_end) for period_end in period_ends], trf_total_assets_t_1, batch_size, workers)
+
+    count_missing = sum(1 for instrument_isin in instruments_isin if not instrument_isin)
+
+    if count_missing:
+        print("\n\t==> Achtung, zu {} Bericht(en) konnten keine Daten geladen werden, da der Instrument-Identifier nicht ermittelbar ist.".format(count_missing))
+
+    print("\n\t==> Unternehmendaten erfolgreich heruntergeladen.")
 
-            # Abschlussstichtag des Vorjahres berechnen
-            year = period_end[:4]
-            year = int(year)
-            year -= 1
-            period_end_t_1 = str(year) + period_end[4:]
-            
-            # Zäht die Anzahl der versuchten Datenabrufe und definiert die maximale Anzahl an Versuchen
-            tries = 1
-            max_tries = 5
+    metrics.flush()
 
-            print("\nDie zum ESEF-Paket \"{}\" zugehörigen Unternehmensdaten werden nun aus Refinitiv Eikon heruntergeladen.".format(report[INDEX_ESEF_PACKAGE_NAME]))
+class EnrichmentPipeline:
+    # Abruf der Unternehmensdaten parallel zum Lesen der ESEF-Pakete. Gelesene Berichte werden über put in eine begrenzte Warteschlange gestellt und
+    # von Threads abgerufen, während die nächsten Pakete gelesen werden. Ist die Warteschlange voll, blockiert put, sodass das Lesen nicht beliebig
+    # weit vorauslaufen kann. Beim Einzelabruf arbeiten so viele Threads wie Worker, beim gebündelten Abruf sammelt ein Thread jeweils bis zu
+    # batch_size Berichte und ruft diese mit get_company_data_batched ab. Trifft für flush_timeout Sekunden kein weiterer Bericht ein (z.B. während
+    # ein großes Paket gelesen wird), wird auch ein unvollständiges Paket abgerufen. Jeder abgeschlossene Bericht wird an on_report übergeben.
+    def __init__(self, queue_size: int = defaults.PIPELINE_QUEUE_SIZE, batch_size: int = 0, workers: int = 1, on_report: Optional[Callable[[list], None]] = None, flush_timeout: float = PIPELINE_FLUSH_TIMEOUT):
+        self.batch_size = batch_size
+        self.flush_timeout = flush_timeout
+        self.workers = max(1, workers)
+        self.on_report = on_report
 
-            step1 = False
-            step2 = False
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._count_quota_exhausted = 0
+        self._errors = []
+        self._lock = threading.Lock()
 
-            while True:
+        self._threads = [threading.Thread(target=self._consume, daemon=True) for i in range(1 if batch_size > 0 else self.workers)]
+
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self) -> "EnrichmentPipeline":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(exc_type is None)
+
+    def put(self, report: list):
+        self._queue.put(report)
+
+    def close(self, raise_errors: bool = True):
+        # Wartet, bis alle Berichte abgerufen wurden. Der erste Fehler eines Threads wird im aufrufenden Thread erneut ausgelöst.
+        for thread in self._threads:
+            self._queue.put(None)
+
+        for thread in self._threads:
+            thread.join()
+
+        metrics.flush()
+
+        _print_quota_exhausted(self._count_quota_exhausted)
+
+        if self._errors and raise_errors:
+            raise self._errors[0]
+
+    def _consume(self):
+        done = False
+
+        while not done:
+            reports = []
+
+            while len(reports) < max(1, self.batch_size):
                 try:
-                    if not step1:
-                        _get_tr_fields(report, instrument_lei, [trf_isin], {})
-
-                        step1 = True
-
-                        try:
-                            instrument_isin = report[INDEX_ISIN]
-
-                            if pd.isnull(instrument_isin):
-                                instrument_isin = ""
-                        except IndexError:
-                            pass
-                        
-                        
-                        # Gesammelte Abfrage für alle Unternehmen meiner Meinung nach nicht möglich, da Parameter Market Cap vom individuellen Stichtag des Unternehmens abhängig ist (je Abfrage kann nur ein Zeitpunkt angeben werden).
-
-                    if not step2:
-                        # Zweiter Datenabruf notwendig, da das Datenfeld "TR.F.Auditor" und weitere Felder über den Identifier LEI nicht verfügbar sind. Hierfür muss im ersten Schritt die ISIN ermittelt werden.
-
-                        _get_tr_fields(report, instrument_isin,
-                            [
-                                trf_common_name,
-                                trf_sector,
-                                trf_country,
-                                trf_market_cap,
-                                trf_free_float,
-                                trf_auditor,
-                                trf_auditor_fees,
-                                trf_employees,
-                                trf_founded,
-                                trf_analysts_following,
-                                trf_total_assets,
-                                trf_total_debt,
-                                trf_income,
-                            ], {"SDate" : period_end})
-
-                        step2 = True
-                        
-                    _get_tr_fields(report, instrument_isin, [trf_total_assets_t_1], {"SDate" : period_end_t_1})
-
-                    print("\n\t==> Unternehmendaten erfolgreich heruntergeladen.")
-                    break          
-
-                except ek.EikonError as err:
-                    print("\n\t==> Es ist ein Serverfehler (Error {}) beim Datenabruf von Refinitiv Eikon aufgetreten: {}".format(err.code, err.message))
-
-                if tries < max_tries:
-                    tries += 1 
-                    print("\n\tDatenabruf wird erneut versucht... (Versuch {}/{})".format(tries, max_tries))
-                else:
-                    print("\n\t==> Datenabruf für die zum ESEF-Paket \"{}\" gehörigen Unternehmensdaten nicht möglich. Unternehmen wird übersprungen.".format(report[INDEX_ESEF_PACKAGE_NAME]))
+                    report = self._queue.get(timeout=self.flush_timeout if reports else None)
+                except queue.Empty:
+                    break
 
+                if report is None:
+                    done = True
                     break
-                    
+
+                reports.append(report)
+
+            # Nach einem Fehler werden die übrigen Berichte nur noch entnommen, damit das Lesen nicht blockiert.
+            if not reports or self._errors:
+                continue
+
+            try:
+                self._enrich(reports)
+            except BaseException as e:
+                with self._lock:
+                    self._errors.append(e)
+
+    def _enrich(self, reports: list):
+        if self.batch_size > 0:
+            get_company_data_batched(reports, self.batch_size, self.workers)
+
+            if self.on_report is not None:
+                for report in reports:
+                    self.on_report(report)
+        else:
+            for report in reports:
+                if not _get_report_company_data_or_pad(report, self.on_report):
+                    with self._lock:
+                        self._count_quota_exhausted += 1
+
+def update_company_data(df: pd.DataFrame, fields_to_update: pd.DataFrame, batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1, stale_fields: Optional[pd.DataFrame] = None) -> Dict[Tuple[Any, str], Any]:
+    # Ruft nur die in fields_to_update (Index wie df, Spalten COMPANY_DATA_COLUMNS, True = abzurufen) markierten Felder ab und liefert die
+    # abgerufenen Werte je (Index, Spalte). Leere Antworten werden nicht geliefert, damit vorhandene Werte nicht überschrieben werden.
+    # Die in stale_fields (gleicher Aufbau) markierten, veralteten Felder werden unabhängig vom Cache erneut abgerufen, leere Felder über den Cache.
+    if stale_fields is None:
+        stale_fields = pd.DataFrame(False, index=fields_to_update.index, columns=fields_to_update.columns)
+    else:
+        stale_fields = stale_fields.reindex(index=fields_to_update.index, columns=fields_to_update.columns, fill_value=False)
+
+    trf_isin, trf_company_data, trf_total_assets_t_1 = _define_tr_fields()
+
+    tr_fields_by_column = dict(zip(COMPANY_DATA_COLUMNS, trf_isin + trf_company_data + trf_total_assets_t_1))
+
+    updates = {}
+
+    # Schritt 1: Ermittlung der ISIN über den LEI
+    instruments_lei = {index: str(df.at[index, "LEI"]) + "@LEI" for index in fields_to_update.index[fields_to_update["ISIN"]]}
+
+    if instruments_lei:
+        instruments_to_refresh = {instruments_lei[index] for index in instruments_lei if stale_fields.at[index, "ISIN"]}
+
+        isins = _get_tr_fields_batched(sorted(set(instruments_lei.values())), trf_isin, {}, batch_size, workers, instruments_to_refresh)
+
+        for index, instrument_lei in instruments_lei.items():
+            values = isins.get(instrument_lei)
+
+            if values is not None and _has_value(values[0]):
+                updates[(index, "ISIN")] = values[0]
+
+    # Schritte 2 und 3: Je Stichtag und Kombination der abzurufenden Felder werden die Instrumente gemeinsam abgefragt. Instrumente mit einem
+    # veralteten Feld der Kombination werden nicht aus dem Cache übernommen.
+    columns_company_data = COMPANY_DATA_COLUMNS[1:-1]
+
+    requests = {}
+    instruments_to_refresh = {}
+
+    for index, row, stale_row in zip(fields_to_update.index, fields_to_update.itertuples(index=False, name=None), stale_fields.itertuples(index=False, name=None)):
+        row = dict(zip(fields_to_update.columns, row))
+        stale_row = dict(zip(fields_to_update.columns, stale_row))
+
+        instrument_isin = updates.get((index, "ISIN"), df.at[index, "ISIN"])
+
+        if not _has_value(instrument_isin):
+            continue
+
+        period_end = str(df.at[index, "PERIOD_END"])
+
+        columns = tuple(column for column in columns_company_data if row[column])
+
+        if columns:
+            requests.setdefault((period_end, columns), {}).setdefault(instrument_isin, []).append(index)
+
+            if any(stale_row[column] for column in columns):
+                instruments_to_refresh.setdefault((period_end, columns), set()).add(instrument_isin)
+
+        if row["TOTAL_ASSETS_T-1"]:
+            request = (_calculate_period_end_t_1(period_end), ("TOTAL_ASSETS_T-1", ))
+
+            requests.setdefault(request, {}).setdefault(instrument_isin, []).append(index)
+
+            if stale_row["TOTAL_ASSETS_T-1"]:
+                instruments_to_refresh.setdefault(request, set()).add(instrument_isin)
+
+    for (period_end, columns), indices_by_instrument in sorted(requests.items()):
+        values_by_instrument = _get_tr_fields_batched(sorted(indices_by_instrument), [tr_fields_by_column[column] for column in columns], {"SDate" : period_end}, batch_size, workers,
+            instruments_to_refresh.get((period_end, columns), set()))
+
+        for instrument, indices in indices_by_instrument.items():
+            values = values_by_instrument.get(instrument)
+
+            if values is None:
+                continue
+
+            for index in indices:
+                for column, value in zip(columns, values):
+                    if _has_value(value):
+                        updates[(index, column)] = value
+
+    metrics.flush()
+
+    return updates
+
+def _has_value(value: Any) -> bool:
+    if isinstance(value, str):
+        return value != ""
+
+    return not pd.isnull(value)
+
+def _extend_reports_by_period_end(reports: list, instruments: List[str], period_ends: List[str], tr_fields: List, batch_size: int, workers: int):
+    instruments_by_period_end = {}
+
+    for instrument, period_end in zip(instruments, period_ends):
+        if instrument:
+            instruments_by_period_end.setdefault(period_end, set()).add(instrument)
+
+    # Je Stichtag werden die zugehörigen Instrumente gemeinsam abgefragt.
+    values_by_period_end = {}
+
+    for period_end, instruments_of_period_end in sorted(instruments_by_period_end.items()):
+        values_by_period_end[period_end] = _get_tr_fields_batched(sorted(instruments_of_period_end), tr_fields, {"SDate" : period_end}, batch_size, workers)
+
+    for report, instrument, period_end in zip(reports, instruments, period_ends):
+        values = values_by_period_end.get(period_end, {}).get(instrument) if instrument else None
+
+        # Fehlende Daten werden wie beim Einzelabruf als leere Werte angehängt, damit die Spalten des Berichts erhalten bleiben.
+        if values is None:
+            values = [""] * len(tr_fields)
+
+        report.extend(values)
+
+def _define_tr_fields() -> Tuple[List, List, List]:
+    # Definiere Datenfelder
+    trf_isin = ek.TR_Field("TR.ISIN")
+    trf_common_name = ek.TR_Field("TR.CommonName")
+    trf_sector = ek.TR_Field("TR.TRBCEconomicSector")
+    trf_country = ek.TR_Field("TR.ExchangeCountry")
+    trf_market_cap = ek.TR_Field("TR.CompanyMarketCap",
+        params = {
+            "Scale" : 6,
+            "Curn" : "EUR"
+        })
+    trf_free_float = ek.TR_Field("TR.FreeFloatPct")
+    trf_auditor = ek.TR_Field("TR.F.Auditor")
+    trf_auditor_fees = ek.TR_Field("TR.F.AuditorFees",
+        params = {
+            "Curn" : "EUR"
+        })
+    trf_employees = ek.TR_Field("TR.CompanyNumEmploy")
+    trf_founded = ek.TR_Field("TR.OrgFoundedYear")
+    trf_analysts_following = ek.TR_Field("TR.NumberOfAnalysts")
+    trf_total_assets = ek.TR_Field("TR.F.TotAssets",
+        params = {
+            "Scale" : "6",
+            "Curn" : "EUR"
+        })
+    trf_total_debt = ek.TR_Field("TR.F.DebtTot",
+        params = {
+            "Scale" : "6",
+            "Curn" : "EUR"
+        })
+    trf_income = ek.TR_Field("TR.F.IncBefDiscOpsExordItems",
+        params = {
+            "Scale" : "6",
+            "Curn" : "EUR"
+        })
+    trf_total_assets_t_1 = ek.TR_Field("TR.F.TotAssets",
+        params = {
+            "Scale" : "6",
+            "Curn" : "EUR"
+        })
+
+    # Datenfelder, die über die ISIN zum Abschlussstichtag abgerufen werden
+    trf_company_data = [
+        trf_common_name,
+        trf_sector,
+        trf_country,
+        trf_market_cap,
+        trf_free_float,
+        trf_auditor,
+        trf_auditor_fees,
+        trf_employees,
+        trf_founded,
+        trf_analysts_following,
+        trf_total_assets,
+        trf_total_debt,
+        trf_income,
+    ]
+
+    return [trf_isin], trf_company_data, [trf_total_assets_t_1]
+
+def _calculate_period_end_t_1(period_end: str) -> str:
+    year = period_end[:4]
+    year = int(year)
+    year -= 1
+
+    return str(year) + period_end[4:]
+
+def _get_tr_fields_batched(instruments: List[str], tr_fields: List, params: Dict, batch_size: int, workers: int = 1, instruments_to_refresh: Set[str] = frozenset()) -> Dict[str, list]:
+    # Liefert je Instrument die Werte der Datenfelder in der Reihenfolge der Felder. Instrumente, für die keine Daten geliefert wurden, fehlen im Ergebnis.
+    values_by_instrument = {}
+
+    # Instrumente, deren Werte vollständig im Cache vorliegen, werden nicht abgefragt (außer den erneut abzurufenden instruments_to_refresh).
+    if _cache is not None:
+        instruments_to_request = []
+
+        for instrument in instruments:
+            if instrument in instruments_to_refresh:
+                instruments_to_request.append(instrument)
+                continue
+
+            values = _cache.get_many(instrument, tr_fields, params)
+
+            if any(value is eikon_cache.MISSING for value in values):
+                instruments_to_request.append(instrument)
+            else:
+                values_by_instrument[instrument] = values
+
+        instruments = instruments_to_request
+
+    batches = [instruments[i:i + batch_size] for i in range(0, len(instruments), batch_size)]
+
+    # Die Pakete werden bei mehreren Workern nebenläufig abgefragt. Die Zugriffslimits werden über den gemeinsamen Token-Bucket eingehalten.
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches)))) as executor:
+        futures = [executor.submit(_request_batch, batch, tr_fields, params) for batch in batches]
+
+    count_quota_exhausted = 0
+
+    for batch, future in zip(batches, futures):
+        # Ist das Tageslimit erreicht, werden die bereits gelieferten Werte verwendet und die übrigen Instrumente ausgelassen.
+        try:
+            data, err = future.result()
+        except eikon_client.QuotaExhaustedError:
+            count_quota_exhausted += len(batch)
+            metrics.count("enrichment.quota_exhausted", len(batch))
+            continue
+
+        if data is None:
+            continue
+
+        # Zuordnung der Antworten über das Instrument. Bei mehreren Zeilen je Instrument wird (wie beim Einzelabruf) die erste Zeile verwendet.
+        requested = {instrument.upper(): instrument for instrument in batch}
+
+        for row in data.itertuples(index=False, name=None):
+            instrument = requested.get(str(row[0]).upper())
+
+            if instrument is not None and instrument not in values_by_instrument:
+                values_by_instrument[instrument] = list(row[1:])
+
+                if _cache is not None:
+                    _cache.put_many(instrument, tr_fields, params, values_by_instrument[instrument])
+
+        if err:
+            print("\n\t==> Refiniv Eikon hat einen oder mehrere Fehler als Antwort auf den Datenabruf gesendet:")
+
+            for e in err:
+                print("\n\t\t{} (Error {})".format(e["message"], e["code"]))
+
+            print("\n\tBitte überprüfen Sie die Daten.")
+
+    if count_quota_exhausted:
+        print("\n\t==> Das Tageslimit der Eikon Data API ist erreicht. Für {} Instrument(e) wurden keine Daten abgefragt. Diese können z.B. morgen über die Option --update nachgeladen werden.".format(count_quota_exhausted))
+
+    return values_by_instrument
+
+def _request_batch(batch: List[str], tr_fields: List, params: Dict) -> Tuple:
+    # Liefert die Antwort (data, err) zu einem Paket von Instrumenten. Ist der Abruf nicht möglich, wird (None, None) geliefert.
+    tries = 1
+    max_tries = 5
+
+    while True:
+        try:
+            _acquire_request()
+
+            with metrics.timer("enrichment.api_latency"):
+                data = ek.get_data(batch, tr_fields, parameters=params)
+
+            metrics.observe("enrichment.instruments_per_request", len(batch))
+
+            return data
+        except ek.EikonError as err:
+            print("\n\t==> Es ist ein Serverfehler (Error {}) beim Datenabruf von Refinitiv Eikon aufgetreten: {}".format(err.code, err.message))
+
+            metrics.count("enrichment.errors", code=err.code)
+
+        if tries < max_tries:
+            time.sleep(eikon_client.retry_delay(tries))
+
+            tries += 1
+            metrics.count("enrichment.retries")
+            print("\n\tDatenabruf wird erneut versucht... (Versuch {}/{})".format(tries, max_tries))
+        else:
+            print("\n\t==> Datenabruf für {} Instrument(e) nicht möglich. Die Unternehmen werden übersprungen.".format(len(batch)))
+
+            return None, None
+
+def _acquire_request():
+    # Damit das Zugriffslimit der Eikon Data API nicht erreicht wird (höchsten 5 Anfragen je Sekunde und 10.000 am Tag), wird jede Anfrage
+    # zunächst im Tageslimit verbucht und anschließend ein Token des gemeinsamen Token-Buckets abgewartet.
+    if _quota_ledger is not None:
+        _quota_ledger.reserve_request()
+
+    with metrics.timer("enrichment.rate_limit_wait"):
+        _rate_limiter.acquire()
+
+    metrics.count("enrichment.requests")
+
 def _get_tr_fields(report: List, instrument: str, tr_fields: List, params: Dict):
 
     if not instrument:
@@ -163,27 +611,33 @@ def _get_tr_fields(report: List, instrument: str, tr_fields: List, params: Dict)
 
         return
     
-    # Zugriffszeit messen, damit das Zugriffslimit der Eikon Data API nicht erreicht wird (höchsten 5 Anfragen je Sekunde und 10.000 am Tag)
-    start = time.time()
+    # Bereits zwischengespeicherte Werte werden aus dem Cache übernommen. Abgefragt werden nur die fehlenden bzw. verfallenen Datenfelder.
+    values = _cache.get_many(instrument, tr_fields, params) if _cache is not None else [eikon_cache.MISSING] * len(tr_fields)
 
-    # Serverfehler werden über das Abfangen des ek.EikonErrors von der aufrufenden Funktion behandelt
-    data, err = ek.get_data(instrument, tr_fields, parameters=params)
+    tr_fields_to_request = [tr_field for tr_field, value in zip(tr_fields, values) if value is eikon_cache.MISSING]
 
-    end = time.time()
+    err = None
 
-    duration = end - start
+    if tr_fields_to_request:
+        _acquire_request()
 
-    if duration < 0.2:
-        time.sleep(0.2 - duration)
+        # Serverfehler werden über das Abfangen des ek.EikonErrors von der aufrufenden Funktion behandelt
+        with metrics.timer("enrichment.api_latency"):
+            data, err = ek.get_data(instrument, tr_fields_to_request, parameters=params)
 
-    i = 0
-    for index, value in data.iloc[0].iteritems():
-        if i == 0:
-            i += 1
-            continue
+        metrics.observe("enrichment.instruments_per_request", 1)
+
+        # Die erste Spalte der Antwort enthält das Instrument.
+        requested_values = list(data.iloc[0])[1:]
+
+        if _cache is not None:
+            _cache.put_many(instrument, tr_fields_to_request, params, requested_values)
+
+        requested_values = iter(requested_values)
+
+        values = [next(requested_values, "") if value is eikon_cache.MISSING else value for value in values]
 
-        report.append(value)
-        i += 1
+    report.extend(values)
 
     if err:
         print("\n\t==> Refiniv Eikon hat einen oder mehrere Fehler als Antwort auf den Datenabruf gesendet:")
@@ -191,4 +645,4 @@ def _get_tr_fields(report: List, instrument: str, tr_fields: List, params: Dict)
         for e in err:
             print("\n\t\t{} (Error {})".format(e["message"], e["code"]))
         
-        print("\n\tBitte überprüfen Sie die Daten.")
\ No newline at end of file
+        print("\n\tBitte überprüfen Sie die Daten.")
@@ -0,0 +1,178 @@
+import hashlib
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+from eikon import EikonError
+
+# Lokaler Ersatz (Stand-in) für die von eikon_database verwendete Teilmenge der Eikon Data API (set_app_key, get_data, TR_Field, EikonError).
+# Damit lässt sich der Abruf der Unternehmensdaten ohne gestartetes Refinitiv Eikon ausführen und messen. Die Antworten sind synthetisch, aber
+# deterministisch: Jedes Instrument liefert bei jedem Abruf dieselben Werte. Latenz, Fehler (EikonError mit Fehlercode) und das Zugriffslimit
+# (Anfragen je Sekunde) sind konfigurierbar.
+#
+# Verwendung: eikon_standin.install(EikonStandIn(...)) ersetzt das Modul "ek" in eikon_database, eikon_standin.uninstall() stellt es wieder her.
+
+# Fehlercodes, die Refinitiv Eikon bei Überlastung bzw. Überschreitung des Zugriffslimits sendet
+ERROR_CODE_TOO_MANY_REQUESTS = 429
+ERROR_CODE_SERVER_ERROR = 500
+ERROR_CODE_TIMEOUT = 2504
+
+DEFAULT_ERROR_CODES = (ERROR_CODE_SERVER_ERROR, ERROR_CODE_TIMEOUT)
+
+class EikonStandIn:
+    def __init__(self, latency: float = 0.0, latency_per_instrument: float = 0.0, error_rate: float = 0.0, error_codes: tuple = DEFAULT_ERROR_CODES,
+        requests_per_second: Optional[int] = 5, unknown_rate: float = 0.0, seed: int = 0):
+        # latency: Antwortzeit je Anfrage in Sekunden, latency_per_instrument: zusätzliche Antwortzeit je abgefragtem Instrument
+        # error_rate: Anteil der Anfragen, die mit einem EikonError (einer der error_codes) beantwortet werden
+        # requests_per_second: Zugriffslimit; darüber hinausgehende Anfragen werden mit Fehlercode 429 abgelehnt (None: kein Limit)
+        # unknown_rate: Anteil der LEIs, zu denen keine ISIN (und damit keine Unternehmensdaten) geliefert wird
+        self.latency = latency
+        self.latency_per_instrument = latency_per_instrument
+        self.error_rate = error_rate
+        self.error_codes = error_codes
+        self.requests_per_second = requests_per_second
+        self.unknown_rate = unknown_rate
+
+        self.EikonError = EikonError
+
+        self.app_key = None
+
+        self.calls = 0
+        self.instruments = 0
+        self.errors = 0
+        self.rate_limit_errors = 0
+
+        self._random = random.Random(seed)
+        self._seed = seed
+        self._requests = deque()
+        self._lock = threading.Lock()
+
+    def set_app_key(self, app_key: str):
+        self.app_key = app_key
+
+    def TR_Field(self, field_name: str, params: Optional[Dict] = None, sort_dir: Optional[str] = None, sort_priority: Optional[int] = None) -> Dict:
+        # Aufbau wie bei eikon.TR_Field: {"TR.F.TotAssets": {"params": {...}}}
+        tr_field = {}
+
+        if params:
+            tr_field["params"] = params
+
+        if sort_dir is not None:
+            tr_field["sort_dir"] = sort_dir
+
+        if sort_priority is not None:
+            tr_field["sort_priority"] = sort_priority
+
+        return {field_name: tr_field}
+
+    def get_data(self, instruments: Union[str, List[str]], fields: Union[str, Dict, List], parameters: Optional[Dict] = None, field_name: bool = False, raw_output: bool = False, debug: bool = False):
+        instruments = [instruments] if isinstance(instruments, str) else list(instruments)
+        fields = fields if isinstance(fields, list) else [fields]
+
+        with self._lock:
+            self.calls += 1
+            self.instruments += len(instruments)
+
+            now = time.monotonic()
+
+            while self._requests and now - self._requests[0] >= 1:
+                self._requests.popleft()
+
+            if self.requests_per_second is not None and len(self._requests) >= self.requests_per_second:
+                self.errors += 1
+                self.rate_limit_errors += 1
+
+                raise EikonError(ERROR_CODE_TOO_MANY_REQUESTS, "Too many requests, please try again later.")
+
+            self._requests.append(now)
+
+            inject_error = self._random.random() < self.error_rate
+            error_code = self._random.choice(self.error_codes) if inject_error else None
+
+        time.sleep(self.latency + self.latency_per_instrument * len(instruments))
+
+        if inject_error:
+            with self._lock:
+                self.errors += 1
+
+            raise EikonError(error_code, "Simulated error (stand-in).")
+
+        columns = ["Instrument"] + [_field_name(field) for field in fields]
+        rows = [[instrument] + [self._value(instrument, field, parameters or {}) for field in fields] for instrument in instruments]
+
+        return pd.DataFrame(rows, columns=columns), None
+
+    def statistics(self) -> Dict[str, int]:
+        return {"calls": self.calls, "instruments": self.instruments, "errors": self.errors, "rate_limit_errors": self.rate_limit_errors}
+
+    def _value(self, instrument: str, field: Union[str, Dict], parameters: Dict):
+        name = _field_name(field).upper()
+
+        # Instrumente der Form "<LEI>@LEI" liefern nur die ISIN; unbekannte LEIs liefern keine Werte.
+        if instrument.upper().endswith("@LEI"):
+            if name != "TR.ISIN" or self._fraction(instrument, "unknown") < self.unknown_rate:
+                return pd.NA
+
+            return "XS" + self._digest(instrument, name)[:10].upper()
+
+        fraction = self._fraction(instrument, name + str(parameters.get("SDate", "")))
+
+        if name == "TR.COMMONNAME":
+            return "Company {}".format(self._digest(instrument, name)[:6].upper())
+
+        if name == "TR.TRBCECONOMICSECTOR":
+            return ("Industrials", "Financials", "Technology", "Consumer Cyclicals", "Basic Materials")[int(fraction * 5)]
+
+        if name == "TR.EXCHANGECOUNTRY":
+            return ("Germany", "France", "Italy", "Spain", "Netherlands", "Austria")[int(fraction * 6)]
+
+        if name == "TR.F.AUDITOR":
+            return ("KPMG", "PricewaterhouseCoopers", "Ernst & Young", "Deloitte", "BDO")[int(fraction * 5)]
+
+        if name == "TR.ORGFOUNDEDYEAR":
+            return 1850 + int(fraction * 170)
+
+        if name in ("TR.COMPANYNUMEMPLOY", "TR.NUMBEROFANALYSTS"):
+            return int(fraction * (100000 if name == "TR.COMPANYNUMEMPLOY" else 30))
+
+        if name == "TR.FREEFLOATPCT":
+            return round(fraction * 100, 2)
+
+        return round(fraction * 10000, 3)
+
+    def _digest(self, instrument: str, name: str) -> str:
+        return hashlib.sha1("{}|{}|{}".format(self._seed, instrument.upper(), name).encode("utf-8")).hexdigest()
+
+    def _fraction(self, instrument: str, name: str) -> float:
+        return int(self._digest(instrument, name)[:8], 16) / 0x100000000
+
+def _field_name(field: Union[str, Dict]) -> str:
+    return field if isinstance(field, str) else next(iter(field))
+
+_ek = None
+
+def install(stand_in: EikonStandIn) -> EikonStandIn:
+    # Ersetzt die Eikon Data API in eikon_database durch den Stand-in.
+    global _ek
+
+    import eikon_database
+
+    if _ek is None:
+        _ek = eikon_database.ek
+
+    eikon_database.ek = stand_in
+
+    return stand_in
+
+def uninstall():
+    global _ek
+
+    import eikon_database
+
+    if _ek is not None:
+        eikon_database.ek = _ek
+        _ek = None
@@ -0,0 +1,105 @@
+import hashlib
+import os
+import posixpath
+import zipfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+# Zugriff auf ESEF-Pakete, die als ZIP-Archiv im import-Ordner liegen, ohne sie auf den Datenträger zu entpacken. Die Berichts- und die
+# Taxonomiedatei werden über das zentrale Verzeichnis des Archivs ermittelt. Dateien im Archiv werden wie bei Arelle über die URL
+# "<Archiv>.zip/<Datei im Archiv>" adressiert, sodass Arelle den Bericht unmittelbar aus dem Archiv lädt (das Archiv ist zugleich das
+# Taxonomiepaket). Für die Stream-Engine und die Prüfsumme wird die Datei beim Lesen blockweise entpackt.
+
+ARCHIVE_EXTENSION = ".zip"
+
+# Größe der Blöcke beim Entpacken für die Berechnung der Prüfsumme
+CHUNK_SIZE = 1024 * 1024
+
+def is_archive(path: str) -> bool:
+    return path.lower().endswith(ARCHIVE_EXTENSION) and os.path.isfile(path)
+
+def get_package_name(file_name: str) -> str:
+    # Name des Pakets ohne Dateiendung des Archivs
+    if file_name.lower().endswith(ARCHIVE_EXTENSION):
+        return file_name[:-len(ARCHIVE_EXTENSION)]
+
+    return file_name
+
+def split_url(url: str) -> Optional[Tuple[str, str]]:
+    # Liefert für eine Datei im Archiv den Pfad des Archivs und den Namen der Datei im Archiv. Ein Ordner, dessen Name auf ".zip" endet
+    # (z.B. ein entpacktes Paket), ist kein Archiv; gesucht wird daher der erste Teilpfad, der eine ZIP-Datei ist.
+    index = url.lower().find(ARCHIVE_EXTENSION + "/")
+
+    while index >= 0:
+        path_archive = url[:index + len(ARCHIVE_EXTENSION)]
+
+        if is_archive(path_archive):
+            return path_archive, url[index + len(ARCHIVE_EXTENSION) + 1:]
+
+        index = url.lower().find(ARCHIVE_EXTENSION + "/", index + 1)
+
+    return None
+
+def get_path_on_disk(url: str) -> str:
+    # Datei auf dem Datenträger, die die angegebene Datei enthält (das Archiv bzw. die Datei selbst)
+    parts = split_url(url)
+
+    return parts[0] if parts is not None else url
+
+def find_files(path_archive: str) -> Tuple[str, str]:
+    # Sucht wie beim entpackten Paket nach der Berichts- und der Taxonomiedatei, allerdings nur im zentralen Verzeichnis des Archivs.
+    url_report_file = ""
+    url_taxonomy_package_file = ""
+
+    # Ein beschädigtes Archiv wird wie ein Paket ohne Berichts- bzw. Taxonomiedatei behandelt.
+    try:
+        archive = zipfile.ZipFile(path_archive)
+    except zipfile.BadZipFile:
+        return url_report_file, url_taxonomy_package_file
+
+    with archive:
+        for member in archive.infolist():
+            if member.is_dir():
+                continue
+
+            file = posixpath.basename(member.filename)
+
+            if ".xhtml" in file or ".html" in file:
+                url_report_file = "{}/{}".format(path_archive, member.filename).replace("\\", "/")
+
+            if "taxonomyPackage.xml" in file:
+                url_taxonomy_package_file = path_archive.replace("\\", "/")
+
+    return url_report_file, url_taxonomy_package_file
+
+def get_file_size(url: str) -> int:
+    parts = split_url(url)
+
+    if parts is None:
+        return os.path.getsize(url)
+
+    with zipfile.ZipFile(parts[0]) as archive:
+        return archive.getinfo(parts[1]).file_size
+
+@contextmanager
+def open_file(url: str) -> Iterator[BinaryIO]:
+    parts = split_url(url)
+
+    if parts is None:
+        with open(url, "rb") as file:
+            yield file
+
+        return
+
+    with zipfile.ZipFile(parts[0]) as archive, archive.open(parts[1]) as file:
+        yield file
+
+def calculate_checksum(url: str) -> str:
+    # SHA1-Prüfsumme einer Datei im Archiv, die beim Entpacken blockweise berechnet wird
+    sha1 = hashlib.sha1()
+
+    with open_file(url) as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            sha1.update(chunk)
+
+    return sha1.hexdigest()
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import random
+import shutil
+from typing import NamedTuple
+from xml.sax.saxutils import escape
+
+# Erzeugt synthetische ESEF-Pakete für Benchmarks der Verarbeitung (siehe benchmark_ingestion). Ein Paket hat den Aufbau eines Taxonomiepakets:
+#  <Paket>/META-INF/taxonomyPackage.xml
+#  <Paket>/www.<Unternehmen>.com/<Jahr>/<Unternehmen>-<Jahr>.xsd (Erweiterungstaxonomie)
+#  <Paket>/www.<Unternehmen>.com/<Jahr>/ifrs-full.xsd (Stellvertreter der Basistaxonomie mit dem Namensraum der IFRS-Taxonomie)
+#  <Paket>/reports/<Unternehmen>-<Jahr>.xhtml (Inline-XBRL-Bericht)
+#
+# Mit archive=True wird das Paket wie bei der Veröffentlichung als ZIP-Archiv (<Paket>.zip mit dem Ordner <Paket>) abgelegt.
+#
+# Die Basistaxonomie wird durch ein lokales Schema mit dem Namensraum der IFRS-Taxonomie ersetzt, damit die Pakete ohne Zugriff auf das Internet
+# von Arelle geladen werden können. Anzahl der Fakten, Anteil der Erweiterungselemente sowie Anzahl und Größe der Textblöcke sind konfigurierbar.
+
+NS_IFRS_FULL = "https://xbrl.ifrs.org/taxonomy/2021-03-24/ifrs-full"
+
+SCHEME_LEI = "http://standards.iso.org/iso/17442"
+
+# Anzahl unterschiedlicher Elemente je Taxonomie. Die Fakten verteilen sich auf diese Elemente.
+MAX_CONCEPTS = 500
+
+WORDS = ("Umsatzerlöse", "Konzern", "Geschäftsjahr", "Bilanz", "Rückstellungen", "Vermögenswerte", "Verbindlichkeiten", "Ergebnis", "Eigenkapital", "Abschreibungen", "Segment", "Leasing")
+
+class GeneratedPackage(NamedTuple):
+    name: str
+    path: str
+    lei: str
+    period_end: str
+    facts: int
+    ext_facts: int
+    text_blocks: int
+    size_bytes: int
+
+def generate_package(path_dir: str, index: int, facts: int = 1000, extension_share: float = 0.1, text_block_share: float = 0.05, text_block_bytes: int = 2000, year: int = 2021, seed: int = 0, archive: bool = False) -> GeneratedPackage:
+    # Der Inhalt eines Pakets hängt nur von seinem Index und dem Startwert ab, sodass wiederholte Läufe vergleichbar sind.
+    rnd = random.Random("{}-{}".format(seed, index))
+
+    lei = _generate_lei(seed, index)
+    company = "company{:05d}".format(index)
+    name = "{}-{}-12-31-DE".format(lei, year)
+    period_end = "{}1231".format(year)
+
+    path_package = os.path.join(path_dir, name)
+    path_taxonomy_dir = os.path.join(path_package, "www.{}.com".format(company), str(year))
+    path_meta_inf_dir = os.path.join(path_package, "META-INF")
+    path_reports_dir = os.path.join(path_package, "reports")
+
+    for path in (path_taxonomy_dir, path_meta_inf_dir, path_reports_dir):
+        os.makedirs(path, exist_ok=True)
+
+    # Der erste Fakt (Name des Unternehmens) dient der Identifizierung des Unternehmens und ist immer ein Element der Basistaxonomie.
+    facts = max(1, facts)
+    ext_facts = min(facts - 1, int(round(facts * extension_share)))
+    text_blocks = min(facts - 1, int(round(facts * text_block_share)))
+
+    count_base_concepts = min(MAX_CONCEPTS, max(1, facts - 1 - ext_facts))
+    count_ext_concepts = min(MAX_CONCEPTS, max(1, ext_facts))
+
+    _write(os.path.join(path_taxonomy_dir, "ifrs-full.xsd"), _base_schema(count_base_concepts))
+    _write(os.path.join(path_taxonomy_dir, "{}-{}.xsd".format(company, year)), _extension_schema(company, year, count_ext_concepts))
+    _write(os.path.join(path_meta_inf_dir, "taxonomyPackage.xml"), _taxonomy_package(company, year))
+
+    # Zufällige Reihenfolge der Fakten (Erweiterungselement und/oder Textblock), der Identifizierungsfakt steht am Anfang.
+    kinds = [(i < ext_facts, False) for i in range(facts - 1)]
+
+    for i in rnd.sample(range(facts - 1), text_blocks):
+        kinds[i] = (kinds[i][0], True)
+
+    rnd.shuffle(kinds)
+
+    path_report_file = os.path.join(path_reports_dir, "{}-{}.xhtml".format(company, year))
+
+    with open(path_report_file, "w", encoding="utf-8") as file:
+        file.write(_report_head(company, year, lei))
+        file.write("<p><ix:nonNumeric name=\"ifrs-full:NameOfReportingEntityOrOtherMeansOfIdentification\" contextRef=\"c1\">{} AG</ix:nonNumeric></p>\n".format(company.upper()))
+
+        for i, (is_extension, is_text_block) in enumerate(kinds):
+            prefix = "ext" if is_extension else "ifrs-full"
+            concept = rnd.randrange(count_ext_concepts if is_extension else count_base_concepts)
+
+            if is_text_block:
+                file.write("<div><ix:nonNumeric name=\"{}:TextBlock{}\" contextRef=\"c1\" escape=\"true\">{}</ix:nonNumeric></div>\n".format(prefix, concept, _text_block(rnd, text_block_bytes)))
+            else:
+                file.write("<p><ix:nonFraction name=\"{}:Amount{}\" contextRef=\"{}\" unitRef=\"eur\" decimals=\"-3\" scale=\"3\" format=\"ixt:num-dot-decimal\">{:,}</ix:nonFraction></p>\n".format(prefix, concept, "c1" if i % 2 else "c2", rnd.randrange(1, 10000000)))
+
+        file.write("</body></html>\n")
+
+    if archive:
+        path_archive = shutil.make_archive(path_package, "zip", path_dir, name)
+        shutil.rmtree(path_package)
+
+        return GeneratedPackage(name, path_archive, lei, period_end, facts, ext_facts, text_blocks, os.path.getsize(path_archive))
+
+    return GeneratedPackage(name, path_package, lei, period_end, facts, ext_facts, text_blocks, _size_of_dir(path_package))
+
+def _generate_lei(seed: int, index: int) -> str:
+    return hashlib.sha1("lei-{}-{}".format(seed, index).encode("utf-8")).hexdigest()[:20].upper()
+
+def _write(path: str, content: str):
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+def _size_of_dir(path_dir: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, file)) for root, dirs, files in os.walk(path_dir) for file in files)
+
+def _concepts(count: int, period_type: str = "duration") -> str:
+    elements = []
+
+    for i in range(count):
+        elements.append("<xsd:element name=\"Amount{0}\" id=\"Amount{0}\" type=\"xbrli:monetaryItemType\" substitutionGroup=\"xbrli:item\" xbrli:periodType=\"{1}\" nillable=\"true\"/>".format(i, period_type))
+        elements.append("<xsd:element name=\"TextBlock{0}\" id=\"TextBlock{0}\" type=\"nonnum:textBlockItemType\" substitutionGroup=\"xbrli:item\" xbrli:periodType=\"{1}\" nillable=\"true\"/>".format(i, period_type))
+
+    return "\n".join(elements)
+
+def _base_schema(count: int) -> str:
+    return """<?xml version="1.0" encoding="utf-8"?>
+<xsd:schema xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:xbrli="http://www.xbrl.org/2003/instance" xmlns:nonnum="http://www.xbrl.org/dtr/type/non-numeric" targetNamespace="{}" elementFormDefault="qualified">
+<xsd:import namespace="http://www.xbrl.org/2003/instance" schemaLocation="http://www.xbrl.org/2003/xbrl-instance-2003-12-31.xsd"/>
+<xsd:import namespace="http://www.xbrl.org/dtr/type/non-numeric" schemaLocation="http://www.xbrl.org/dtr/type/nonNumeric-2009-12-16.xsd"/>
+<xsd:element name="NameOfReportingEntityOrOtherMeansOfIdentification" id="ifrs-full_NameOfReportingEntityOrOtherMeansOfIdentification" type="xbrli:stringItemType" substitutionGroup="xbrli:item" xbrli:periodType="duration" nillable="true"/>
+{}
+</xsd:schema>
+""".format(NS_IFRS_FULL, _concepts(count))
+
+def _extension_schema(company: str, year: int, count: int) -> str:
+    return """<?xml version="1.0" encoding="utf-8"?>
+<xsd:schema xmlns:xsd="http://www.w3.org/2001/XMLSchema" xmlns:xbrli="http://www.xbrl.org/2003/instance" xmlns:nonnum="http://www.xbrl.org/dtr/type/non-numeric" targetNamespace="http://www.{0}.com/{1}" elementFormDefault="qualified">
+<xsd:import namespace="http://www.xbrl.org/2003/instance" schemaLocation="http://www.xbrl.org/2003/xbrl-instance-2003-12-31.xsd"/>
+<xsd:import namespace="http://www.xbrl.org/dtr/type/non-numeric" schemaLocation="http://www.xbrl.org/dtr/type/nonNumeric-2009-12-16.xsd"/>
+<xsd:import namespace="{2}" schemaLocation="ifrs-full.xsd"/>
+{3}
+</xsd:schema>
+""".format(company, year, NS_IFRS_FULL, _concepts(count))
+
+def _taxonomy_package(company: str, year: int) -> str:
+    return """<?xml version="1.0" encoding="utf-8"?>
+<tp:taxonomyPackage xmlns:tp="http://xbrl.org/2016/taxonomy-package" xml:lang="en">
+<tp:identifier>http://www.{0}.com/{1}</tp:identifier>
+<tp:name>{0}</tp:name>
+<tp:version>{1}</tp:version>
+<tp:entryPoints><tp:entryPoint><tp:name>{0}-{1}</tp:name><tp:entryPointDocument href="http://www.{0}.com/{1}/{0}-{1}.xsd"/></tp:entryPoint></tp:entryPoints>
+</tp:taxonomyPackage>
+""".format(company, year)
+
+def _report_head(company: str, year: int, lei: str) -> str:
+    return """<?xml version="1.0" encoding="utf-8"?>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:ix="http://www.xbrl.org/2013/inlineXBRL" xmlns:xbrli="http://www.xbrl.org/2003/instance" xmlns:link="http://www.xbrl.org/2003/linkbase" xmlns:xlink="http://www.w3.org/1999/xlink" xmlns:ifrs-full="{ns_ifrs}" xmlns:ext="http://www.{company}.com/{year}" xmlns:iso4217="http://www.xbrl.org/2003/iso4217" xmlns:ixt="http://www.xbrl.org/inlineXBRL/transformation/2020-02-12">
+<head><title>{company} {year}</title></head><body>
+<div style="display:none"><ix:header><ix:references><link:schemaRef xlink:type="simple" xlink:href="../www.{company}.com/{year}/{company}-{year}.xsd"/></ix:references><ix:resources>
+<xbrli:context id="c1"><xbrli:entity><xbrli:identifier scheme="{scheme}">{lei}</xbrli:identifier></xbrli:entity><xbrli:period><xbrli:startDate>{year}-01-01</xbrli:startDate><xbrli:endDate>{year}-12-31</xbrli:endDate></xbrli:period></xbrli:context>
+<xbrli:context id="c2"><xbrli:entity><xbrli:identifier scheme="{scheme}">{lei}</xbrli:identifier></xbrli:entity><xbrli:period><xbrli:startDate>{prev}-01-01</xbrli:startDate><xbrli:endDate>{prev}-12-31</xbrli:endDate></xbrli:period></xbrli:context>
+<xbrli:unit id="eur"><xbrli:measure>iso4217:EUR</xbrli:measure></xbrli:unit>
+</ix:resources></ix:header></div>
+""".format(ns_ifrs=NS_IFRS_FULL, company=company, year=year, prev=year - 1, scheme=SCHEME_LEI, lei=lei)
+
+def _text_block(rnd: random.Random, size_bytes: int) -> str:
+    # Textblock aus Absätzen mit zufälligen Wörtern in etwa der angegebenen Größe (in Bytes)
+    paragraphs = []
+    size = 0
+
+    while size < size_bytes:
+        paragraph = "<p>{}.</p>".format(escape(" ".join(rnd.choice(WORDS) for i in range(12))))
+        paragraphs.append(paragraph)
+        size += len(paragraph.encode("utf-8"))
+
+    return "".join(paragraphs)
@@ -0,0 +1,103 @@
+import glob
+import hashlib
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+import sample_store
+
+# Aufbereitung der Variablen für die Regressionsanalyse (Logarithmierung, Kennzahlen und Dummy-Variablen). Alle abgeleiteten Spalten werden in einem
+# Durchlauf berechnet und einmalig an das Sample angefügt. Das Ergebnis wird im Ordner "data" des Samples gespeichert und über eine Prüfsumme der
+# Eingangsspalten adressiert, sodass die Aufbereitung bei unverändertem Sample nicht erneut erfolgt.
+
+# Bei Änderungen an der Berechnung ist die Version zu erhöhen, damit gespeicherte Ergebnisse nicht mehr verwendet werden.
+FEATURES_VERSION = 1
+
+FEATURES_FILE_PREFIX = "features_"
+FEATURES_FILE_EXTENSION = ".pkl"
+
+# Spalten, die für die Aufbereitung benötigt werden
+INPUT_COLUMNS = ["ALL_TAGS", "PCT_EXT_TAGS", "SECTOR", "COUNTRY", "MARKET_CAP", "FREE_FLOAT", "AUDITOR", "AUDITOR_FEES", "EMPLOYEES", "FOUNDED", "ANALYSTS_FOLLOWING", "TOTAL_ASSETS", "TOTAL_DEBT", "INCOME", "TOTAL_ASSETS_T-1"]
+
+# Einträge mit leeren Zellen in diesen Spalten werden entfernt.
+REQUIRED_COLUMNS = ["COUNTRY", "SECTOR", "MARKET_CAP", "FREE_FLOAT", "AUDITOR", "FOUNDED", "TOTAL_ASSETS", "TOTAL_DEBT", "INCOME", "TOTAL_ASSETS_T-1"]
+
+FIN_SECTORS = ["Financials", "Real Estate"]
+BIG4 = ["EY", "Deloitte", "PWC", "KPMG"]
+
+def prepare(df: pd.DataFrame, path_features_dir: Optional[str] = None) -> pd.DataFrame:
+    # Mit Verzeichnis wird ein gespeichertes Ergebnis zu denselben Eingangsdaten wiederverwendet bzw. das neue Ergebnis gespeichert.
+    if path_features_dir is None:
+        return compute(df)
+
+    path_features_file = "{}/{}{}{}".format(path_features_dir, FEATURES_FILE_PREFIX, _hash_input(df), FEATURES_FILE_EXTENSION)
+
+    if os.path.exists(path_features_file):
+        try:
+            return pd.read_pickle(path_features_file)
+        except Exception:
+            pass
+
+    df_features = compute(df)
+
+    # Ergebnisse zu früheren Ständen des Samples werden entfernt.
+    for path in glob.glob("{}/{}*{}".format(glob.escape(path_features_dir), FEATURES_FILE_PREFIX, FEATURES_FILE_EXTENSION)):
+        os.remove(path)
+
+    path_features_tmp_file = path_features_file + ".tmp"
+
+    df_features.to_pickle(path_features_tmp_file)
+
+    os.replace(path_features_tmp_file, path_features_file)
+
+    return df_features
+
+def compute(df: pd.DataFrame) -> pd.DataFrame:
+    # Entfernt alle Einträge, die leere Zellen enthalten.
+    df = df.dropna(subset=REQUIRED_COLUMNS)
+
+    # Nach dem Entfernen der leeren Einträge nicht mehr vorkommende Ausprägungen der kategorialen Spalten würden von patsy als (leere) Dummy-Variablen berücksichtigt.
+    categories = {column: df[column].cat.remove_unused_categories() for column in sample_store.CATEGORICAL_COLUMNS if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype)}
+
+    def values(column: str) -> np.ndarray:
+        return df[column].to_numpy(dtype=np.float64)
+
+    total_assets = values("TOTAL_ASSETS")
+
+    # Die Verteilung der Variable MARKET_CAP (und weiterer Größenvariablen) ist rechtsschief. Die Logarithmierung kann die Verteilung normalisieren.
+    # Kennzahlen: ROA = Ergebnis / durchschnittliche Bilanzsumme, DEBT = Verschuldung / Bilanzsumme
+    roa = values("INCOME") / (0.5 * (values("TOTAL_ASSETS_T-1") + total_assets))
+    debt = values("TOTAL_DEBT") / total_assets
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        features = {
+            "log_PCT_EXT_TAGS": np.log(values("PCT_EXT_TAGS") + 1),
+            "log_MARKET_CAP": np.log(values("MARKET_CAP")),
+            "log_TOTAL_ASSETS": np.log(total_assets),
+            "log_AUDITOR_FEES": np.log(values("AUDITOR_FEES")),
+            "log_EMPLOYEES": np.log(values("EMPLOYEES") + 1),
+            "log_ALL_TAGS": np.log(values("ALL_TAGS") + 1),
+            "log_FREE_FLOAT": np.log(values("FREE_FLOAT") + 1),
+            "log_ANALYSTS_FOLLOWING": np.log(values("ANALYSTS_FOLLOWING") + 1),
+            # Dummy-Variable: Unternehmen der Sektoren "Financials" und "Real Estate"
+            "IS_FIN": df["SECTOR"].isin(FIN_SECTORS).to_numpy(),
+            "OLD_COMPANY": 2022 - values("FOUNDED") > 10,
+            "ROA": roa,
+            "DEBT": debt,
+            "log_ROA": np.log(roa + 1),
+            "log_DEBT": np.log(debt + 1),
+            # Abschlussprüfer, die nicht zu den Big-4 gehören, werden zusammengefasst.
+            "AUDITOR_AGG": np.where(df["AUDITOR"].isin(BIG4), df["AUDITOR"].astype(object), "Non Big-4").astype(object),
+        }
+
+    # Die abgeleiteten Spalten werden in einem Schritt angefügt (statt einer Kopie des Samples je Spalte).
+    return pd.concat([df.assign(**categories), pd.DataFrame(features, index=df.index)], axis=1)
+
+def _hash_input(df: pd.DataFrame) -> str:
+    sha1 = hashlib.sha1("{}|{}".format(FEATURES_VERSION, ",".join(INPUT_COLUMNS)).encode("utf-8"))
+
+    sha1.update(pd.util.hash_pandas_object(df[INPUT_COLUMNS], index=True).to_numpy().tobytes())
+
+    return sha1.hexdigest()
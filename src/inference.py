@@ -0,0 +1,148 @@
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.stats
+
+import defaults
+
+# Ergänzende Inferenz für die Regressionsmodelle: Bootstrap (Paare bzw. Cluster) und cluster-robuste Kovarianzmatrix (CR1, wie statsmodels mit
+# cov_type="cluster" und use_t=True). Für den Bootstrap werden alle Stichproben als Indizes gezogen und zu Häufigkeiten je Beobachtung (bzw. je
+# Cluster) gezählt. Eine Stichprobe entspricht damit einer Gewichtung w der Beobachtungen, sodass X'WX und X'Wy aller Stichproben eines Blocks mit
+# einer Matrixmultiplikation aus den vorab berechneten Produkten x_i x_i' bzw. x_i y_i folgen. Die Normalgleichungen werden anschließend gestapelt
+# gelöst. Die Stichproben werden in Blöcken verarbeitet, deren Größe den Speicherbedarf begrenzt.
+
+DEFAULT_SEED = defaults.BOOTSTRAP_SEED
+
+# Maximaler Speicherbedarf (Bytes) der Gewichte und Zwischenergebnisse eines Blocks von Stichproben
+MAX_CHUNK_BYTES = 64 * 1024 * 1024
+
+# Stichproben, deren Matrix X'WX (nahezu) singulär ist (z.B. fehlende Ausprägung einer Dummy-Variable), werden verworfen.
+MAX_CONDITION_NUMBER = 1e12
+
+class InferenceSettings(NamedTuple):
+    replications: int = 0
+    cluster: Optional[str] = None
+    seed: int = DEFAULT_SEED
+
+def is_enabled(settings: Optional[InferenceSettings]) -> bool:
+    return settings is not None and (settings.replications > 0 or settings.cluster is not None)
+
+def ols(X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Liefert die Koeffizienten, die Residuen und (X'X)^-1.
+    xtx_inv = np.linalg.pinv(X.T @ X)
+    beta = xtx_inv @ (X.T @ y)
+
+    return beta, y - X @ beta, xtx_inv
+
+def cluster_robust_cov(X: np.ndarray, residuals: np.ndarray, xtx_inv: np.ndarray, groups: np.ndarray) -> Tuple[np.ndarray, int]:
+    # Summe der Scores x_i u_i je Cluster
+    codes, count_groups = _factorize(groups)
+
+    scores = np.zeros((count_groups, X.shape[1]))
+    np.add.at(scores, codes, X * residuals[:, None])
+
+    n, k = X.shape
+
+    # Korrektur für eine kleine Anzahl an Clustern (CR1)
+    correction = count_groups / (count_groups - 1) * (n - 1) / (n - k)
+
+    return correction * xtx_inv @ (scores.T @ scores) @ xtx_inv, count_groups
+
+def bootstrap(X: np.ndarray, y: np.ndarray, replications: int, groups: Optional[np.ndarray] = None, seed: int = DEFAULT_SEED, max_chunk_bytes: int = MAX_CHUNK_BYTES) -> np.ndarray:
+    # Liefert die Koeffizienten je (verwertbarer) Stichprobe (replications x k). Mit Clustern werden ganze Cluster gezogen.
+    n, k = X.shape
+
+    rng = np.random.default_rng(seed)
+
+    # x_i x_i' und x_i y_i je Beobachtung (n x k², n x k)
+    xx = (X[:, :, None] * X[:, None, :]).reshape(n, k * k)
+    xy = X * y[:, None]
+
+    if groups is not None:
+        codes, count_units = _factorize(groups)
+    else:
+        codes, count_units = None, n
+
+    chunk_size = max(1, min(replications, max_chunk_bytes // (8 * (n + count_units + 2 * k * k))))
+
+    betas = []
+
+    for start in range(0, replications, chunk_size):
+        size = min(chunk_size, replications - start)
+
+        # Gezogene Beobachtungen bzw. Cluster (Ziehen mit Zurücklegen) als Indizes, gezählt zu Häufigkeiten je Stichprobe
+        indices = rng.integers(0, count_units, size=(size, count_units)) + (np.arange(size) * count_units)[:, None]
+        weights = np.bincount(indices.ravel(), minlength=size * count_units).reshape(size, count_units).astype(np.float64)
+
+        if codes is not None:
+            weights = weights[:, codes]
+
+        xtwx = (weights @ xx).reshape(size, k, k)
+        xtwy = weights @ xy
+
+        valid = np.linalg.cond(xtwx) < MAX_CONDITION_NUMBER
+
+        if valid.any():
+            betas.append(np.linalg.solve(xtwx[valid], xtwy[valid][:, :, None])[:, :, 0])
+
+    if not betas:
+        return np.empty((0, k))
+
+    return np.concatenate(betas)
+
+def analyze(X: pd.DataFrame, y: pd.DataFrame, settings: InferenceSettings, groups: Optional[pd.Series] = None) -> pd.DataFrame:
+    X_values = X.to_numpy(dtype=np.float64)
+    y_values = y.to_numpy(dtype=np.float64)[:, 0]
+
+    n, k = X_values.shape
+
+    beta, residuals, xtx_inv = ols(X_values, y_values)
+
+    df_inference = pd.DataFrame({"COEF": beta}, index=X.columns)
+
+    df_inference["OLS_STD_ERR"] = np.sqrt(np.diag(xtx_inv) * (residuals @ residuals) / (n - k))
+    df_inference.attrs["observations"] = n
+
+    group_values = None if groups is None else groups.to_numpy()
+
+    if group_values is not None:
+        cov, count_groups = cluster_robust_cov(X_values, residuals, xtx_inv, group_values)
+
+        std_err = np.sqrt(np.diag(cov))
+        t_values = beta / std_err
+        t_critical = scipy.stats.t.ppf(0.975, count_groups - 1)
+
+        df_inference.attrs["clusters"] = count_groups
+
+        df_inference["CLUSTER_STD_ERR"] = std_err
+        df_inference["CLUSTER_T"] = t_values
+        df_inference["CLUSTER_P"] = 2 * scipy.stats.t.sf(np.abs(t_values), count_groups - 1)
+        df_inference["CLUSTER_CI_LOWER"] = beta - t_critical * std_err
+        df_inference["CLUSTER_CI_UPPER"] = beta + t_critical * std_err
+
+    if settings.replications > 0:
+        betas = bootstrap(X_values, y_values, settings.replications, group_values, settings.seed)
+
+        df_inference["BOOT_STD_ERR"] = betas.std(axis=0, ddof=1) if len(betas) > 1 else np.nan
+        df_inference["BOOT_CI_LOWER"] = np.percentile(betas, 2.5, axis=0) if len(betas) else np.nan
+        df_inference["BOOT_CI_UPPER"] = np.percentile(betas, 97.5, axis=0) if len(betas) else np.nan
+        df_inference.attrs["replications"] = len(betas)
+
+    return df_inference
+
+def describe(df_inference: pd.DataFrame, settings: InferenceSettings) -> str:
+    lines = ["Beobachtungen: {}".format(df_inference.attrs.get("observations"))]
+
+    if settings.cluster is not None:
+        lines.append("Cluster-robuste Standardfehler (CR1) nach {}: {} Cluster".format(settings.cluster, df_inference.attrs.get("clusters")))
+
+    if settings.replications > 0:
+        lines.append("Bootstrap ({}): {} von {} Stichproben verwertbar, Startwert {}".format("Cluster nach {}".format(settings.cluster) if settings.cluster is not None else "Paare", df_inference.attrs.get("replications", 0), settings.replications, settings.seed))
+
+    return "\n".join(lines)
+
+def _factorize(groups: np.ndarray) -> Tuple[np.ndarray, int]:
+    codes, uniques = pd.factorize(groups)
+
+    return codes, len(uniques)
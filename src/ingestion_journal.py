@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Journal (write-ahead log) für das Einlesen neuer ESEF-Pakete. Je Paket wird jeder abgeschlossene Verarbeitungsschritt mit dem Zustand und dem
+# Bericht als JSON-Zeile angehängt und auf den Datenträger geschrieben, bevor der nächste Schritt beginnt:
+#
+#   parsed    Die Tags wurden gelesen (vor dem Verschieben des Pakets aus dem import-Ordner).
+#   enriched  Die Unternehmensdaten wurden aus Refinitiv Eikon abgerufen.
+#   stored    Der Bericht wurde in den Datenspeicher des Samples übernommen.
+#
+# Bricht ein Lauf ab, wird er mit --resume ab dem letzten gespeicherten Zustand je Paket fortgesetzt, ohne Pakete erneut zu lesen bzw. Daten erneut
+# abzurufen. Maßgeblich ist je Bericht (SHA1-Prüfsumme) die letzte Zeile. Eine unvollständige letzte Zeile (Abbruch während des Schreibens) wird
+# beim Lesen abgeschnitten, damit die folgenden Zeilen nicht an sie angehängt werden. Sind alle Berichte gespeichert, wird das Journal entfernt.
+
+JOURNAL_FILE_NAME = "ingestion_journal.jsonl"
+
+STATE_PARSED = "parsed"
+STATE_ENRICHED = "enriched"
+STATE_STORED = "stored"
+STATES = (STATE_PARSED, STATE_ENRICHED, STATE_STORED)
+
+def get_path_journal_file(path_sample_dir: str) -> str:
+    return "{}/{}".format(path_sample_dir, JOURNAL_FILE_NAME)
+
+class IngestionJournal:
+    def __init__(self, path_journal_file: str):
+        self.path_journal_file = path_journal_file
+
+        # Letzter Zustand und Bericht je SHA1-Prüfsumme in der Reihenfolge, in der die Berichte erstmals gelesen wurden
+        self._entries: Dict[str, dict] = self._load()
+
+        # Die Einträge können aus mehreren Threads geschrieben werden (nebenläufiger Abruf der Unternehmensdaten).
+        self._lock = threading.Lock()
+
+    def __contains__(self, sha1: str) -> bool:
+        return sha1 in self._entries
+
+    def state(self, sha1: str) -> Optional[str]:
+        entry = self._entries.get(sha1)
+
+        return entry["state"] if entry is not None else None
+
+    def pending(self) -> int:
+        # Anzahl der Berichte, die noch nicht in den Datenspeicher übernommen wurden
+        return sum(1 for entry in self._entries.values() if entry["state"] != STATE_STORED)
+
+    def reports(self, state: str) -> List[list]:
+        return [entry["report"] for entry in self._entries.values() if entry["state"] == state]
+
+    def record(self, sha1: str, state: str, esef_package_name: str, report: Optional[list] = None):
+        if state not in STATES:
+            raise ValueError("Unbekannter Zustand \"{}\" im Journal.".format(state))
+
+        with self._lock:
+            if report is None:
+                report = self._entries.get(sha1, {}).get("report")
+
+            self._append([{"sha1": sha1, "state": state, "package": esef_package_name, "report": [_to_json_value(value) for value in report] if report is not None else None}])
+
+    def record_many(self, sha1_checksums: List[str], state: str):
+        # Übernimmt den Bericht der vorhandenen Einträge. Alle Zeilen werden gemeinsam geschrieben und nur einmal auf den Datenträger übertragen.
+        if state not in STATES:
+            raise ValueError("Unbekannter Zustand \"{}\" im Journal.".format(state))
+
+        with self._lock:
+            self._append([{"sha1": sha1, "state": state, "package": self._entries[sha1]["package"], "report": self._entries[sha1]["report"]} for sha1 in sha1_checksums])
+
+    def clear(self):
+        # Entfernt das Journal, sobald alle Berichte gespeichert sind.
+        with self._lock:
+            self._entries = {}
+
+            if os.path.exists(self.path_journal_file):
+                os.remove(self.path_journal_file)
+
+    def _append(self, entries: List[dict]):
+        if not entries:
+            return
+
+        with open(self.path_journal_file, "a", encoding="utf-8") as file:
+            file.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            file.flush()
+            os.fsync(file.fileno())
+
+        # Der Eintrag wird an der ursprünglichen Position gehalten, damit die Reihenfolge der Berichte im Sample erhalten bleibt.
+        for entry in entries:
+            self._entries[entry["sha1"]] = entry
+
+    def _load(self) -> Dict[str, dict]:
+        entries = {}
+
+        # Position hinter der letzten vollständigen Zeile
+        size_complete = 0
+
+        try:
+            with open(self.path_journal_file, "rb+") as file:
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        file.truncate(size_complete)
+                        break
+
+                    size_complete += len(line)
+
+                    try:
+                        entry = json.loads(line.decode("utf-8"))
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        continue
+
+                    entries[entry["sha1"]] = entry
+        except FileNotFoundError:
+            pass
+
+        return entries
+
+def _to_json_value(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        value = value.item()
+
+    if value is None or (not isinstance(value, str) and pd.isnull(value)):
+        return None
+
+    return value
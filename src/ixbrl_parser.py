@@ -0,0 +1,200 @@
+import re
+import xml.etree.ElementTree as ET
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Union
+
+# Schlanker Parser für Inline-XBRL-Berichte (iXBRL), der die Berichtsdatei inkrementell (Stream) liest, ohne die DTS und die Taxonomiepakete zu laden.
+# Es werden nur die Informationen erfasst, die für das Zählen der Tags benötigt werden: der qualifizierte Name und der Wert eines Fakts sowie
+# die Kontexte (Identifier des Unternehmens und Periodenende).
+
+NS_IX = "http://www.xbrl.org/2013/inlineXBRL"
+NS_XBRLI = "http://www.xbrl.org/2003/instance"
+NS_XSI = "http://www.w3.org/2001/XMLSchema-instance"
+
+TAG_NON_FRACTION = "{{{}}}nonFraction".format(NS_IX)
+TAG_NON_NUMERIC = "{{{}}}nonNumeric".format(NS_IX)
+TAG_CONTINUATION = "{{{}}}continuation".format(NS_IX)
+TAG_EXCLUDE = "{{{}}}exclude".format(NS_IX)
+TAG_CONTEXT = "{{{}}}context".format(NS_XBRLI)
+TAG_IDENTIFIER = "{{{}}}identifier".format(NS_XBRLI)
+TAG_END_DATE = "{{{}}}endDate".format(NS_XBRLI)
+TAG_INSTANT = "{{{}}}instant".format(NS_XBRLI)
+
+ATTR_NIL = "{{{}}}nil".format(NS_XSI)
+
+# Namensraumdeklarationen, die ElementTree bei der Ausgabe jedes Unterelements eines Textblocks ergänzt. Arelle entfernt diese aus dem Wert.
+XMLNS_PATTERN = re.compile(r"\s*xmlns(:[\w.-]+)?=\"[^\"]*\"")
+
+# Verhindert künstliche Präfixe (html:p) bei der Ausgabe von Textblöcken.
+ET.register_namespace("", "http://www.w3.org/1999/xhtml")
+
+class InlineFact(NamedTuple):
+    qname: str
+    value: str
+    context_ref: str
+
+class InlineContext(NamedTuple):
+    entity_scheme: str
+    entity_identifier: str
+    end_date: Optional[date]
+
+def iter_inline_facts(report_file: Union[str, BinaryIO], contexts: Dict[str, InlineContext]) -> Iterator[InlineFact]:
+    # Liefert die Fakten (ix:nonFraction und ix:nonNumeric) des Berichts (Pfad oder geöffnete Datei), sobald das jeweilige Element vollständig gelesen wurde.
+    # Die Kontexte werden während des Lesens in dem übergebenen Dict abgelegt und stehen daher erst nach dem vollständigen Durchlauf sicher zur Verfügung,
+    # da sich der ix:header an einer beliebigen Stelle des Dokuments befinden kann.
+
+    # Anzahl der aktuell geöffneten Elemente, deren Inhalt noch benötigt wird (Fakten, Fortsetzungen und Kontexte).
+    open_elements = 0
+
+    # Fakten, deren Wert in einem ix:continuation-Element fortgesetzt wird, können erst am Ende des Dokuments vollständig ermittelt werden.
+    continuations = {}
+    deferred_facts = []
+
+    for event, elem in ET.iterparse(report_file, events=("start", "end")):
+        tag = elem.tag
+
+        if event == "start":
+            if tag == TAG_NON_FRACTION or tag == TAG_NON_NUMERIC or tag == TAG_CONTINUATION or tag == TAG_CONTEXT:
+                open_elements += 1
+
+            continue
+
+        if tag == TAG_NON_FRACTION:
+            open_elements -= 1
+
+            yield InlineFact(elem.get("name", ""), _non_fraction_value(elem), elem.get("contextRef", ""))
+
+        elif tag == TAG_NON_NUMERIC:
+            open_elements -= 1
+
+            fact = InlineFact(elem.get("name", ""), _non_numeric_value(elem), elem.get("contextRef", ""))
+
+            if elem.get("continuedAt"):
+                deferred_facts.append((fact, elem.get("continuedAt"), _is_escaped(elem)))
+            else:
+                yield fact
+
+        elif tag == TAG_CONTINUATION:
+            open_elements -= 1
+
+            # Die Fortsetzung wird in beiden Formen abgelegt, da erst der fortgesetzte Fakt bestimmt, ob der Inhalt als HTML erhalten bleibt.
+            continuations[elem.get("id")] = ("".join(_inner_text(elem)), _inner_xml(elem), elem.get("continuedAt"))
+
+        elif tag == TAG_CONTEXT:
+            open_elements -= 1
+
+            contexts[elem.get("id")] = _read_context(elem)
+
+        # Elemente, die nicht mehr benötigt werden, werden sofort geleert, damit der Speicherbedarf unabhängig von der Größe des Berichts bleibt.
+        if open_elements == 0:
+            elem.clear()
+
+    for fact, continued_at, is_escaped in deferred_facts:
+        values = [fact.value]
+
+        # Schutz vor zyklischen Verweisen zwischen den Fortsetzungen
+        visited = set()
+
+        while continued_at and continued_at in continuations and continued_at not in visited:
+            visited.add(continued_at)
+
+            text, xml, continued_at = continuations[continued_at]
+            values.append(xml if is_escaped else text)
+
+        yield fact._replace(value="".join(values))
+
+def _read_context(elem: ET.Element) -> InlineContext:
+    entity_scheme = ""
+    entity_identifier = ""
+    end_date = None
+
+    identifier = elem.find(".//" + TAG_IDENTIFIER)
+
+    if identifier is not None:
+        entity_scheme = identifier.get("scheme", "")
+        entity_identifier = (identifier.text or "").strip()
+
+    period_end = elem.find(".//" + TAG_END_DATE)
+
+    if period_end is None:
+        period_end = elem.find(".//" + TAG_INSTANT)
+
+    if period_end is not None and period_end.text:
+        end_date = _parse_period_end(period_end.text.strip())
+
+    return InlineContext(entity_scheme, entity_identifier, end_date)
+
+def _parse_period_end(text: str) -> date:
+    # Entspricht der Behandlung durch Arelle: Ein Periodenende ohne Uhrzeit bezeichnet das Ende des Tages. Ein Periodenende mit Uhrzeit wird
+    # von Arelle unverändert übernommen und liegt daher nach Abzug eines Tages (siehe reporting._summarize_tags) auf dem Vortag.
+    if "T" in text:
+        return (datetime.fromisoformat(text.rstrip("Z")) - timedelta(days=1)).date()
+
+    return date.fromisoformat(text[:10])
+
+def _inner_text(elem: ET.Element) -> List[str]:
+    # Text eines Elements einschließlich aller Unterelemente, jedoch ohne den Inhalt von ix:exclude.
+    parts = [elem.text or ""]
+
+    for child in elem:
+        if child.tag != TAG_EXCLUDE:
+            parts.extend(_inner_text(child))
+
+        parts.append(child.tail or "")
+
+    return parts
+
+def _inner_xml(elem: ET.Element) -> str:
+    parts = [elem.text or ""]
+
+    for child in elem:
+        if child.tag != TAG_EXCLUDE:
+            tail = child.tail
+
+            child.tail = None
+            parts.append(XMLNS_PATTERN.sub("", ET.tostring(child, encoding="unicode")))
+            child.tail = tail
+
+        parts.append(child.tail or "")
+
+    return "".join(parts)
+
+def _is_escaped(elem: ET.Element) -> bool:
+    # Textblöcke (escape="true") enthalten HTML-Auszeichnungen, die als Teil des Werts erhalten bleiben.
+    return elem.get("escape") in ("true", "1")
+
+def _non_numeric_value(elem: ET.Element) -> str:
+    if elem.get(ATTR_NIL) == "true":
+        return ""
+
+    if _is_escaped(elem):
+        return _inner_xml(elem)
+
+    return "".join(_inner_text(elem))
+
+def _non_fraction_value(elem: ET.Element) -> str:
+    if elem.get(ATTR_NIL) == "true":
+        return ""
+
+    text = "".join(_inner_text(elem)).strip()
+
+    # Die Transformationsregeln (ixt:...) werden nur für die gebräuchlichen Zahlenformate nachgebildet.
+    number_format = elem.get("format", "").split(":")[-1]
+
+    if number_format in ("fixed-zero", "zerodash", "numdash", "fixed-empty"):
+        text = "0"
+    elif "comma-decimal" in number_format or "numcommadecimal" in number_format:
+        text = re.sub(r"[^0-9,]", "", text).replace(",", ".")
+    else:
+        text = re.sub(r"[^0-9.]", "", text)
+
+    try:
+        number = Decimal(text).scaleb(int(elem.get("scale", "0")))
+    except (InvalidOperation, ValueError):
+        return text
+
+    if elem.get("sign") == "-":
+        number = -number
+
+    return format(number, "f")
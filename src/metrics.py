@@ -0,0 +1,338 @@
+import bisect
+import json
+import math
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Messung der Laufzeit einzelner Stufen (Timer), Zähler (Counter) und Verteilungen (Histogramme) für das Einlesen der ESEF-Pakete und den Abruf
+# der Unternehmensdaten. Die Messwerte werden als Ereignisse erfasst und beim Leeren (flush) an die aktivierten Ausgaben (Sinks) übergeben:
+#  JsonLinesSink: Protokoll des Laufs, je Ereignis eine JSON-Zeile
+#  PrometheusTextfileSink: Zusammenfassung im Textformat des Prometheus Node Exporters (textfile collector)
+#  SummaryTableSink: Tabelle je Messgröße auf der Konsole am Ende des Laufs
+#
+# Ohne Aktivierung (enable) liefert timer() ein gemeinsames Objekt ohne Funktion und count()/observe() kehren sofort zurück, sodass die Messpunkte
+# im Code keinen nennenswerten Aufwand verursachen. In Worker-Prozessen werden die Ereignisse gesammelt (drain) und an den aufrufenden Prozess
+# zurückgegeben, der sie übernimmt (merge). Für die Zusammenfassungen am Ende des Laufs werden die Ereignisse nicht aufbewahrt, sondern beim
+# Leeren je Messgröße zu laufenden Kennzahlen (_Aggregate) verdichtet, sodass der Speicherbedarf nicht mit der Anzahl der Ereignisse wächst.
+
+KIND_TIMER = "timer"
+KIND_COUNTER = "counter"
+KIND_HISTOGRAM = "histogram"
+
+SINK_JSONL = "jsonl"
+SINK_PROMETHEUS = "prometheus"
+SINK_SUMMARY = "summary"
+SINKS = (SINK_JSONL, SINK_PROMETHEUS, SINK_SUMMARY)
+
+METRICS_LOG_FILE_NAME = "metrics.jsonl"
+METRICS_PROMETHEUS_FILE_NAME = "metrics.prom"
+
+PROMETHEUS_PREFIX = "esef_"
+
+# Obergrenzen der Histogramm-Klassen für Laufzeiten (Sekunden) bzw. für sonstige Werte (z.B. Anzahl der Fakten, geschriebene Bytes)
+BUCKETS_SECONDS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+BUCKETS_VALUES = (1, 10, 100, 1000, 10000, 100000, 1000000, 10000000, 100000000)
+
+# Anzahl der Messwerte je Messgröße, die (als Zufallsstichprobe) für Median und 95%-Quantil der Zusammenfassung aufbewahrt werden
+SAMPLE_SIZE = 1000
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name: str, labels: Dict):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _record(KIND_TIMER, self.name, time.perf_counter() - self.start, self.labels)
+
+        return False
+
+class _Aggregate:
+    # Laufende Kennzahlen einer Messgröße: Anzahl, Summe, Maximum, Anzahl je Histogramm-Klasse und eine Stichprobe fester Größe (Reservoir Sampling)
+    __slots__ = ("kind", "count", "sum", "max", "bucket_counts", "sample", "_random")
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.count = 0
+        self.sum = 0
+        self.max = -math.inf
+        self.bucket_counts = [0] * (len(_buckets(kind)) + 1)
+        self.sample = []
+
+        self._random = random.Random(0)
+
+    def add(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+        if self.kind == KIND_COUNTER:
+            return
+
+        # Klasse mit der kleinsten Obergrenze >= value (die letzte Klasse nimmt alle größeren Werte auf)
+        self.bucket_counts[bisect.bisect_left(_buckets(self.kind), value)] += 1
+
+        if len(self.sample) < SAMPLE_SIZE:
+            self.sample.append(value)
+        else:
+            index = self._random.randrange(self.count)
+
+            if index < SAMPLE_SIZE:
+                self.sample[index] = value
+
+    def cumulative_bucket_counts(self) -> List[Tuple[float, int]]:
+        # Anzahl der Werte <= Obergrenze je Klasse (wie in Prometheus)
+        counts = []
+        total = 0
+
+        for bucket, bucket_count in zip(_buckets(self.kind), self.bucket_counts):
+            total += bucket_count
+            counts.append((bucket, total))
+
+        return counts
+
+class JsonLinesSink:
+    def __init__(self, path_log_file: str):
+        self.path_log_file = path_log_file
+
+        # Die Ereignisse eines Laufs werden an das bestehende Protokoll angehängt.
+        self._file = open(path_log_file, "a", encoding="utf-8")
+
+    def emit(self, events: List[Dict]):
+        for event in events:
+            self._file.write(json.dumps(event, default=str) + "\n")
+
+        self._file.flush()
+
+    def close(self, aggregates: Dict[Tuple[str, str], _Aggregate]):
+        self._file.close()
+
+class PrometheusTextfileSink:
+    def __init__(self, path_prometheus_file: str):
+        self.path_prometheus_file = path_prometheus_file
+
+    def emit(self, events: List[Dict]):
+        pass
+
+    def close(self, aggregates: Dict[Tuple[str, str], _Aggregate]):
+        lines = []
+
+        for (kind, name), aggregate in sorted(aggregates.items()):
+            metric = PROMETHEUS_PREFIX + name.replace(".", "_").replace("-", "_")
+
+            if kind == KIND_COUNTER:
+                lines.append("# TYPE {}_total counter".format(metric))
+                lines.append("{}_total {}".format(metric, _format_number(aggregate.sum)))
+
+                continue
+
+            if kind == KIND_TIMER:
+                metric += "_seconds"
+
+            lines.append("# TYPE {} histogram".format(metric))
+
+            for bucket, bucket_count in aggregate.cumulative_bucket_counts():
+                lines.append("{}_bucket{{le=\"{}\"}} {}".format(metric, bucket, bucket_count))
+
+            lines.append("{}_bucket{{le=\"+Inf\"}} {}".format(metric, aggregate.count))
+            lines.append("{}_sum {}".format(metric, _format_number(aggregate.sum)))
+            lines.append("{}_count {}".format(metric, aggregate.count))
+
+        # Atomares Schreiben, damit der Node Exporter keine unvollständige Datei liest.
+        path_prometheus_tmp_file = self.path_prometheus_file + ".tmp"
+
+        with open(path_prometheus_tmp_file, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+
+        os.replace(path_prometheus_tmp_file, self.path_prometheus_file)
+
+class SummaryTableSink:
+    def emit(self, events: List[Dict]):
+        pass
+
+    def close(self, aggregates: Dict[Tuple[str, str], _Aggregate]):
+        if not aggregates:
+            return
+
+        print("\nMessung der Verarbeitungsstufen:\n")
+        print("\t{:<36}{:>10}{:>14}{:>12}{:>12}{:>12}{:>12}".format("Messgröße", "Anzahl", "Summe", "Mittel", "Median", "95%", "Max"))
+
+        for (kind, name), aggregate in sorted(aggregates.items(), key=lambda item: item[0][1]):
+            if kind == KIND_COUNTER:
+                print("\t{:<36}{:>10}{:>14}".format(name, aggregate.count, _format_number(aggregate.sum)))
+
+                continue
+
+            # Median und 95%-Quantil werden ab SAMPLE_SIZE Messwerten aus der Stichprobe geschätzt.
+            sample = sorted(aggregate.sample)
+            unit = " s" if kind == KIND_TIMER else ""
+
+            print("\t{:<36}{:>10}{:>14}{:>12}{:>12}{:>12}{:>12}".format(
+                name + unit,
+                aggregate.count,
+                _format_number(aggregate.sum),
+                _format_number(aggregate.sum / aggregate.count),
+                _format_number(_percentile(sample, 0.5)),
+                _format_number(_percentile(sample, 0.95)),
+                _format_number(aggregate.max)))
+
+_enabled = False
+_sinks = []
+
+# Noch nicht an die Ausgaben übergebene Ereignisse und die laufenden Kennzahlen je (Art, Messgröße) für die Zusammenfassungen am Ende
+_pending = []
+_aggregates = {}
+
+_run_id = None
+_lock = threading.Lock()
+
+def enable(sinks: List):
+    global _enabled, _sinks, _pending, _aggregates, _run_id
+
+    _enabled = True
+    _sinks = list(sinks)
+    _pending = []
+    _aggregates = {}
+    _run_id = time.strftime("%Y%m%d%H%M%S") + "-{}".format(os.getpid())
+
+def enable_in_worker():
+    # Aktiviert die Erfassung in einem Worker-Prozess ohne Ausgaben. Die Ereignisse werden über drain() an den aufrufenden Prozess übergeben.
+    # Vom aufrufenden Prozess geerbte (fork) Ereignisse und Ausgaben werden verworfen, damit sie nicht doppelt übergeben werden.
+    global _enabled, _sinks, _pending, _aggregates
+
+    _enabled = True
+    _sinks = []
+    _pending = []
+    _aggregates = {}
+
+def is_enabled() -> bool:
+    return _enabled
+
+def timer(name: str, **labels):
+    if not _enabled:
+        return _NULL_TIMER
+
+    return _Timer(name, labels)
+
+def elapsed(name: str, seconds: float, **labels):
+    # Erfasst eine außerhalb von timer() gemessene Laufzeit.
+    if _enabled:
+        _record(KIND_TIMER, name, seconds, labels)
+
+def count(name: str, value: float = 1, **labels):
+    if _enabled:
+        _record(KIND_COUNTER, name, value, labels)
+
+def observe(name: str, value: float, **labels):
+    if _enabled:
+        _record(KIND_HISTOGRAM, name, value, labels)
+
+def drain() -> List[Dict]:
+    global _pending
+
+    with _lock:
+        events, _pending = _pending, []
+
+    return events
+
+def merge(events: Optional[List[Dict]]):
+    if not _enabled or not events:
+        return
+
+    # Ereignisse aus Worker-Prozessen werden dem aktuellen Lauf zugeordnet.
+    for event in events:
+        event["run"] = _run_id
+
+    with _lock:
+        _pending.extend(events)
+
+def flush():
+    if not _enabled:
+        return
+
+    events = drain()
+
+    if not events:
+        return
+
+    # Die Zusammenfassungen erfolgen je Messgröße über alle Pakete bzw. Berichte hinweg (ohne Labels).
+    with _lock:
+        for event in events:
+            key = (event["kind"], event["name"])
+
+            if key not in _aggregates:
+                _aggregates[key] = _Aggregate(event["kind"])
+
+            _aggregates[key].add(event["value"])
+
+    for sink in _sinks:
+        sink.emit(events)
+
+def close():
+    global _enabled
+
+    if not _enabled:
+        return
+
+    flush()
+
+    for sink in _sinks:
+        sink.close(_aggregates)
+
+    _enabled = False
+
+def create_sinks(sink_names: List[str], path_dir: str) -> List:
+    sinks = []
+
+    for sink_name in sink_names:
+        if sink_name == SINK_JSONL:
+            sinks.append(JsonLinesSink("{}/{}".format(path_dir, METRICS_LOG_FILE_NAME)))
+        elif sink_name == SINK_PROMETHEUS:
+            sinks.append(PrometheusTextfileSink("{}/{}".format(path_dir, METRICS_PROMETHEUS_FILE_NAME)))
+        elif sink_name == SINK_SUMMARY:
+            sinks.append(SummaryTableSink())
+
+    return sinks
+
+def _record(kind: str, name: str, value: float, labels: Dict):
+    event = {"run": _run_id, "time": time.time(), "pid": os.getpid(), "kind": kind, "name": name, "value": value}
+
+    if labels:
+        event["labels"] = labels
+
+    with _lock:
+        _pending.append(event)
+
+def _buckets(kind: str) -> Tuple:
+    return BUCKETS_SECONDS if kind == KIND_TIMER else BUCKETS_VALUES
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    index = (len(sorted_values) - 1) * q
+    lower = math.floor(index)
+    upper = math.ceil(index)
+
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (index - lower)
+
+def _format_number(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+
+    return "{:.4f}".format(value)
@@ -0,0 +1,76 @@
+import json
+import os
+from typing import Dict, Optional
+
+import esef_archive
+
+# Persistentes Manifest der ESEF-Pakete im import-Ordner. Je Paket werden die gefundene Berichts- und Taxonomiedatei sowie die SHA1-Prüfsumme
+# der Berichtsdatei zusammen mit Größe und Änderungszeitpunkt (mtime) abgelegt. Bei einem erneuten Durchlauf entfallen für unveränderte Pakete
+# sowohl das Durchsuchen des Verzeichnisses als auch die Berechnung der Prüfsumme. Für ein Paket als ZIP-Archiv sind Größe und Änderungszeitpunkt
+# die des Archivs.
+
+MANIFEST_FILE_NAME = "manifest.json"
+
+MANIFEST_VERSION = 1
+
+def get_path_manifest_file(path_sample_dir: str) -> str:
+    return "{}/{}".format(path_sample_dir, MANIFEST_FILE_NAME)
+
+def load(path_manifest_file: str) -> Dict[str, dict]:
+    try:
+        with open(path_manifest_file, "r") as file:
+            manifest = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+    # Ein Manifest in einem veralteten Format wird verworfen und neu aufgebaut.
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+
+    return manifest.get("packages", {})
+
+def save(path_manifest_file: str, packages: Dict[str, dict]):
+    # Atomares Schreiben über eine temporäre Datei, damit ein Abbruch kein unvollständiges Manifest hinterlässt.
+    path_manifest_tmp_file = path_manifest_file + ".tmp"
+
+    with open(path_manifest_tmp_file, "w") as file:
+        json.dump({"version": MANIFEST_VERSION, "packages": packages}, file, indent=4)
+
+    os.replace(path_manifest_tmp_file, path_manifest_file)
+
+def create_entry(path_esef_package: str, url_report_file: str, url_taxonomy_package_file: str, report_sha1_checksum: str) -> dict:
+    stat_package = os.stat(path_esef_package)
+    stat_report = os.stat(esef_archive.get_path_on_disk(url_report_file))
+
+    return {
+        "package_mtime": stat_package.st_mtime_ns,
+        "report_file": url_report_file,
+        "report_size": stat_report.st_size,
+        "report_mtime": stat_report.st_mtime_ns,
+        "taxonomy_package_file": url_taxonomy_package_file,
+        "sha1": report_sha1_checksum,
+    }
+
+def lookup(packages: Dict[str, dict], path_esef_package: str) -> Optional[dict]:
+    # Liefert den Eintrag nur, wenn sich weder das Paketverzeichnis noch die Berichtsdatei seit der Erfassung verändert haben.
+    entry = packages.get(path_esef_package)
+
+    if entry is None:
+        return None
+
+    try:
+        stat_package = os.stat(path_esef_package)
+        stat_report = os.stat(esef_archive.get_path_on_disk(entry["report_file"]))
+    except (OSError, KeyError):
+        return None
+
+    if stat_package.st_mtime_ns != entry.get("package_mtime"):
+        return None
+
+    if stat_report.st_size != entry.get("report_size") or stat_report.st_mtime_ns != entry.get("report_mtime"):
+        return None
+
+    if not os.path.isfile(esef_archive.get_path_on_disk(entry.get("taxonomy_package_file", ""))):
+        return None
+
+    return entry
@@ -0,0 +1,235 @@
+import multiprocessing
+import multiprocessing.connection
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, NamedTuple, Optional
+
+import metrics
+
+# Überwachte Worker-Prozesse für das Lesen der ESEF-Pakete. Jedes Paket wird isoliert in einem Kindprozess gelesen, der die Pakete einzeln über
+# eine Pipe erhält. Der aufrufende Prozess überwacht währenddessen je Kindprozess:
+#
+#   Zeitlimit    Die Bearbeitung eines Pakets dauert länger als timeout_s Sekunden (z.B. hängt ModelManager.load).
+#   Speicher     Der Kindprozess belegt mehr als memory_mb Arbeitsspeicher (RSS, über /proc/<pid>/statm).
+#   Absturz      Der Kindprozess endet während der Bearbeitung (z.B. Segmentation Fault oder OOM-Killer).
+#   Fehler       Die Bearbeitung eines Pakets löst im Kindprozess eine Exception aus.
+#
+# In diesen Fällen wird der Kindprozess beendet und für das Paket ein TaskKilled mit dem Grund geliefert. Der nächste Auftrag startet einen neuen
+# Kindprozess, sodass ein einzelnes fehlerhaftes Paket die übrigen Pakete nicht aufhält. Nach erfolgreichen Paketen wird der Kindprozess
+# weiterverwendet (z.B. mit dem Cache der Basistaxonomie) und nur nach max_tasks_per_child Paketen bzw. ab max_rss_mb Arbeitsspeicher erneuert.
+#
+# Ohne /proc (z.B. unter Windows) kann der Arbeitsspeicher nicht überwacht werden (siehe is_memory_monitoring_supported).
+
+# Intervall (s), in dem Zeitlimit und Arbeitsspeicher der Kindprozesse geprüft werden
+POLL_INTERVAL = 0.1
+
+REASON_TIMEOUT = "timeout"
+REASON_MEMORY = "memory"
+REASON_CRASH = "crash"
+REASON_ERROR = "error"
+
+class TaskKilled(NamedTuple):
+    reason: str
+    message: str
+
+class _Child:
+    def __init__(self):
+        self.process: Optional[multiprocessing.Process] = None
+        self.connection: Optional[multiprocessing.connection.Connection] = None
+        self.tasks = 0
+
+        # Index und Beginn des laufenden Auftrags
+        self.index: Optional[int] = None
+        self.start_time = 0.0
+
+class SupervisedPool:
+    def __init__(self, workers: int, initializer: Optional[Callable] = None, initargs: tuple = (), timeout_s: float = 0, memory_mb: float = 0, max_tasks_per_child: int = 0, max_rss_mb: float = 0):
+        self.initializer = initializer
+        self.initargs = initargs
+        self.timeout_s = timeout_s
+        self.memory_mb = memory_mb
+        self.max_tasks_per_child = max_tasks_per_child
+        self.max_rss_mb = max_rss_mb
+
+        self._children = [_Child() for i in range(workers)]
+
+    def __enter__(self) -> "SupervisedPool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Bei einer Unterbrechung (z.B. KeyboardInterrupt) werden laufende Kindprozesse sofort beendet.
+        self.shutdown(wait=exc_type is None)
+
+    def map(self, function: Callable, *iterables: Iterable) -> Iterator[Any]:
+        # Wie ProcessPoolExecutor.map: Die Ergebnisse werden in der Reihenfolge der Argumente geliefert, für beendete Aufträge ein TaskKilled.
+        arguments = list(zip(*iterables))
+
+        results: Dict[int, Any] = {}
+        index_next_task = 0
+        index_next_result = 0
+
+        while index_next_result < len(arguments):
+            for child in self._children:
+                if child.index is None and index_next_task < len(arguments):
+                    self._start_task(child, index_next_task, function, arguments[index_next_task])
+                    index_next_task += 1
+
+            while index_next_result in results:
+                yield results.pop(index_next_result)
+                index_next_result += 1
+
+            busy_children = [child for child in self._children if child.index is not None]
+
+            if not busy_children:
+                continue
+
+            multiprocessing.connection.wait([child.connection for child in busy_children] + [child.process.sentinel for child in busy_children], timeout=POLL_INTERVAL)
+
+            for child in busy_children:
+                self._check_child(child, results)
+
+    def shutdown(self, wait: bool = True):
+        for child in self._children:
+            self._stop_child(child, kill=not wait or child.index is not None)
+
+    def _start_task(self, child: _Child, index: int, function: Callable, arguments: tuple):
+        if child.process is None:
+            self._start_child(child)
+
+        child.index = index
+        child.start_time = time.time()
+        child.connection.send((function, arguments))
+
+    def _check_child(self, child: _Child, results: Dict[int, Any]):
+        index = child.index
+
+        # Die Pipe ist auch lesbar, wenn der Kindprozess beendet wurde (EOF).
+        if child.connection.poll():
+            try:
+                is_success, result = child.connection.recv()
+            except (EOFError, OSError):
+                self._kill_task(child, results, REASON_CRASH, "Der Worker-Prozess wurde beim Lesen unerwartet beendet (Exit-Code {}).".format(self._get_exit_code(child)))
+                return
+
+            # Nach einer Exception ist der Zustand des Kindprozesses (z.B. von Arelle) ungewiss, daher wird er wie bei den übrigen Fehlern ersetzt.
+            if not is_success:
+                self._kill_task(child, results, REASON_ERROR, result)
+                return
+
+            results[index] = result
+
+            child.index = None
+            child.tasks += 1
+
+            self._recycle_child(child)
+            return
+
+        if not child.process.is_alive():
+            self._kill_task(child, results, REASON_CRASH, "Der Worker-Prozess wurde beim Lesen unerwartet beendet (Exit-Code {}).".format(self._get_exit_code(child)))
+            return
+
+        duration = time.time() - child.start_time
+
+        if self.timeout_s > 0 and duration > self.timeout_s:
+            self._kill_task(child, results, REASON_TIMEOUT, "Zeitlimit von {:.0f} s überschritten.".format(self.timeout_s))
+            return
+
+        if self.memory_mb > 0:
+            rss_mb = get_rss_mb(child.process.pid)
+
+            if rss_mb > self.memory_mb:
+                self._kill_task(child, results, REASON_MEMORY, "Speicherlimit von {:.0f} MB überschritten ({:.0f} MB nach {:.0f} s).".format(self.memory_mb, rss_mb, duration))
+
+    def _kill_task(self, child: _Child, results: Dict[int, Any], reason: str, message: str):
+        results[child.index] = TaskKilled(reason, message)
+
+        metrics.count("ingestion.packages_killed", reason=reason)
+
+        self._stop_child(child, kill=True)
+
+    def _recycle_child(self, child: _Child):
+        # Erneuerung des Kindprozesses nach der angegebenen Anzahl an Paketen bzw. ab dem angegebenen Arbeitsspeicher
+        exceeds_tasks = self.max_tasks_per_child > 0 and child.tasks >= self.max_tasks_per_child
+        exceeds_rss = self.max_rss_mb > 0 and get_rss_mb(child.process.pid) > self.max_rss_mb
+
+        if exceeds_tasks or exceeds_rss:
+            print("\nWorker-Prozess {} wird nach {} Paket(en) erneuert.".format(child.process.pid, child.tasks))
+
+            metrics.count("ingestion.worker_recycles")
+
+            self._stop_child(child)
+
+    def _start_child(self, child: _Child):
+        connection_parent, connection_child = multiprocessing.Pipe()
+
+        child.process = multiprocessing.Process(target=_run_child, args=(connection_child, self.initializer, self.initargs), daemon=True)
+        child.process.start()
+
+        connection_child.close()
+
+        child.connection = connection_parent
+        child.tasks = 0
+
+    def _stop_child(self, child: _Child, kill: bool = False):
+        if child.process is None:
+            return
+
+        if kill:
+            child.process.kill()
+        else:
+            try:
+                child.connection.send(None)
+            except OSError:
+                child.process.kill()
+
+        child.process.join()
+        child.connection.close()
+
+        child.process = None
+        child.connection = None
+        child.index = None
+
+    def _get_exit_code(self, child: _Child) -> Optional[int]:
+        child.process.join(POLL_INTERVAL)
+
+        return child.process.exitcode
+
+def is_memory_monitoring_supported() -> bool:
+    return os.path.exists("/proc/self/statm")
+
+def get_rss_mb(pid: Optional[int] = None) -> float:
+    # Aktuell belegter Arbeitsspeicher (RSS) eines Prozesses in MB. Ohne /proc wird 0 geliefert.
+    try:
+        with open("/proc/{}/statm".format(pid if pid is not None else "self"), "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+def _run_child(connection: multiprocessing.connection.Connection, initializer: Optional[Callable], initargs: tuple):
+    try:
+        if initializer is not None:
+            initializer(*initargs)
+
+        while True:
+            try:
+                task = connection.recv()
+            except EOFError:
+                break
+
+            if task is None:
+                break
+
+            function, arguments = task
+
+            # Fehler werden als Text übergeben, da nicht jede Exception zwischen Prozessen übertragbar ist.
+            try:
+                message = (True, function(*arguments))
+            except Exception as e:
+                message = (False, "{}: {}".format(type(e).__name__, e))
+
+            connection.send(message)
+    except KeyboardInterrupt:
+        # Die Unterbrechung wird vom aufrufenden Prozess behandelt, der die Kindprozesse beendet.
+        pass
+    finally:
+        connection.close()
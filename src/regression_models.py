@@ -0,0 +1,194 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional, Tuple
+
+import yaml
+
+import pandas as pd
+import statsmodels
+import statsmodels.api as sm
+import patsy
+
+import defaults
+import inference
+import result_cache
+
+# Register der Regressionsmodelle. Die Modelle (Name, Regressionsgleichung, Ordner) werden in der Datei "models.yml" definiert und (ggf. parallel)
+# in Worker-Prozessen geschätzt. Je Modell wird eine Prüfsumme aus der Regressionsgleichung und den Daten gebildet. Stimmt diese mit der des letzten
+# Laufs überein und sind alle Ergebnisdateien vorhanden, wird das Modell nicht erneut geschätzt.
+
+PATH_MODELS_FILE = defaults.PATH_MODELS_FILE
+
+CACHE_FILE_NAME = "models_cache.json"
+
+# Bei Änderungen an der Schätzung bzw. den Ergebnisdateien ist die Version zu erhöhen, damit alle Modelle erneut geschätzt werden.
+MODELS_VERSION = 1
+
+class ModelSpec(NamedTuple):
+    name: str
+    formula: str
+    dir: str
+
+def load_specs(path_models_file: str = PATH_MODELS_FILE) -> List[ModelSpec]:
+    with open(path_models_file, "r", encoding="utf-8") as yml_file:
+        config = yaml.load(yml_file, Loader=yaml.Loader)
+
+    specs = []
+
+    for model in config.get("models", []):
+        if not model.get("name") or not model.get("formula"):
+            raise ValueError("Jedes Modell in \"{}\" benötigt einen Namen (name) und eine Regressionsgleichung (formula).".format(path_models_file))
+
+        specs.append(ModelSpec(str(model["name"]), str(model["formula"]), str(model.get("dir", model["name"]))))
+
+    names = [spec.name for spec in specs]
+
+    if len(names) != len(set(names)):
+        raise ValueError("Die Namen der Modelle in \"{}\" müssen eindeutig sein.".format(path_models_file))
+
+    return specs
+
+def get_paths_result_files(sample_name: str, model_name: str, path_model_dir: str) -> Tuple[str, str, str, str]:
+    # Dateipfade zur Speicherung der Korrelationsmatrix, der abhängigen Variable und der unabhängigen Variablen sowie des Ergebnisses (HTML und Text)
+    return (
+        path_model_dir + "/{}_{}_pearson.xlsx".format(model_name, sample_name),
+        path_model_dir + "/{}_{}_model.xlsx".format(model_name, sample_name),
+        path_model_dir + "/{}_{}_summary.html".format(model_name, sample_name),
+        path_model_dir + "/{}_{}_summary.txt".format(model_name, sample_name),
+    )
+
+def get_paths_inference_files(sample_name: str, model_name: str, path_model_dir: str) -> Tuple[str, str]:
+    # Dateipfade zur Speicherung der ergänzenden Inferenz (Bootstrap, cluster-robuste Standardfehler) neben dem Ergebnis
+    return (
+        path_model_dir + "/{}_{}_inference.html".format(model_name, sample_name),
+        path_model_dir + "/{}_{}_inference.txt".format(model_name, sample_name),
+    )
+
+def run_models(df: pd.DataFrame, specs: List[ModelSpec], sample_name: str, path_sample_regression_analyses_dir: str, workers: int = 1, inference_settings: Optional[inference.InferenceSettings] = None) -> List[str]:
+    # Liefert die Ergebnisse (summary als Text) in der Reihenfolge der Modelle.
+    path_cache_file = "{}/{}".format(path_sample_regression_analyses_dir, CACHE_FILE_NAME)
+
+    cache = result_cache.load(path_cache_file)
+
+    data_hash = _hash_data(df)
+
+    summaries = {}
+    specs_to_fit = []
+
+    for spec in specs:
+        path_model_dir = "{}/{}".format(path_sample_regression_analyses_dir, spec.dir)
+        paths_result_files = get_paths_result_files(sample_name, spec.name, path_model_dir)
+
+        if inference.is_enabled(inference_settings):
+            paths_result_files += get_paths_inference_files(sample_name, spec.name, path_model_dir)
+
+        key = _model_key(spec, data_hash, inference_settings)
+
+        if cache.get(spec.name) == key and all(os.path.exists(path) for path in paths_result_files):
+            with open(paths_result_files[3], "r") as file:
+                summaries[spec.name] = file.read()
+
+            print("\nModell \"{}\" ist unverändert. Das Ergebnis wird aus \"{}\" übernommen.".format(spec.name, paths_result_files[3]))
+
+            continue
+
+        os.makedirs(path_model_dir, exist_ok=True)
+
+        specs_to_fit.append((spec, path_model_dir, key))
+
+    if specs_to_fit:
+        print("\n{} Modell(e) werden nun mit {} Worker-Prozess(en) geschätzt.".format(len(specs_to_fit), workers))
+
+    # Die Daten werden den Worker-Prozessen einmalig beim Start übergeben.
+    if workers > 1 and len(specs_to_fit) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(specs_to_fit)), initializer=_init_worker, initargs=(df, )) as executor:
+            results = list(executor.map(_fit_model, [spec for spec, path_model_dir, key in specs_to_fit], [path_model_dir for spec, path_model_dir, key in specs_to_fit], [sample_name] * len(specs_to_fit), [inference_settings] * len(specs_to_fit)))
+    else:
+        _init_worker(df)
+
+        results = [_fit_model(spec, path_model_dir, sample_name, inference_settings) for spec, path_model_dir, key in specs_to_fit]
+
+    for (spec, path_model_dir, key), summary in zip(specs_to_fit, results):
+        summaries[spec.name] = summary
+        cache[spec.name] = key
+
+    result_cache.save(path_cache_file, cache)
+
+    return [summaries[spec.name] for spec in specs]
+
+# Daten des jeweiligen (Worker-)Prozesses
+_df = None
+
+def _init_worker(df: pd.DataFrame):
+    global _df
+
+    _df = df
+
+def _fit_model(spec: ModelSpec, path_model_dir: str, sample_name: str, inference_settings: Optional[inference.InferenceSettings] = None) -> str:
+    # Erstellt auf Basis der Regressionsgleichung einen Vektor, der die abhängige Variable enthält und eine Matrix, die das Interzept und die unabhängigen Variable enthält.
+    y, X = patsy.dmatrices(spec.formula, data=_df, return_type="dataframe")
+
+    summary = _run_model(sample_name, spec.name, y, X, path_model_dir)
+
+    if inference.is_enabled(inference_settings):
+        _run_inference(sample_name, spec.name, y, X, path_model_dir, inference_settings)
+
+    return summary
+
+def _run_model(sample_name: str, model_name: str, y: pd.DataFrame, X: pd.DataFrame, dir: str) -> str:
+    path_s_r_a_pearson_file, path_s_r_a_model_file, path_s_r_a_summary_html_file, path_s_r_a_summary_text_file = get_paths_result_files(sample_name, model_name, dir)
+
+    X.corr().to_excel(path_s_r_a_pearson_file, sheet_name="PEARSON_CORR")
+
+    # Speichert den Vektor und die Matrix jeweils in einer Excel-Datei.
+    with pd.ExcelWriter(path_s_r_a_model_file) as writer:
+        y.to_excel(writer, sheet_name="y")
+        X.to_excel(writer, sheet_name="X")
+
+    # Erzeugt ein OLS-Objekt.
+    mod = sm.OLS(y, X)
+
+    # Führt die Schätzung der Regressionsgeraden durch.
+    res = mod.fit()
+
+    # Speichert das Ergebnis der Regression in der Variable "summary"
+    summary = res.summary()
+
+    # Speicher das Ergebnis als HTML-Datei
+    with open(path_s_r_a_summary_html_file, "w") as file:
+        file.write(summary.as_html())
+
+    # Speicher das Ergebnis als Text-Datei
+    with open(path_s_r_a_summary_text_file, "w") as file:
+        file.write(summary.as_text())
+
+    return summary.as_text()
+
+def _run_inference(sample_name: str, model_name: str, y: pd.DataFrame, X: pd.DataFrame, dir: str, inference_settings: inference.InferenceSettings):
+    path_s_r_a_inference_html_file, path_s_r_a_inference_text_file = get_paths_inference_files(sample_name, model_name, dir)
+
+    # Die Cluster werden den in die Schätzung eingehenden Beobachtungen zugeordnet.
+    groups = _df.loc[X.index, inference_settings.cluster] if inference_settings.cluster is not None else None
+
+    df_inference = inference.analyze(X, y, inference_settings, groups)
+
+    description = inference.describe(df_inference, inference_settings)
+
+    with open(path_s_r_a_inference_html_file, "w") as file:
+        file.write("<p>{}</p>\n{}".format(description.replace("\n", "<br>\n"), df_inference.to_html(float_format="{:.4f}".format)))
+
+    with open(path_s_r_a_inference_text_file, "w") as file:
+        file.write("{}\n\n{}\n".format(description, df_inference.to_string(float_format="{:.4f}".format)))
+
+def _model_key(spec: ModelSpec, data_hash: str, inference_settings: Optional[inference.InferenceSettings] = None) -> str:
+    settings = tuple(inference_settings) if inference.is_enabled(inference_settings) else None
+
+    return hashlib.sha1("{}|{}|{}|{}|{}|{}".format(MODELS_VERSION, statsmodels.__version__, spec.formula, spec.dir, data_hash, settings).encode("utf-8")).hexdigest()
+
+def _hash_data(df: pd.DataFrame) -> str:
+    sha1 = hashlib.sha1(",".join(map(str, df.columns)).encode("utf-8"))
+
+    sha1.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+
+    return sha1.hexdigest()
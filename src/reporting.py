@@ -1,12 +1,18 @@
-import json
 import logging
 import os
 import os.path
-from datetime import timedelta
+from datetime import date, timedelta
+import collections
+import functools
 import hashlib
+import itertools
+import mmap
 import shutil
+import sys
 import time
-from typing import Any
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
 
 from arelle import Cntlr
 from arelle import ModelManager
@@ -17,92 +23,202 @@ from arelle.ModelXbrl import ModelXbrl
 import numpy as np
 import pandas as pd
 
+import defaults
+import esef_archive
+import ingestion_journal
+import ixbrl_parser
+import metrics
+import package_manifest
+import package_supervisor
+import tag_store
+
 PATH_IMPORT_DIR = "./import"
 
-def load_reports(sha1_checksums_of_existing_reports: pd.Series, path_sample_esef_packages_dir: str, path_sample_reports_dir: str) -> list:
+# Verfügbare Engines zum Lesen der Tags. Arelle dient als Referenz, die Stream-Engine liest nur die Berichtsdatei ohne DTS und Taxonomiepakete.
+ENGINE_ARELLE = defaults.ENGINE_ARELLE
+ENGINE_STREAM = defaults.ENGINE_STREAM
+ENGINES = defaults.ENGINES
+
+# Kennzahlen eines Berichts, die beim Abgleich der Engines (parity check) verglichen werden.
+PARITY_FIELDS = ("LEI", "PERIOD_END", "ALL_TAGS", "ESEF_TAGS", "EXT_TAGS")
+PARITY_INDICES = (1, 2, 3, 5, 7)
+
+# Anzahl an Paketen je Worker-Prozess, die höchstens im Voraus an den Prozess-Pool übergeben werden. Wartet der aufrufende Prozess (z.B. weil die
+# Warteschlange von --pipeline voll ist), werden keine weiteren Pakete gelesen und keine weiteren Ergebnisse gepuffert.
+PENDING_PACKAGES_PER_WORKER = 2
+
+def load_reports(sha1_checksums_of_existing_reports: pd.Series, path_sample_esef_packages_dir: str, path_sample_reports_dir: str, workers: int = 1, engine: str = ENGINE_ARELLE, parity_check: bool = False, path_manifest_file: Optional[str] = None, tag_values_mode: str = tag_store.VALUES_TEXT, journal: Optional[ingestion_journal.IngestionJournal] = None, on_report: Optional[Callable[[list], None]] = None, max_packages_per_worker: int = 0, max_worker_rss_mb: int = 0, package_timeout_s: float = 0, package_memory_mb: int = 0, path_quarantine_dir: Optional[str] = None) -> list:
     start_time = time.time()
     
     # Deaktiviert den Logger von Arelle für eine "saubere" Konsolenausgabe.
     logging.getLogger("arelle").setLevel(100)
 
-    cntlr = CntlrItegrated()
-
     reports = []
 
     # Dict zum abspeichern von nicht einlesbaren Berichten und des korrespondierenden Fehlers
     not_loadable_esef_packages = {}
 
-    # Schrittweises Durchlaufen aller Elemente im import-Ordner
+    # Dict zum abspeichern der Abweichungen je Bericht beim Abgleich der Engines
+    parity_differences_by_package = {}
+
+    # Erfassung aller ESEF-Pakete im import-Ordner. Die Reihenfolge der Pakete bestimmt auch die Reihenfolge der Berichte im Sample.
+    esef_packages = []
+
     with os.scandir(PATH_IMPORT_DIR) as dir_iter:
         for esef_package in dir_iter:
 
-            if esef_package.is_file():
+            # ESEF-Pakete werden als Verzeichnis oder als ZIP-Archiv (ohne Entpacken) gelesen.
+            if esef_package.is_file() and not esef_archive.is_archive(esef_package.path):
                 print("\nEs wurde folgende Datei im import-Ordner gefunden: {}\nBitte beachten Sie die Anforderungen zum Import an die ESEF-Pakete.".format(esef_package.name))
                 continue
 
-            print("\nESEF-Paket \"{}\" wird geladen:".format(esef_package.name))
+            esef_packages.append((esef_archive.get_package_name(esef_package.name), esef_package.path))
 
-            url_report_file = ""
-            url_taxonomy_package_file = ""
+    # Prüfsummen der bereits im Sample enthaltenen Berichte als Menge, damit die Prüfung auf Duplikate unabhängig von der Größe des Samples bleibt.
+    existing_sha1_checksums = set(sha1_checksums_of_existing_reports.dropna().values)
 
-            # Durchläuft das aktuelle Verzeichnis und sucht (auch in Sub-Verzeichnissen) nach der Berichts- und der Taxonomiedatei.
-            for root, dirs, files in os.walk(esef_package.path):
-                for file in files:
-                    if ".xhtml" in file or ".html" in file:
-                        url_report_file = os.path.join(root, file).replace("\\", "/")
+    manifest = package_manifest.load(path_manifest_file) if path_manifest_file else {}
 
-                    if "taxonomyPackage.xml" in file:
-                        url_taxonomy_package_file = os.path.join(root, file).replace("\\", "/")
+    # Die Suche nach den Dateien und die Berechnung der Prüfsumme erfolgen parallel in Threads. Für unveränderte Pakete werden die Angaben aus dem Manifest übernommen.
+    with ThreadPoolExecutor() as executor:
+        discovered_esef_packages = list(executor.map(functools.partial(_discover_esef_package, manifest), [path for name, path in esef_packages]))
+
+    # Das Manifest enthält nur Pakete, die sich aktuell im import-Ordner befinden.
+    manifest = {}
+
+    metrics.flush()
+
+    # Das Lesen der Tags erfolgt (ggf. parallel) in Worker-Prozessen.
+    # Die Prüfung auf Duplikate, das Verschieben der Pakete und die Reihenfolge der Ergebnisse verbleiben beim aufrufenden Prozess.
+    with _worker_pool(workers, tag_values_mode, max_packages_per_worker, max_worker_rss_mb, package_timeout_s, package_memory_mb) as pool_map:
+        esef_packages_to_load = []
+
+        for (esef_package_name, esef_package_path), (url_report_file, url_taxonomy_package_file, report_sha1_checksum, manifest_entry, is_from_manifest) in zip(esef_packages, discovered_esef_packages):
+
+            print("\nESEF-Paket \"{}\" wird geladen:".format(esef_package_name))
 
             # Meldung eines Fehler, falls für das aktuelle Paket keine Berichts- oder Taxonomiedatei gefunden wurde.
             if url_report_file == "" or url_taxonomy_package_file == "":
                 err_msg = "Berichts- oder Taxonomiedatei nicht vorhanden. Bericht wird nicht geladen."
                 print("\n\t==> {}".format(err_msg))
-                not_loadable_esef_packages[esef_package.name] = err_msg
+                not_loadable_esef_packages[esef_package_name] = err_msg
 
                 continue
-            
-            # Berechnung der SHA1-Prüfsumme der Berichtsdatei
-            report_sha1_checksum = _calculate_report_checksum(url_report_file)
+
+            manifest[esef_package_path] = manifest_entry
 
             # Ausgabe von Informationen über das Berichtspaket auf der Konsole
             print("\tReport-File: {}".format(url_report_file))
-            print("\tReport-SHA1-Checksum: {}".format(report_sha1_checksum))
+            print("\tReport-SHA1-Checksum: {}{}".format(report_sha1_checksum, " (Manifest)" if is_from_manifest else ""))
             print("\tTaxonomy-Package-File: {}".format(url_taxonomy_package_file))
 
             # Überprüfung, ob der aktuelle Bericht bereits im Sample enthalten ist.
-            if report_sha1_checksum in sha1_checksums_of_existing_reports.values:
+            if report_sha1_checksum in existing_sha1_checksums:
                 print("\n\t==> Bericht schon vorhanden. Bericht wird nicht geladen.")
 
                 continue
 
-            print("\n\t==> XBRL-Elemente (Tags) werden nun gelesen.")
+            # Pakete, die ein abgebrochener Lauf bereits gelesen hat, werden nicht erneut gelesen. Das Verschieben des Pakets wird ggf. nachgeholt.
+            if journal is not None and report_sha1_checksum in journal:
+                print("\n\t==> Bericht bereits gelesen (Journal, Zustand \"{}\"). Bericht wird nicht erneut geladen.".format(journal.state(report_sha1_checksum)))
+
+                if not os.path.exists(os.path.join(path_sample_esef_packages_dir, os.path.basename(esef_package_path))):
+                    shutil.move(esef_package_path, path_sample_esef_packages_dir)
+
+                    manifest.pop(esef_package_path, None)
+
+                continue
+
+            esef_packages_to_load.append((esef_package_name, esef_package_path, url_report_file, url_taxonomy_package_file, report_sha1_checksum))
+
+        if path_manifest_file:
+            package_manifest.save(path_manifest_file, manifest)
+
+        if esef_packages_to_load:
+            print("\n{} ESEF-Paket(e) werden nun mit {} Worker-Prozess(en) gelesen.".format(len(esef_packages_to_load), workers))
 
-            try:
-                model_manager = ModelManager.initialize(cntlr)
-                modelXbrl = model_manager.load(url_report_file, taxonomyPackages=[url_taxonomy_package_file])
+        results = pool_map(_parse_esef_package,
+            [esef_package[0] for esef_package in esef_packages_to_load],
+            [esef_package[2] for esef_package in esef_packages_to_load],
+            [esef_package[3] for esef_package in esef_packages_to_load],
+            itertools.repeat(path_sample_reports_dir, len(esef_packages_to_load)),
+            itertools.repeat(engine, len(esef_packages_to_load)),
+            itertools.repeat(parity_check, len(esef_packages_to_load)))
 
-                report = _read_tags(modelXbrl, esef_package.name, path_sample_reports_dir)
+        for (esef_package_name, esef_package_path, url_report_file, url_taxonomy_package_file, report_sha1_checksum), result in zip(esef_packages_to_load, results):
 
-                # Prüft, ob der Bericht gelesen werden konnte.
-                if len(report) == 0:
-                    print("\n\tDas ESEF-Paket \"{}\" ist unvollständig und konnte nicht gelesen werden!".format(esef_package.name))
+            # Ein Paket, dessen Worker-Prozess wegen Zeit- oder Speicherlimit beendet wurde bzw. abgestürzt ist, wird als nicht einlesbar erfasst und
+            # ggf. in den Quarantäne-Ordner verschoben, damit es beim nächsten Lauf nicht erneut gelesen wird.
+            if isinstance(result, package_supervisor.TaskKilled):
+                print("\n\t==> Das Lesen des ESEF-Pakets \"{}\" wurde abgebrochen: {}".format(esef_package_name, result.message))
+                not_loadable_esef_packages[esef_package_name] = result.message
 
-                    not_loadable_esef_packages[esef_package.name] = "Unvollständige Daten zur Indentifizierung des Unternehmens!"
+                if path_quarantine_dir is not None:
+                    os.makedirs(path_quarantine_dir, exist_ok=True)
 
-                    continue
+                    shutil.move(esef_package_path, path_quarantine_dir)
 
-                report.append(report_sha1_checksum)
-                reports.append(report)
+                    manifest.pop(esef_package_path, None)
 
-                shutil.move(esef_package.path, path_sample_esef_packages_dir)
+                    print("\n\tESEF-Paket \"{}\" wurde in den Quarantäne-Ordner \"{}\" verschoben.".format(esef_package_name, path_quarantine_dir))
+
+                continue
+
+            report, err, parity_differences, metric_events = result
+
+            metrics.merge(metric_events)
+            metrics.flush()
+
+            print("\nXBRL-Elemente (Tags) des ESEF-Pakets \"{}\":".format(esef_package_name))
+
+            if err is not None:
+                print("\t\tBeim Lesen der XBRL-Elemente (Tags) des ESEF-Paktes \"{}\" ist ein Fehler in der Engine \"{}\" aufgetreten.".format(esef_package_name, engine))
+                not_loadable_esef_packages[esef_package_name] = err
+
+                continue
 
-                print("\n\tESEF-Paket \"{}\" wurde erfolgreich geladen.".format(esef_package.name))
+            if parity_check:
+                if parity_differences:
+                    parity_differences_by_package[esef_package_name] = parity_differences
 
-                modelXbrl.close()
-            except BaseException as e:
-                print("\t\tBeim Lesen der XBRL-Elemente (Tags) des ESEF-Paktes \"{}\" ist ein Fehler in der Arelle-Plattform aufgetreten.".format(esef_package.name))
-                not_loadable_esef_packages[esef_package.name] = e
+                    print("\n\t==> Abweichung zwischen den Engines festgestellt:")
+
+                    for field, value, value_reference in parity_differences:
+                        print("\t\t{}: {} ({}) / {} (Vergleichs-Engine)".format(field, value, engine, value_reference))
+                else:
+                    print("\n\t==> Keine Abweichung zwischen den Engines.")
+
+            # Prüft, ob der Bericht gelesen werden konnte.
+            if len(report) == 0:
+                print("\n\tDas ESEF-Paket \"{}\" ist unvollständig und konnte nicht gelesen werden!".format(esef_package_name))
+
+                not_loadable_esef_packages[esef_package_name] = "Unvollständige Daten zur Indentifizierung des Unternehmens!"
+
+                continue
+
+            report.append(report_sha1_checksum)
+            reports.append(report)
+
+            # Der Bericht wird vor dem Verschieben des Pakets im Journal gespeichert, damit er bei einem Abbruch des Laufs nicht verloren geht.
+            if journal is not None:
+                journal.record(report_sha1_checksum, ingestion_journal.STATE_PARSED, esef_package_name, report)
+
+            with metrics.timer("ingestion.move"):
+                shutil.move(esef_package_path, path_sample_esef_packages_dir)
+
+            manifest.pop(esef_package_path, None)
+
+            print("\n\tESEF-Paket \"{}\" wurde erfolgreich geladen.".format(esef_package_name))
+
+            # Übergabe des Berichts an die nächste Verarbeitungsstufe (z.B. Abruf der Unternehmensdaten parallel zum Lesen der übrigen Pakete)
+            if on_report is not None:
+                on_report(report)
+
+    if path_manifest_file:
+        package_manifest.save(path_manifest_file, manifest)
+
+    if parity_check:
+        print("\nAbgleich der Engines: {} von {} Bericht(en) mit Abweichungen.".format(len(parity_differences_by_package), len(esef_packages_to_load)))
 
     if not_loadable_esef_packages:
         print("\nFolgende ESEF-Pakete konnten aufgrund eines Fehlers nicht geladen werden:")
@@ -113,97 +229,313 @@ def load_reports(sha1_checksums_of_existing_reports: pd.Series, path_sample_esef
 
     end_time = time.time()
 
+    metrics.elapsed("ingestion.total", end_time - start_time)
+    metrics.count("ingestion.packages_loaded", len(reports))
+    metrics.count("ingestion.packages_not_loadable", len(not_loadable_esef_packages))
+    metrics.flush()
+
     print("\nBearbeitungsdauer: {} (HH:MM:SS)".format(timedelta(seconds=(end_time-start_time))))
 
     return reports
 
+# Controller und ModelManager des jeweiligen (Worker-)Prozesses. Werden je Prozess einmalig durch _init_worker erzeugt und für alle Pakete wiederverwendet.
+# Die DTS der Basistaxonomie wird dagegen für jeden Bericht erneut geladen, da Arelle die geparsten Dokumente an das jeweilige ModelXbrl bindet.
+_cntlr = None
+_model_manager = None
+
+# Art der Speicherung der Werte der Tags (siehe tag_store.VALUES_MODES)
+_tag_values_mode = tag_store.VALUES_TEXT
+
+def _init_worker(tag_values_mode: str = tag_store.VALUES_TEXT, metrics_enabled: bool = False):
+    global _cntlr, _model_manager, _tag_values_mode
+
+    _tag_values_mode = tag_values_mode
+
+    # Die Messwerte der Worker-Prozesse werden mit dem Ergebnis je Paket an den aufrufenden Prozess übergeben.
+    if metrics_enabled:
+        metrics.enable_in_worker()
+
+    # Deaktiviert den Logger von Arelle auch in den Worker-Prozessen.
+    logging.getLogger("arelle").setLevel(100)
+
+    if _cntlr is None:
+        _cntlr = CntlrItegrated()
+        _model_manager = ModelManager.initialize(_cntlr)
+
+@contextmanager
+def _worker_pool(workers: int, tag_values_mode: str, max_packages_per_worker: int = 0, max_worker_rss_mb: int = 0, package_timeout_s: float = 0, package_memory_mb: int = 0):
+    initargs = (tag_values_mode, metrics.is_enabled())
+
+    # Mit Zeit- bzw. Speicherlimit oder Erneuerung der Worker-Prozesse wird jedes Paket in einem überwachten Kindprozess gelesen, auch bei nur
+    # einem Worker. Ein hängendes Paket wird dann beendet, ohne den Import aufzuhalten.
+    if max_packages_per_worker > 0 or max_worker_rss_mb > 0 or package_timeout_s > 0 or package_memory_mb > 0:
+        with package_supervisor.SupervisedPool(workers, _init_worker, initargs, package_timeout_s, package_memory_mb, max_packages_per_worker, max_worker_rss_mb) as pool:
+            yield pool.map
+    elif workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+            yield functools.partial(_bounded_map, executor, workers * PENDING_PACKAGES_PER_WORKER)
+    else:
+        # Bei nur einem Worker wird auf einen Prozess-Pool verzichtet und im aktuellen Prozess gearbeitet.
+        _init_worker(tag_values_mode)
+
+        yield map
+
+def _bounded_map(executor: ProcessPoolExecutor, max_pending: int, function: Callable, *iterables: Iterable) -> Iterator[Any]:
+    # Wie executor.map, jedoch werden die Pakete erst bei Bedarf übergeben (höchstens max_pending gleichzeitig). executor.map würde alle Pakete
+    # sofort übergeben, sodass die Worker unabhängig vom Verbrauch der Ergebnisse weiterlesen.
+    pending = collections.deque()
+
+    for arguments in zip(*iterables):
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+
+        pending.append(executor.submit(function, *arguments))
+
+    while pending:
+        yield pending.popleft().result()
+
+def _discover_esef_package(manifest: dict, path_esef_package: str) -> Tuple[str, str, str, Optional[dict], bool]:
+    manifest_entry = package_manifest.lookup(manifest, path_esef_package)
+
+    if manifest_entry is not None:
+        return manifest_entry["report_file"], manifest_entry["taxonomy_package_file"], manifest_entry["sha1"], manifest_entry, True
+
+    url_report_file = ""
+    url_taxonomy_package_file = ""
+
+    # Durchläuft das aktuelle Verzeichnis und sucht (auch in Sub-Verzeichnissen) nach der Berichts- und der Taxonomiedatei. Bei einem Archiv wird
+    # nur das zentrale Verzeichnis gelesen.
+    with metrics.timer("ingestion.walk"):
+        if esef_archive.is_archive(path_esef_package):
+            url_report_file, url_taxonomy_package_file = esef_archive.find_files(path_esef_package)
+        else:
+            for root, dirs, files in os.walk(path_esef_package):
+                for file in files:
+                    if ".xhtml" in file or ".html" in file:
+                        url_report_file = os.path.join(root, file).replace("\\", "/")
+
+                    if "taxonomyPackage.xml" in file:
+                        url_taxonomy_package_file = os.path.join(root, file).replace("\\", "/")
+
+    if url_report_file == "" or url_taxonomy_package_file == "":
+        return url_report_file, url_taxonomy_package_file, "", None, False
+
+    # Berechnung der SHA1-Prüfsumme der Berichtsdatei
+    with metrics.timer("ingestion.hash"):
+        report_sha1_checksum = _calculate_report_checksum(url_report_file)
+
+    metrics.observe("ingestion.bytes_hashed", esef_archive.get_file_size(url_report_file))
+
+    return url_report_file, url_taxonomy_package_file, report_sha1_checksum, package_manifest.create_entry(path_esef_package, url_report_file, url_taxonomy_package_file, report_sha1_checksum), False
+
+def _parse_esef_package(esef_package_name: str, url_report_file: str, url_taxonomy_package_file: str, path_sample_reports_dir: str, engine: str, parity_check: bool) -> Tuple[list, Optional[str], list, list]:
+    # Die Messwerte des Pakets werden zusammen mit dem Ergebnis an den aufrufenden Prozess übergeben.
+    with metrics.timer("ingestion.package", engine=engine, package=esef_package_name):
+        report, err, parity_differences = _parse_esef_package_tags(esef_package_name, url_report_file, url_taxonomy_package_file, path_sample_reports_dir, engine, parity_check)
+
+    if err is not None:
+        metrics.count("ingestion.errors", engine=engine)
+
+    return report, err, parity_differences, metrics.drain()
+
+def _parse_esef_package_tags(esef_package_name: str, url_report_file: str, url_taxonomy_package_file: str, path_sample_reports_dir: str, engine: str, parity_check: bool) -> Tuple[list, Optional[str], list]:
+    # Fehler werden nicht weitergereicht, sondern als Text an den aufrufenden Prozess zurückgegeben, da nicht jede Exception zwischen Prozessen übertragbar ist.
+    # Ein Abbruch (KeyboardInterrupt) wird dagegen weitergereicht, damit sich der Lauf jederzeit beenden lässt.
+    try:
+        if engine == ENGINE_STREAM:
+            report = _read_tags_streaming(url_report_file, esef_package_name, path_sample_reports_dir)
+        else:
+            report = _load_and_read_tags(url_report_file, url_taxonomy_package_file, esef_package_name, path_sample_reports_dir)
+    except Exception as e:
+        return [], str(e), []
+
+    parity_differences = []
+
+    # Beim Abgleich wird der Bericht zusätzlich mit der jeweils anderen Engine gelesen (ohne die Tags zu speichern) und die Kennzahlen werden verglichen.
+    if parity_check:
+        try:
+            if engine == ENGINE_STREAM:
+                report_reference = _load_and_read_tags(url_report_file, url_taxonomy_package_file, esef_package_name, None)
+            else:
+                report_reference = _read_tags_streaming(url_report_file, esef_package_name, None)
+        except Exception as e:
+            return report, None, [("ENGINE", "", str(e))]
+
+        parity_differences = _compare_reports(report, report_reference)
+
+    return report, None, parity_differences
+
+def _load_and_read_tags(url_report_file: str, url_taxonomy_package_file: str, esef_package_name: str, path_sample_reports_dir: Optional[str]) -> list:
+    with metrics.timer("ingestion.arelle_load"):
+        modelXbrl = _model_manager.load(url_report_file, taxonomyPackages=[url_taxonomy_package_file])
+
+    # Das Modell wird auch bei einem Fehler freigegeben, damit es nicht bis zum Ende des (Worker-)Prozesses im Speicher verbleibt.
+    try:
+        return _read_tags(modelXbrl, esef_package_name, path_sample_reports_dir)
+    finally:
+        modelXbrl.close()
+
+def _compare_reports(report: list, report_reference: list) -> list:
+    differences = []
+
+    for field, index in zip(PARITY_FIELDS, PARITY_INDICES):
+        value = report[index] if len(report) > index else ""
+        value_reference = report_reference[index] if len(report_reference) > index else ""
+
+        if value != value_reference:
+            differences.append((field, value, value_reference))
+
+    return differences
+
 def _calculate_report_checksum(url_filing: str) -> str:
-    buffer_size = 65536
-    
+    # Eine Datei im Archiv wird beim Entpacken (Stream) gehasht.
+    if esef_archive.split_url(url_filing) is not None:
+        return esef_archive.calculate_checksum(url_filing)
+
     sha1 = hashlib.sha1()
 
+    # Die Datei wird in den Speicher abgebildet (memory-mapped), sodass die Berechnung ohne zusätzliche Kopien erfolgt und hashlib die Sperre (GIL) für parallele Threads freigibt.
     with open(url_filing, "rb") as file:
-        while True:
-            data = file.read(buffer_size)
-
-            if not data:
-                break
+        if os.fstat(file.fileno()).st_size == 0:
+            return sha1.hexdigest()
 
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
             sha1.update(data)
 
     return sha1.hexdigest()
 
-def _read_tags(modelXbrl: ModelXbrl, esef_package_name: str, path_sample_reports_dir: str) -> list:
-    # Liste als Speicher für alle Tags im Bericht. Tags werden als Tuple in der Liste abgelegt.
-    tags = []
+def _read_tags(modelXbrl: ModelXbrl, esef_package_name: str, path_sample_reports_dir: Optional[str]) -> list:
+    with metrics.timer("ingestion.read_tags", engine=ENGINE_ARELLE):
+        return _summarize_tags(_iter_arelle_tags(modelXbrl), esef_package_name, path_sample_reports_dir)
+
+def _read_tags_streaming(url_report_file: str, esef_package_name: str, path_sample_reports_dir: Optional[str]) -> list:
+    # Beim Lesen als Stream erfolgen das Parsen der Berichtsdatei und das Auswerten der Tags in einem Durchlauf.
+    with metrics.timer("ingestion.read_tags", engine=ENGINE_STREAM):
+        return _summarize_tags(_iter_streamed_tags(url_report_file), esef_package_name, path_sample_reports_dir)
+
+def _iter_arelle_tags(modelXbrl: ModelXbrl) -> Iterator[Tuple[str, Any, Callable[[], Tuple[str, date]]]]:
+    # Ein Fakt ist für das Verständnis an dieser Stelle vereinfachend gleichzusetzen mit dem Begriff Tag. Tatsächlich handelt es sich um ein Wert, der mit einer rechnungslegungsbezogenen Bedeutung (Taxonomie) und einem Kontext verknüpft ist.
+    # "By combining a concept (profit) from a taxonomy (say Canadian GAAP) with a value (1000) and the needed context (Acme Corporation, for the period 1 January 2015 to 31 January 2015 in Canadian Dollars) we arrive at a fact.", Getting Started for Developers, XBRL International
+    
+    # Der qualifizierte Name wird je QName einmalig formatiert und internalisiert, sodass alle Tags eines Elements dieselbe Zeichenkette verwenden.
+    qnames = {}
+
+    for fact in modelXbrl.facts:
+        assert isinstance(fact, ModelInlineFact)
+
+        context = fact.context
+
+        qname = qnames.get(fact.qname)
+
+        if qname is None:
+            qname = qnames[fact.qname] = sys.intern("{}:{}".format(fact.qname.prefix, fact.qname.localName))
+
+        yield qname, fact.value, functools.partial(_identify_arelle_context, context)
+
+def _identify_arelle_context(context: ModelContext) -> Tuple[str, date]:
+    assert isinstance(context, ModelContext)
+
+    scheme, lei = context.entityIdentifier
+
+    return lei, (context.endDatetime - timedelta(days=1)).date()
+
+def _iter_streamed_tags(url_report_file: str) -> Iterator[Tuple[str, Any, Callable[[], Tuple[str, date]]]]:
+    # Die Kontexte werden vom Parser erst während des Lesens erfasst und deshalb erst bei Bedarf (nach dem Durchlauf) aufgelöst.
+    contexts = {}
+
+    # Eine Berichtsdatei im Archiv wird beim Lesen entpackt, ohne sie auf dem Datenträger abzulegen.
+    with esef_archive.open_file(url_report_file) as report_file:
+        for fact in ixbrl_parser.iter_inline_facts(report_file, contexts):
+            yield sys.intern(fact.qname), fact.value, functools.partial(_identify_streamed_context, contexts, fact.context_ref)
+
+def _identify_streamed_context(contexts: dict, context_ref: str) -> Tuple[str, Optional[date]]:
+    context = contexts.get(context_ref)
+
+    if context is None:
+        return "", None
+
+    return context.entity_identifier, context.end_date
+
+def _summarize_tags(facts: Iterable[Tuple[str, Any, Callable[[], Tuple[str, date]]]], esef_package_name: str, path_sample_reports_dir: Optional[str]) -> list:
+    # Die Tags werden nicht im Speicher gesammelt, sondern während des Durchlaufs gezählt und unmittelbar in die Datei des Berichts geschrieben
+    # (tag_store.TagWriter). Ohne Verzeichnis (z.B. beim Abgleich der Engines) werden die Tags nur gezählt.
+    tag_writer = tag_store.TagWriter(path_sample_reports_dir, esef_package_name, _tag_values_mode) if path_sample_reports_dir is not None else None
 
     # Erfassung der wichtigsten Eigenschaften des Berichts
     lei = ""
     period_end = ""
 
+    # Kontext des Elements zur Identifizierung des Unternehmens. Wird erst nach dem Lesen aller Tags ausgewertet, da die Kontexte beim Lesen als Stream erst am Ende vollständig vorliegen.
+    identify_reporting_entity = None
+
     # Zählvariablen zum Zählen der Anzahl an Elementen der Basistaxonomie und an Elementen der Erweiterungstaxonomie. Berechnung einer Anzahl auch im Umkehrschluss aus der anderen anhand der Gesamtanzahl möglich.
     # Zur besseren Verständnis des Codes wurde hier darauf verzichtet.
     count_esef_tags = 0
     count_ext_tags = 0
 
-    # Ein Fakt ist für das Verständnis an dieser Stelle vereinfachend gleichzusetzen mit dem Begriff Tag. Tatsächlich handelt es sich um ein Wert, der mit einer rechnungslegungsbezogenen Bedeutung (Taxonomie) und einem Kontext verknüpft ist.
-    # "By combining a concept (profit) from a taxonomy (say Canadian GAAP) with a value (1000) and the needed context (Acme Corporation, for the period 1 January 2015 to 31 January 2015 in Canadian Dollars) we arrive at a fact.", Getting Started for Developers, XBRL International
-    
-    for fact in modelXbrl.facts:
-        assert isinstance(fact, ModelInlineFact)
+    # Zuordnung je qualifiziertem Namen, ob es sich um ein Element der Erweiterungstaxonomie handelt
+    is_extension_by_qname = {}
 
-        # Erfassung der wichtigsten Eigenschaften des Facts
-        #  qname: Qualifizierter Name des Facts/Tags (Z.b. ifrs-full:Revenue)
-        #  value: Der Wert/Inhalt des Tags
-        #  is_extension: Erfasst die Tatsache, ob es sich bei dem Fact um eine Element der Erweiterungstaxonomie des Unternehmens handelt.
-        qname = "{}:{}".format(fact.qname.prefix, fact.qname.localName)
-        value = fact.value
-        is_extension = False
-
-        if "ifrs-full" not in qname and "ifrs" not in qname:
-            is_extension = True
-            count_ext_tags += 1
-        else:
-            count_esef_tags += 1
+    try:
+        for qname, value, identify_context in facts:
+            # Erfassung der wichtigsten Eigenschaften des Facts
+            #  qname: Qualifizierter Name des Facts/Tags (Z.b. ifrs-full:Revenue)
+            #  value: Der Wert/Inhalt des Tags
+            #  is_extension: Erfasst die Tatsache, ob es sich bei dem Fact um eine Element der Erweiterungstaxonomie des Unternehmens handelt.
+            is_extension = is_extension_by_qname.get(qname)
 
-        tags.append((qname, value, is_extension))
-        
-        # Prüfen, ob es sich bei dem aktuellen Tag, um das Elemente ifrs-full:NameOfReportingEntityOrOtherMeansOfIdentification der Basistaxonomie handelt.
-        # Definition des Elements: "Name des berichterstattenden Unternehmens oder andere Mittel der Identifizierung" (EU-VO 2018/815 S. 602)
-        # Diesem Element lässt sich auch der Legal Entity Identifier (LEI) und das Periodenende entnehmen.
+            if is_extension is None:
+                is_extension = is_extension_by_qname[qname] = "ifrs-full" not in qname and "ifrs" not in qname
 
-        if qname.split(":")[1] == "NameOfReportingEntityOrOtherMeansOfIdentification":
-            context = fact.context
-            assert isinstance(context, ModelContext)
+            if is_extension:
+                count_ext_tags += 1
+            else:
+                count_esef_tags += 1
 
-            scheme, lei = context.entityIdentifier
+            if tag_writer is not None:
+                tag_writer.add(qname, value, is_extension)
 
-            date_period_end = (context.endDatetime - timedelta(days=1)).date()
-            period_end = str(date_period_end.year) + "{:02d}".format(date_period_end.month) + str(date_period_end.day)
+            # Prüfen, ob es sich bei dem aktuellen Tag, um das Elemente ifrs-full:NameOfReportingEntityOrOtherMeansOfIdentification der Basistaxonomie handelt.
+            # Definition des Elements: "Name des berichterstattenden Unternehmens oder andere Mittel der Identifizierung" (EU-VO 2018/815 S. 602)
+            # Diesem Element lässt sich auch der Legal Entity Identifier (LEI) und das Periodenende entnehmen.
 
-    # Abschließend wird überprüft, ob alle Eigenschaften des Unternehmens ausgelesen werden konnten. Ist diese Bedingung erfüllt wird der Bericht zu einem Datensatz zusammengefasst und zurückgegeben.
-    if lei and period_end:
-        count_all_tags = len(tags)
-        pct_all_tags = round((float(count_esef_tags) + float(count_ext_tags))/float(count_all_tags) * 100, 2) # Kontrollvariable
-        pct_esef_tags = round(float(count_esef_tags) / float(count_all_tags) * 100, 2)
-        pct_ext_tags = round(float(count_ext_tags) / float(count_all_tags) * 100, 2)
+            if qname.split(":")[-1] == "NameOfReportingEntityOrOtherMeansOfIdentification":
+                identify_reporting_entity = identify_context
 
-        _save_report(esef_package_name, tags, path_sample_reports_dir)
+        if identify_reporting_entity is not None:
+            lei, date_period_end = identify_reporting_entity()
 
-        return [esef_package_name, lei, period_end, count_all_tags, pct_all_tags, count_esef_tags, pct_esef_tags, count_ext_tags, pct_ext_tags]
-    else:
-        return []
+            if date_period_end is not None:
+                period_end = str(date_period_end.year) + "{:02d}".format(date_period_end.month) + str(date_period_end.day)
 
-def _serialize(obj) -> dict[str, Any]:
-    return vars(obj)
+        # Abschließend wird überprüft, ob alle Eigenschaften des Unternehmens ausgelesen werden konnten. Ist diese Bedingung erfüllt wird der Bericht zu einem Datensatz zusammengefasst und zurückgegeben.
+        if lei and period_end:
+            count_all_tags = count_esef_tags + count_ext_tags
+            pct_all_tags = round((float(count_esef_tags) + float(count_ext_tags))/float(count_all_tags) * 100, 2) # Kontrollvariable
+            pct_esef_tags = round(float(count_esef_tags) / float(count_all_tags) * 100, 2)
+            pct_ext_tags = round(float(count_ext_tags) / float(count_all_tags) * 100, 2)
 
-def _save_report(esef_package_name: str, tags: list, path_sample_reports_dir: str):
-    path_sample_reports_report_file = "{}/{}.json".format(path_sample_reports_dir, esef_package_name)
-    
-    print("\n\tSpeichern der Tags unter \"{}\".".format(path_sample_reports_report_file))
+            if tag_writer is not None:
+                metrics.observe("ingestion.facts_per_report", count_all_tags)
+
+                _save_report(esef_package_name, tag_writer)
+
+            return [esef_package_name, lei, period_end, count_all_tags, pct_all_tags, count_esef_tags, pct_esef_tags, count_ext_tags, pct_ext_tags]
+        else:
+            return []
+    finally:
+        # Ein unvollständiger Bericht (bzw. ein Fehler beim Lesen) hinterlässt keine Datei.
+        if tag_writer is not None:
+            tag_writer.discard()
+
+def _save_report(esef_package_name: str, tag_writer: tag_store.TagWriter):
+    print("\n\tSpeichern der Tags unter \"{}\".".format(tag_writer.path_report_file))
+
+    # Die Tags werden spaltenorientiert (Dictionary-Encoding der qualifizierten Namen, Bitmap für Erweiterungselemente, Werte als separater Block) gespeichert.
+    with metrics.timer("ingestion.save_tags"):
+        path_report_file = tag_writer.close()
 
-    with open(path_sample_reports_report_file, "w") as file:
-        json.dump(tags, file, default=_serialize, indent=4)
+    metrics.observe("ingestion.bytes_written", os.path.getsize(path_report_file))
 
 # Integrierter Arelle Controller, der Informationen und Hinweise auf dem Standard Ausgabe Stream (Konsole) ausgibt.
 class CntlrItegrated(Cntlr.Cntlr):
@@ -0,0 +1,21 @@
+import json
+import os
+
+# Gemeinsamer Cache für erzeugte Ergebnisdateien (Diagramme, Regressionsmodelle). Der Cache ist eine JSON-Datei, die je Ergebnis (z.B. Pfad des
+# Diagramms bzw. Name des Modells) den Schlüssel der Eingangsdaten enthält, mit denen es erzeugt wurde. Stimmt der Schlüssel überein und ist die
+# Ergebnisdatei vorhanden, wird das Ergebnis nicht erneut erzeugt.
+
+def load(path_cache_file: str) -> dict:
+    try:
+        with open(path_cache_file, "r") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save(path_cache_file: str, cache: dict):
+    path_cache_tmp_file = path_cache_file + ".tmp"
+
+    with open(path_cache_tmp_file, "w") as file:
+        json.dump(cache, file, indent=4)
+
+    os.replace(path_cache_tmp_file, path_cache_file)
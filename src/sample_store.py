@@ -0,0 +1,248 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Eingebetteter Speicher (SQLite) für die Daten eines Samples. Die Datenbank ersetzt die Excel-Datei als maßgeblichen Datenbestand:
+# Neue Berichte werden zeilenweise angehängt und Unternehmensdaten zeilenweise über die SHA1-Prüfsumme des Berichts aktualisiert,
+# ohne den gesamten Bestand neu zu schreiben. Die Excel-Datei wird nur noch auf Anforderung exportiert.
+
+TABLE_NAME = "reports"
+
+# Zeitpunkt der letzten Aktualisierung je Bericht und Spalte (z.B. der Unternehmensdaten), damit veraltete Werte gezielt aktualisiert werden können
+FIELD_UPDATES_TABLE_NAME = "field_updates"
+
+FILE_EXTENSION = ".sqlite"
+
+KEY_COLUMN = "SHA1"
+
+# Eindeutiger Index über die SHA1-Prüfsumme. Ersetzt den (nicht eindeutigen) Index IDX_reports_SHA1 früherer Versionen.
+KEY_INDEX_NAME = "UIDX_{}_{}".format(TABLE_NAME, KEY_COLUMN)
+
+# Spalten des Samples mit dem jeweiligen SQLite-Datentyp
+COLUMN_TYPES = {
+    "ESEF_PACKAGE_NAME": "TEXT",
+    "LEI": "TEXT",
+    "PERIOD_END": "TEXT",
+    "ALL_TAGS": "INTEGER",
+    "PCT_ALL_TAGS": "REAL",
+    "ESEF_TAGS": "INTEGER",
+    "PCT_ESEF_TAGS": "REAL",
+    "EXT_TAGS": "INTEGER",
+    "PCT_EXT_TAGS": "REAL",
+    "SHA1": "TEXT",
+    "ISIN": "TEXT",
+    "COMPANY": "TEXT",
+    "SECTOR": "TEXT",
+    "COUNTRY": "TEXT",
+    "MARKET_CAP": "REAL",
+    "FREE_FLOAT": "REAL",
+    "AUDITOR": "TEXT",
+    "AUDITOR_FEES": "REAL",
+    "EMPLOYEES": "REAL",
+    "FOUNDED": "REAL",
+    "ANALYSTS_FOLLOWING": "REAL",
+    "TOTAL_ASSETS": "REAL",
+    "TOTAL_DEBT": "REAL",
+    "INCOME": "REAL",
+    "TOTAL_ASSETS_T-1": "REAL",
+}
+
+COLUMNS = list(COLUMN_TYPES)
+
+# Spalten mit wenigen unterschiedlichen Ausprägungen werden beim Lesen als kategoriale Spalten geliefert. Sie dienen auch als Cluster der
+# Regressionsanalyse (--cluster) und werden bei der Aufbereitung der Variablen (features) berücksichtigt.
+CATEGORICAL_COLUMNS = ["COUNTRY", "SECTOR", "AUDITOR"]
+
+def get_path_sample_store_file(path_sample_data_dir: str, sample_name: str) -> str:
+    return "{}/{}{}".format(path_sample_data_dir, sample_name, FILE_EXTENSION)
+
+def exists(path_sample_store_file: str) -> bool:
+    return os.path.exists(path_sample_store_file)
+
+def create(path_sample_store_file: str):
+    with _connect(path_sample_store_file) as connection:
+        columns = ", ".join("{} {}".format(_quote(column), column_type) for column, column_type in COLUMN_TYPES.items())
+
+        connection.execute("CREATE TABLE IF NOT EXISTS {} (ROW_ID INTEGER PRIMARY KEY AUTOINCREMENT, {})".format(TABLE_NAME, columns))
+        _create_key_index(connection)
+        connection.execute("CREATE TABLE IF NOT EXISTS {} ({} TEXT, COLUMN_NAME TEXT, UPDATED_AT REAL, PRIMARY KEY ({}, COLUMN_NAME))".format(FIELD_UPDATES_TABLE_NAME, _quote(KEY_COLUMN), _quote(KEY_COLUMN)))
+
+def load(path_sample_store_file: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    # Liest das Sample in der Reihenfolge, in der die Berichte hinzugefügt wurden. Über "columns" werden nur die benötigten Spalten gelesen.
+    columns = COLUMNS if columns is None else [column for column in COLUMNS if column in columns]
+
+    if not exists(path_sample_store_file):
+        return _typed(pd.DataFrame(columns=columns))
+
+    with _connect(path_sample_store_file) as connection:
+        df = pd.read_sql_query("SELECT {} FROM {} ORDER BY ROW_ID".format(", ".join(_quote(column) for column in columns), TABLE_NAME), connection)
+
+    return _typed(df)
+
+def append(path_sample_store_file: str, df: pd.DataFrame):
+    if df.empty:
+        return
+
+    create(path_sample_store_file)
+
+    columns = [column for column in COLUMNS if column in df.columns]
+
+    # Ein bereits vorhandener Bericht (gleiche SHA1-Prüfsumme) wird überschrieben und behält seine Position im Sample.
+    upsert = ""
+    update_columns = [column for column in columns if column != KEY_COLUMN]
+
+    if KEY_COLUMN in columns:
+        upsert = " ON CONFLICT ({}) DO UPDATE SET {}".format(_quote(KEY_COLUMN), ", ".join("{0} = excluded.{0}".format(_quote(column)) for column in update_columns)) if update_columns else " ON CONFLICT DO NOTHING"
+
+    with _connect(path_sample_store_file) as connection:
+        connection.executemany(
+            "INSERT INTO {} ({}) VALUES ({}){}".format(TABLE_NAME, ", ".join(_quote(column) for column in columns), ", ".join("?" * len(columns)), upsert),
+            _rows(df, columns))
+
+def update(path_sample_store_file: str, df: pd.DataFrame, columns: Iterable[str]):
+    # Aktualisiert die angegebenen Spalten zeilenweise. Die Zuordnung erfolgt über die SHA1-Prüfsumme des Berichts.
+    columns = [column for column in columns if column != KEY_COLUMN]
+
+    if df.empty or not columns:
+        return
+
+    create(path_sample_store_file)
+
+    with _connect(path_sample_store_file) as connection:
+        connection.executemany(
+            "UPDATE {} SET {} WHERE {} = ?".format(TABLE_NAME, ", ".join("{} = ?".format(_quote(column)) for column in columns), _quote(KEY_COLUMN)),
+            _rows(df, columns + [KEY_COLUMN]))
+
+def record_field_updates(path_sample_store_file: str, df: pd.DataFrame, updated: pd.DataFrame, updated_at: Optional[float] = None):
+    # Speichert für alle in "updated" (Index wie df, True = aktualisiert) markierten Felder den Zeitpunkt der Aktualisierung.
+    updated_at = time.time() if updated_at is None else updated_at
+
+    rows = []
+
+    for sha1, row in zip(df.loc[updated.index, KEY_COLUMN], updated.itertuples(index=False, name=None)):
+        rows.extend((sha1, column, updated_at) for column, is_updated in zip(updated.columns, row) if is_updated)
+
+    if not rows:
+        return
+
+    create(path_sample_store_file)
+
+    with _connect(path_sample_store_file) as connection:
+        connection.executemany("INSERT OR REPLACE INTO {} VALUES (?, ?, ?)".format(FIELD_UPDATES_TABLE_NAME), rows)
+
+def load_field_updates(path_sample_store_file: str) -> pd.DataFrame:
+    # Liefert je Bericht (SHA1) und Spalte den Zeitpunkt der letzten Aktualisierung (Sekunden seit 1970).
+    if not exists(path_sample_store_file):
+        return pd.DataFrame(columns=[KEY_COLUMN, "COLUMN_NAME", "UPDATED_AT"])
+
+    create(path_sample_store_file)
+
+    with _connect(path_sample_store_file) as connection:
+        return pd.read_sql_query("SELECT * FROM {}".format(FIELD_UPDATES_TABLE_NAME), connection)
+
+def find_fields_to_update(df: pd.DataFrame, field_updates: pd.DataFrame, columns: List[str], max_age_days: Optional[float] = None) -> pd.DataFrame:
+    # Markiert (True) alle leeren Felder der angegebenen Spalten. Mit max_age_days werden zusätzlich die veralteten Felder markiert (siehe find_stale_fields).
+    fields_to_update = pd.DataFrame({column: df[column].isna() | (df[column].astype(object) == "") for column in columns}, index=df.index)
+
+    if max_age_days is None:
+        return fields_to_update
+
+    return fields_to_update | find_stale_fields(df, field_updates, columns, max_age_days)
+
+def find_stale_fields(df: pd.DataFrame, field_updates: pd.DataFrame, columns: List[str], max_age_days: float) -> pd.DataFrame:
+    # Markiert (True) alle nicht leeren Felder der angegebenen Spalten, die älter als die angegebene Anzahl an Tagen sind oder deren Alter
+    # unbekannt ist (z.B. bei Berichten, die vor der Erfassung der Zeitpunkte geladen wurden). Leere Felder gelten nicht als veraltet.
+    updated_at = field_updates.pivot_table(index=KEY_COLUMN, columns="COLUMN_NAME", values="UPDATED_AT", aggfunc="max") if not field_updates.empty else pd.DataFrame()
+    updated_at = updated_at.reindex(index=df[KEY_COLUMN].values, columns=columns)
+    updated_at.index = df.index
+
+    has_value = pd.DataFrame({column: df[column].notna() & (df[column].astype(object) != "") for column in columns}, index=df.index)
+
+    return has_value & (updated_at.isna() | (updated_at < time.time() - max_age_days * 86400))
+
+def import_excel(path_sample_store_file: str, path_sample_excel_file: str) -> bool:
+    # Einmalige Übernahme eines Samples, das noch als Excel-Datei vorliegt.
+    if exists(path_sample_store_file) or not os.path.exists(path_sample_excel_file):
+        return False
+
+    df = pd.read_excel(path_sample_excel_file, sheet_name="DATA", index_col=0)
+
+    create(path_sample_store_file)
+    append(path_sample_store_file, df)
+
+    return True
+
+def export_excel(path_sample_store_file: str, path_sample_excel_file: str):
+    load(path_sample_store_file).to_excel(path_sample_excel_file, sheet_name="DATA")
+
+@contextmanager
+def _connect(path_sample_store_file: str) -> Iterator[sqlite3.Connection]:
+    # Alle Änderungen innerhalb des Blocks werden als eine Transaktion geschrieben und die Verbindung anschließend geschlossen.
+    connection = sqlite3.connect(path_sample_store_file)
+
+    try:
+        with connection:
+            yield connection
+    finally:
+        connection.close()
+
+def _create_key_index(connection: sqlite3.Connection):
+    if connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (KEY_INDEX_NAME, )).fetchone() is not None:
+        return
+
+    # Samples früherer Versionen können einen Bericht mehrfach enthalten. Erhalten bleibt jeweils die zuletzt geschriebene Zeile.
+    connection.execute("DELETE FROM {0} WHERE {1} IS NOT NULL AND ROW_ID NOT IN (SELECT MAX(ROW_ID) FROM {0} WHERE {1} IS NOT NULL GROUP BY {1})".format(TABLE_NAME, _quote(KEY_COLUMN)))
+    connection.execute("DROP INDEX IF EXISTS IDX_{}_{}".format(TABLE_NAME, KEY_COLUMN))
+    connection.execute("CREATE UNIQUE INDEX {} ON {} ({})".format(KEY_INDEX_NAME, TABLE_NAME, _quote(KEY_COLUMN)))
+
+def _quote(column: str) -> str:
+    # Spaltennamen wie "TOTAL_ASSETS_T-1" sind nur in Anführungszeichen gültige Bezeichner.
+    return "\"{}\"".format(column)
+
+def _rows(df: pd.DataFrame, columns: List[str]):
+    for row in df[columns].itertuples(index=False, name=None):
+        yield tuple(_to_sql_value(value, COLUMN_TYPES[column]) for column, value in zip(columns, row))
+
+def _to_sql_value(value, column_type: str):
+    if value is None or (not isinstance(value, str) and pd.isnull(value)):
+        return None
+
+    if isinstance(value, str):
+        if value == "":
+            return None
+
+        if column_type == "TEXT":
+            return value
+
+        # Werte, die sich nicht als Zahl darstellen lassen (z.B. fehlerhafte Antworten), werden als leer gespeichert.
+        try:
+            return float(value) if column_type == "REAL" else int(float(value))
+        except ValueError:
+            return None
+
+    if column_type == "TEXT":
+        return str(value)
+
+    if isinstance(value, (np.integer, int)) and column_type == "INTEGER":
+        return int(value)
+
+    return float(value) if column_type == "REAL" else int(value)
+
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    for column in df.columns:
+        column_type = COLUMN_TYPES[column]
+
+        if column in CATEGORICAL_COLUMNS:
+            df[column] = df[column].astype("category")
+        elif column_type == "TEXT":
+            df[column] = df[column].astype(object)
+        else:
+            # INTEGER-Spalten mit leeren Werten (NaN) werden als float geliefert.
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+
+    return df
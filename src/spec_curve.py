@@ -0,0 +1,259 @@
+import itertools
+import os
+from typing import List, NamedTuple, Optional, Tuple
+
+import yaml
+
+import numpy as np
+import pandas as pd
+import patsy
+import scipy.stats
+import matplotlib.pyplot as plt
+
+import inference
+import regression_models
+
+# Spezifikationskurve: Schätzung aller Kombinationen der Kontrollvariablen für die Regressionsgleichung und Darstellung des Koeffizienten der
+# untersuchten Variable (focal) über die Spezifikationen hinweg. Die Design-Matrix mit allen Variablen wird einmalig erstellt. Je Spezifikation
+# wird nur eine Auswahl von Spalten verwendet. Für Spezifikationen mit denselben Beobachtungen wird die Matrix X'X einmal berechnet. Die
+# Koeffizienten und Standardfehler werden für alle Spezifikationen mit gleicher Anzahl an Spalten gemeinsam über Cholesky-Zerlegungen der
+# entsprechenden Teilmatrizen (NumPy, gestapelt) ermittelt. Die vollständigen Ergebnisse (summary) werden nur für ausgewählte Spezifikationen über
+# das Register der Regressionsmodelle (regression_models) erstellt.
+
+SPEC_CURVE_DIR_NAME = "spec_curve"
+
+INTERCEPT = "Intercept"
+
+# Anteil der Quadratsumme einer Spalte, der nach Abzug der übrigen Spalten mindestens verbleiben muss (sonst gilt die Matrix als nicht vollrangig).
+RANK_TOLERANCE = 1e-10
+
+class SpecCurveConfig(NamedTuple):
+    dependent: str
+    focal: str
+    fixed: List[str]
+    choices: List[List[Optional[str]]]
+
+def load_config(path_models_file: str = regression_models.PATH_MODELS_FILE) -> SpecCurveConfig:
+    with open(path_models_file, "r", encoding="utf-8") as yml_file:
+        config = (yaml.load(yml_file, Loader=yaml.Loader) or {}).get("spec_curve")
+
+    if not config or not config.get("dependent") or not config.get("focal"):
+        raise ValueError("Für die Spezifikationskurve werden in \"{}\" mindestens die abhängige Variable (dependent) und die untersuchte Variable (focal) benötigt.".format(path_models_file))
+
+    choices = [[alternative if alternative is None else str(alternative) for alternative in choice] for choice in config.get("choices", []) if choice]
+
+    return SpecCurveConfig(str(config["dependent"]), str(config["focal"]), [str(term) for term in config.get("fixed", [])], choices)
+
+def get_specifications(config: SpecCurveConfig) -> List[Tuple[Optional[str], ...]]:
+    # Je Spezifikation die gewählte Alternative jeder Auswahl (None: ohne Variable)
+    return list(itertools.product(*config.choices))
+
+def get_terms(config: SpecCurveConfig, specification: Tuple[Optional[str], ...]) -> List[str]:
+    return [config.focal] + config.fixed + [term for term in specification if term is not None]
+
+def get_formula(config: SpecCurveConfig, specification: Tuple[Optional[str], ...]) -> str:
+    return "{} ~ {}".format(config.dependent, " + ".join(get_terms(config, specification)))
+
+def get_spec_name(spec_id: int) -> str:
+    return "spec{:04d}".format(spec_id)
+
+def estimate(df: pd.DataFrame, config: SpecCurveConfig) -> pd.DataFrame:
+    specifications = get_specifications(config)
+
+    # Design-Matrix mit allen Variablen. Fehlende Werte werden zunächst übernommen und erst je Spezifikation (wie von patsy) ausgeschlossen.
+    all_terms = list(dict.fromkeys([config.focal] + config.fixed + [term for choice in config.choices for term in choice if term is not None]))
+
+    y, X = patsy.dmatrices("{} ~ {}".format(config.dependent, " + ".join(all_terms)), data=df, NA_action=patsy.NAAction(NA_types=[]), return_type="dataframe")
+
+    term_slices = X.design_info.term_name_slices
+
+    for term in all_terms:
+        if term not in term_slices:
+            raise ValueError("Der Term \"{}\" ist kein Term der Regressionsgleichung (verwenden Sie die Schreibweise von patsy).".format(term))
+
+    if term_slices[config.focal].stop - term_slices[config.focal].start != 1:
+        raise ValueError("Die untersuchte Variable \"{}\" muss genau einer Spalte der Design-Matrix entsprechen.".format(config.focal))
+
+    y_values = y.to_numpy(dtype=np.float64)[:, 0]
+    X_values = X.to_numpy(dtype=np.float64)
+
+    column_focal = term_slices[config.focal].start
+
+    missing_y = np.isnan(y_values)
+    missing_terms = {term: np.isnan(X_values[:, term_slice]).any(axis=1) for term, term_slice in term_slices.items()}
+
+    # Spalten und ausgeschlossene Beobachtungen je Spezifikation. Spezifikationen mit denselben Beobachtungen verwenden dieselbe Matrix X'X.
+    columns = []
+    groups = {}
+
+    for i, specification in enumerate(specifications):
+        terms = [INTERCEPT] + get_terms(config, specification)
+
+        columns.append(np.sort(np.concatenate([np.arange(term_slices[term].start, term_slices[term].stop) for term in terms])))
+
+        missing = missing_y.copy()
+
+        for term in terms:
+            missing |= missing_terms[term]
+
+        groups.setdefault(missing.tobytes(), (missing, []))[1].append(i)
+
+    results = np.full((len(specifications), 6), np.nan)
+
+    for missing, spec_indices in groups.values():
+        rows = ~missing
+
+        X_rows = X_values[rows]
+        y_rows = y_values[rows]
+
+        gram = X_rows.T @ X_rows
+        xty = X_rows.T @ y_rows
+        yty = y_rows @ y_rows
+        tss = np.sum((y_rows - y_rows.mean()) ** 2)
+
+        n = int(rows.sum())
+
+        # Gemeinsame Berechnung aller Spezifikationen mit gleicher Anzahl an Spalten
+        by_k = {}
+
+        for i in spec_indices:
+            by_k.setdefault(len(columns[i]), []).append(i)
+
+        for k, batch in by_k.items():
+            index = np.stack([columns[i] for i in batch])
+
+            results[batch] = _solve_batch(gram[index[:, :, None], index[:, None, :]], xty[index], yty, tss, n, (index == column_focal).argmax(axis=1))
+
+    df_results = pd.DataFrame({"SPEC": np.arange(1, len(specifications) + 1)})
+
+    for j, choice in enumerate(config.choices):
+        df_results["CHOICE_{}".format(j + 1)] = [specification[j] or "" for specification in specifications]
+
+    df_results["COEF"] = results[:, 0]
+    df_results["STD_ERR"] = results[:, 1]
+    df_results["T"] = results[:, 0] / results[:, 1]
+    df_results["P"] = 2 * scipy.stats.t.sf(np.abs(df_results["T"]), results[:, 5])
+
+    t_critical = scipy.stats.t.ppf(0.975, results[:, 5])
+
+    df_results["CI_LOWER"] = results[:, 0] - t_critical * results[:, 1]
+    df_results["CI_UPPER"] = results[:, 0] + t_critical * results[:, 1]
+    df_results["R2"] = results[:, 2]
+    df_results["ADJ_R2"] = results[:, 3]
+    df_results["N"] = results[:, 4]
+    df_results["K"] = [len(c) for c in columns]
+    df_results["FORMULA"] = [get_formula(config, specification) for specification in specifications]
+
+    return df_results
+
+def _solve_batch(grams: np.ndarray, xtys: np.ndarray, yty: float, tss: float, n: int, positions_focal: np.ndarray) -> np.ndarray:
+    # Liefert je Spezifikation Koeffizient und Standardfehler der untersuchten Variable, R², adj. R², Anzahl der Beobachtungen und Freiheitsgrade.
+    try:
+        cholesky = np.linalg.cholesky(grams)
+        full_rank = np.ones(len(grams), dtype=bool)
+    except np.linalg.LinAlgError:
+        # Mindestens eine Teilmatrix ist nicht positiv definit. Die Spezifikationen werden dann einzeln zerlegt.
+        cholesky = np.zeros_like(grams)
+        full_rank = np.zeros(len(grams), dtype=bool)
+
+        for i in range(len(grams)):
+            try:
+                cholesky[i] = np.linalg.cholesky(grams[i])
+                full_rank[i] = True
+            except np.linalg.LinAlgError:
+                cholesky[i] = np.eye(grams.shape[1])
+
+    # Spalten, die (nahezu) vollständig durch die übrigen Spalten erklärt werden
+    diagonal = np.diagonal(cholesky, axis1=1, axis2=2)
+    full_rank &= np.all(diagonal ** 2 > RANK_TOLERANCE * np.maximum(np.diagonal(grams, axis1=1, axis2=2), 1e-300), axis=1)
+
+    cholesky[~full_rank] = np.eye(grams.shape[1])
+
+    # (X'X)^-1 = L^-T L^-1
+    cholesky_inv = np.linalg.inv(cholesky)
+    grams_inv = np.transpose(cholesky_inv, (0, 2, 1)) @ cholesky_inv
+
+    betas = np.einsum("bij,bj->bi", grams_inv, xtys)
+
+    k = grams.shape[1]
+    df_resid = n - k
+
+    rss = np.maximum(yty - np.einsum("bi,bi->b", betas, xtys), 0)
+    sigma2 = rss / df_resid if df_resid > 0 else np.full(len(grams), np.nan)
+
+    batch = np.arange(len(grams))
+
+    results = np.empty((len(grams), 6))
+    results[:, 0] = betas[batch, positions_focal]
+    results[:, 1] = np.sqrt(sigma2 * grams_inv[batch, positions_focal, positions_focal])
+    results[:, 2] = 1 - rss / tss
+    results[:, 3] = 1 - (1 - results[:, 2]) * (n - 1) / df_resid if df_resid > 0 else np.nan
+    results[:, 4] = n
+    results[:, 5] = df_resid
+
+    results[~full_rank, :4] = np.nan
+
+    return results
+
+def plot(df_results: pd.DataFrame, config: SpecCurveConfig, path_plot_file: str):
+    df_sorted = df_results.dropna(subset=["COEF"]).sort_values("COEF").reset_index(drop=True)
+
+    x = np.arange(len(df_sorted))
+    significant = (df_sorted["P"] < 0.05).to_numpy()
+
+    alternatives = [(j, term) for j, choice in enumerate(config.choices) for term in choice if term is not None]
+
+    fig, (ax_coef, ax_choices) = plt.subplots(2, 1, sharex=True, figsize=(12, 4 + 0.25 * len(alternatives)), gridspec_kw={"height_ratios": [2, max(1, 0.15 * len(alternatives))]})
+
+    # Oben: Koeffizient der untersuchten Variable mit 95%-Konfidenzintervall, sortiert nach Größe
+    ax_coef.fill_between(x, df_sorted["CI_LOWER"], df_sorted["CI_UPPER"], color="lightgrey", step="mid")
+    ax_coef.scatter(x[significant], df_sorted["COEF"][significant], s=6, color="tab:blue", label="p < 0,05")
+    ax_coef.scatter(x[~significant], df_sorted["COEF"][~significant], s=6, color="tab:red", label="p >= 0,05")
+    ax_coef.axhline(0, color="black", linewidth=0.5)
+    ax_coef.set_ylabel("Koeffizient {}".format(config.focal))
+    ax_coef.legend(loc="upper left", fontsize=8)
+
+    # Unten: in der jeweiligen Spezifikation enthaltene Variablen
+    for row, (j, term) in enumerate(alternatives):
+        included = (df_sorted["CHOICE_{}".format(j + 1)] == term).to_numpy()
+
+        ax_choices.scatter(x[included], np.full(included.sum(), row), s=2, marker="|", color="black")
+
+    ax_choices.set_yticks(range(len(alternatives)))
+    ax_choices.set_yticklabels([term for j, term in alternatives], fontsize=7)
+    ax_choices.set_ylim(-0.5, len(alternatives) - 0.5)
+    ax_choices.invert_yaxis()
+    ax_choices.set_xlabel("Spezifikation (sortiert nach Koeffizient)")
+
+    plt.tight_layout()
+    fig.savefig(path_plot_file, dpi=150)
+    plt.close(fig)
+
+def run(df: pd.DataFrame, config: SpecCurveConfig, sample_name: str, path_sample_regression_analyses_dir: str, summary_spec_ids: List[int], workers: int = 1, inference_settings: Optional[inference.InferenceSettings] = None) -> Tuple[pd.DataFrame, List[str]]:
+    path_spec_curve_dir = "{}/{}".format(path_sample_regression_analyses_dir, SPEC_CURVE_DIR_NAME)
+
+    df_results = estimate(df, config)
+
+    path_results_file = "{}/{}_spec_curve.xlsx".format(path_spec_curve_dir, sample_name)
+    path_plot_file = "{}/{}_spec_curve.png".format(path_spec_curve_dir, sample_name)
+
+    os.makedirs(path_spec_curve_dir, exist_ok=True)
+
+    df_results.to_excel(path_results_file, sheet_name="SPEC_CURVE", index=False)
+
+    plot(df_results, config, path_plot_file)
+
+    # Vollständige Ergebnisse (summary) der ausgewählten Spezifikationen
+    specifications = get_specifications(config)
+
+    specs = []
+
+    for spec_id in summary_spec_ids:
+        if not 1 <= spec_id <= len(specifications):
+            raise ValueError("Die Spezifikation {} existiert nicht (1 bis {}).".format(spec_id, len(specifications)))
+
+        specs.append(regression_models.ModelSpec(get_spec_name(spec_id), get_formula(config, specifications[spec_id - 1]), "{}/{}".format(SPEC_CURVE_DIR_NAME, get_spec_name(spec_id))))
+
+    summaries = regression_models.run_models(df, specs, sample_name, path_sample_regression_analyses_dir, workers, inference_settings) if specs else []
+
+    return df_results, summaries
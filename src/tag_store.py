@@ -0,0 +1,231 @@
+import array
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Spaltenorientierter Speicher für die Tags der Berichte. Je Bericht wird eine komprimierte NumPy-Datei (.npz) im Ordner "reports" abgelegt,
+# die folgende Spalten (Arrays) enthält:
+#  qname_dictionary: Die im Bericht verwendeten qualifizierten Namen (jeweils nur einmal)
+#  qname_codes: Je Tag der Index des qualifizierten Namens im Dictionary (Dictionary-Encoding)
+#  is_extension: Bitmap, ob es sich bei dem Tag um ein Element der Erweiterungstaxonomie handelt
+#  value_blob/value_offsets: Die Werte der Tags als zusammenhängender UTF-8-Block mit den Startpositionen je Tag
+#  value_hashes: Alternativ zu den Werten nur die SHA1-Prüfsummen der Werte (je Tag 20 Byte)
+#
+# Die Spalten einer .npz-Datei werden beim Lesen einzeln geladen, sodass z.B. die qualifizierten Namen aller Berichte gelesen werden können,
+# ohne die (großen) Werte der Textblöcke zu laden.
+#
+# Beim Schreiben (TagWriter) werden die Tags einzeln übergeben. Im Speicher verbleiben je Tag nur der Code des qualifizierten Namens, das Bit für
+# Erweiterungselemente und die Startposition des Werts. Die Werte selbst werden sofort in eine temporäre Datei geschrieben und beim Abschluss
+# blockweise in die .npz-Datei übernommen, sodass der Speicherbedarf auch bei sehr großen Berichten begrenzt bleibt.
+
+FILE_EXTENSION = ".npz"
+LEGACY_FILE_EXTENSION = ".json"
+
+# Speicherung der Werte: "text" speichert die Werte vollständig, "hash" nur deren SHA1-Prüfsumme.
+VALUES_TEXT = "text"
+VALUES_HASH = "hash"
+VALUES_MODES = (VALUES_TEXT, VALUES_HASH)
+
+COLUMN_QNAME = "qname"
+COLUMN_IS_EXTENSION = "is_extension"
+COLUMN_VALUE = "value"
+COLUMN_VALUE_HASH = "value_hash"
+COLUMNS = (COLUMN_QNAME, COLUMN_IS_EXTENSION, COLUMN_VALUE, COLUMN_VALUE_HASH)
+
+def get_path_report_file(path_sample_reports_dir: str, esef_package_name: str) -> str:
+    return "{}/{}{}".format(path_sample_reports_dir, esef_package_name, FILE_EXTENSION)
+
+def save(path_sample_reports_dir: str, esef_package_name: str, tags: Iterable[Tuple[str, Optional[str], bool]], values_mode: str = VALUES_TEXT) -> str:
+    with TagWriter(path_sample_reports_dir, esef_package_name, values_mode) as tag_writer:
+        for qname, value, is_extension in tags:
+            tag_writer.add(qname, value, is_extension)
+
+        return tag_writer.close()
+
+class TagWriter:
+    def __init__(self, path_sample_reports_dir: str, esef_package_name: str, values_mode: str = VALUES_TEXT):
+        self.path_report_file = get_path_report_file(path_sample_reports_dir, esef_package_name)
+        self.values_mode = values_mode
+        self.count = 0
+
+        self._qname_dictionary = {}
+        self._qname_codes = array.array("i")
+        self._is_extension = array.array("B")
+        self._value_offsets = array.array("q", [0])
+
+        # Temporäre Datei für die Werte bzw. deren Prüfsummen im Ordner des Berichts
+        self._values_file = tempfile.TemporaryFile(dir=path_sample_reports_dir)
+
+    def __enter__(self) -> "TagWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.discard()
+
+    def add(self, qname: str, value: Optional[str], is_extension: bool):
+        self._qname_codes.append(self._qname_dictionary.setdefault(qname, len(self._qname_dictionary)))
+        self._is_extension.append(is_extension)
+
+        value = ("" if value is None else str(value)).encode("utf-8")
+
+        if self.values_mode == VALUES_HASH:
+            self._values_file.write(hashlib.sha1(value).digest())
+        else:
+            self._values_file.write(value)
+            self._value_offsets.append(self._value_offsets[-1] + len(value))
+
+        self.count += 1
+
+    def close(self) -> str:
+        # Schreibt die .npz-Datei und liefert deren Pfad.
+        self._values_file.flush()
+
+        size = self._values_file.seek(0, os.SEEK_END)
+
+        # Die Werte werden aus der temporären Datei eingeblendet (memory-mapped) und beim Komprimieren blockweise gelesen.
+        values = np.memmap(self._values_file, dtype=np.uint8, mode="r") if size > 0 else np.zeros(0, dtype=np.uint8)
+
+        columns = {
+            "count": np.array(self.count, dtype=np.int64),
+            "qname_dictionary": np.array(list(self._qname_dictionary), dtype=np.str_),
+            "qname_codes": np.frombuffer(self._qname_codes, dtype=np.int32) if self.count else np.zeros(0, dtype=np.int32),
+            "is_extension": np.packbits(np.frombuffer(self._is_extension, dtype=np.bool_)) if self.count else np.zeros(0, dtype=np.uint8),
+        }
+
+        if self.values_mode == VALUES_HASH:
+            columns["value_hashes"] = values.reshape(-1, 20)
+        else:
+            columns["value_blob"] = values
+            columns["value_offsets"] = np.frombuffer(self._value_offsets, dtype=np.int64)
+
+        # Atomares Schreiben über eine temporäre Datei (np.savez_compressed ergänzt die Endung ".npz" nur, wenn sie fehlt).
+        path_report_tmp_file = self.path_report_file + ".tmp" + FILE_EXTENSION
+
+        np.savez_compressed(path_report_tmp_file, **columns)
+
+        os.replace(path_report_tmp_file, self.path_report_file)
+
+        del columns, values
+
+        self.discard()
+
+        return self.path_report_file
+
+    def discard(self):
+        # Verwirft die temporäre Datei (z.B. wenn der Bericht nicht gespeichert wird).
+        self._values_file.close()
+
+def list_reports(path_sample_reports_dir: str) -> List[str]:
+    esef_package_names = set()
+
+    for extension in (FILE_EXTENSION, LEGACY_FILE_EXTENSION):
+        for path in glob.glob("{}/*{}".format(glob.escape(path_sample_reports_dir), extension)):
+            esef_package_names.add(os.path.basename(path)[:-len(extension)])
+
+    return sorted(esef_package_names)
+
+def read_report(path_sample_reports_dir: str, esef_package_name: str) -> List[Tuple[str, Optional[str], bool]]:
+    # Liefert die Tags eines Berichts im bisherigen Format (qname, value, is_extension). Bei gespeicherten Prüfsummen wird statt des Werts die Prüfsumme geliefert.
+    path_report_file = get_path_report_file(path_sample_reports_dir, esef_package_name)
+
+    if not os.path.exists(path_report_file):
+        return [tuple(tag) for tag in _read_legacy_report(path_sample_reports_dir, esef_package_name)]
+
+    with np.load(path_report_file) as report:
+        qnames = _read_column(report, COLUMN_QNAME)
+        is_extension = _read_column(report, COLUMN_IS_EXTENSION)
+
+        if "value_blob" in report.files:
+            values = _read_column(report, COLUMN_VALUE)
+        else:
+            values = _read_column(report, COLUMN_VALUE_HASH)
+
+    return list(zip(qnames.tolist(), values, is_extension.tolist()))
+
+def read_column(path_sample_reports_dir: str, column: str, esef_package_names: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    # Liest eine einzelne Spalte aller (bzw. der angegebenen) Berichte des Samples. Die übrigen Spalten werden nicht geladen.
+    if column not in COLUMNS:
+        raise ValueError("Unbekannte Spalte \"{}\". Zulässig sind: {}".format(column, ", ".join(COLUMNS)))
+
+    if esef_package_names is None:
+        esef_package_names = list_reports(path_sample_reports_dir)
+
+    names = []
+    columns = []
+
+    for esef_package_name in esef_package_names:
+        path_report_file = get_path_report_file(path_sample_reports_dir, esef_package_name)
+
+        if os.path.exists(path_report_file):
+            with np.load(path_report_file) as report:
+                data = _read_column(report, column)
+        else:
+            data = _read_legacy_column(path_sample_reports_dir, esef_package_name, column)
+
+        names.append(np.full(len(data), esef_package_name, dtype=object))
+        columns.append(np.asarray(data, dtype=object) if column in (COLUMN_VALUE, COLUMN_VALUE_HASH) else np.asarray(data))
+
+    if not columns:
+        return pd.DataFrame(columns=["ESEF_PACKAGE_NAME", column])
+
+    df = pd.DataFrame({
+        "ESEF_PACKAGE_NAME": pd.Categorical(np.concatenate(names)),
+        column: np.concatenate(columns),
+    })
+
+    # Die qualifizierten Namen wiederholen sich stark und werden daher als kategoriale Spalte geliefert.
+    if column == COLUMN_QNAME:
+        df[column] = df[column].astype("category")
+
+    return df
+
+def _read_column(report, column: str):
+    count = int(report["count"])
+
+    if column == COLUMN_QNAME:
+        return report["qname_dictionary"][report["qname_codes"]]
+
+    if column == COLUMN_IS_EXTENSION:
+        return np.unpackbits(report["is_extension"], count=count).astype(np.bool_)
+
+    if column == COLUMN_VALUE:
+        if "value_blob" not in report.files:
+            return [None] * count
+
+        blob = report["value_blob"].tobytes()
+        offsets = report["value_offsets"]
+
+        return [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(count)]
+
+    if column == COLUMN_VALUE_HASH:
+        if "value_hashes" in report.files:
+            return [value_hash.tobytes().hex() for value_hash in report["value_hashes"]]
+
+        return [hashlib.sha1(value.encode("utf-8")).hexdigest() for value in _read_column(report, COLUMN_VALUE)]
+
+    raise ValueError("Unbekannte Spalte \"{}\".".format(column))
+
+def _read_legacy_report(path_sample_reports_dir: str, esef_package_name: str) -> list:
+    # Berichte, die vor der Einführung des spaltenorientierten Speichers als JSON abgelegt wurden
+    with open("{}/{}{}".format(path_sample_reports_dir, esef_package_name, LEGACY_FILE_EXTENSION), "r") as file:
+        return json.load(file)
+
+def _read_legacy_column(path_sample_reports_dir: str, esef_package_name: str, column: str) -> list:
+    tags = _read_legacy_report(path_sample_reports_dir, esef_package_name)
+
+    if column == COLUMN_QNAME:
+        return [tag[0] for tag in tags]
+
+    if column == COLUMN_IS_EXTENSION:
+        return [bool(tag[2]) for tag in tags]
+
+    if column == COLUMN_VALUE:
+        return [tag[1] for tag in tags]
+
+    return [hashlib.sha1(("" if tag[1] is None else str(tag[1])).encode("utf-8")).hexdigest() for tag in tags]
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+# Die Module des Programms liegen flach in src und werden (wie beim Aufruf über src/__main__.py) direkt importiert.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+@pytest.fixture
+def eikon_stand_in(monkeypatch):
+    # Ersetzt die Eikon Data API durch den Stand-in (ohne Zugriffslimit, Cache und Tageslimit). Wiederholungen erfolgen ohne Wartezeit.
+    import eikon_client
+    import eikon_database
+    import eikon_standin
+
+    monkeypatch.setattr(eikon_database, "_rate_limiter", eikon_client.TokenBucket(1000))
+    monkeypatch.setattr(eikon_database, "_quota_ledger", None)
+    monkeypatch.setattr(eikon_database, "_cache", None)
+    monkeypatch.setattr(eikon_client, "retry_delay", lambda tries: 0)
+
+    stand_in = eikon_standin.install(eikon_standin.EikonStandIn(requests_per_second=None))
+
+    yield stand_in
+
+    eikon_standin.uninstall()
@@ -0,0 +1,103 @@
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import eikon_cache
+
+DAY = 86400
+
+TRF_ISIN = {"TR.ISIN": {}}
+TRF_COMMON_NAME = {"TR.CommonName": {}}
+TRF_FREE_FLOAT = {"TR.FreeFloatPct": {}}
+TRF_TOTAL_ASSETS = {"TR.F.TotAssets": {"params": {"Scale": "6", "Curn": "EUR"}}}
+
+class _Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock(1700000000.0)
+
+    monkeypatch.setattr(eikon_cache, "time", types.SimpleNamespace(time=clock.time))
+
+    return clock
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = eikon_cache.EikonCache(eikon_cache.get_path_cache_file(str(tmp_path)))
+
+    yield cache
+
+    cache.close()
+
+def test_field_ttl(cache, clock):
+    cache.put_many("DE0001", [TRF_ISIN, TRF_COMMON_NAME, TRF_FREE_FLOAT], {}, ["DE0001", "Company", np.float64(12.5)])
+
+    assert cache.get_many("DE0001", [TRF_ISIN, TRF_COMMON_NAME, TRF_FREE_FLOAT], {}) == ["DE0001", "Company", 12.5]
+
+    # Nach 30 Tagen sind die Werte noch gültig, danach verfallen der Name (eigene TTL) und der Streubesitz (DEFAULT_TTL_DAYS), nicht aber die ISIN.
+    clock.now += 30 * DAY
+
+    assert cache.get_many("DE0001", [TRF_ISIN, TRF_COMMON_NAME, TRF_FREE_FLOAT], {}) == ["DE0001", "Company", 12.5]
+
+    clock.now += 1
+
+    assert cache.get_many("DE0001", [TRF_ISIN, TRF_COMMON_NAME, TRF_FREE_FLOAT], {}) == ["DE0001", eikon_cache.MISSING, eikon_cache.MISSING]
+
+def test_values_with_sdate_never_expire(cache, clock):
+    cache.put_many("DE0001", [TRF_TOTAL_ASSETS, TRF_COMMON_NAME], {"SDate": "20211231"}, [1234.5, "Company"])
+
+    clock.now += 3650 * DAY
+
+    # Historische Werte zu einem Stichtag verfallen nicht; Felder mit eigener TTL verfallen auch mit Stichtag.
+    assert cache.get("DE0001", TRF_TOTAL_ASSETS, {"SDate": "20211231"}) == 1234.5
+    assert cache.get("DE0001", TRF_COMMON_NAME, {"SDate": "20211231"}) is eikon_cache.MISSING
+
+    # Derselbe Wert ohne bzw. zu einem anderen Stichtag ist ein anderer Eintrag.
+    assert cache.get("DE0001", TRF_TOTAL_ASSETS, {"SDate": "20201231"}) is eikon_cache.MISSING
+    assert cache.get("DE0001", TRF_TOTAL_ASSETS, {}) is eikon_cache.MISSING
+
+def test_empty_values_not_cached(cache, clock):
+    cache.put_many("DE0001", [TRF_ISIN, TRF_COMMON_NAME, TRF_FREE_FLOAT, TRF_TOTAL_ASSETS], {}, [pd.NA, "", None, np.nan])
+
+    assert cache.get_many("DE0001", [TRF_ISIN, TRF_COMMON_NAME, TRF_FREE_FLOAT, TRF_TOTAL_ASSETS], {}) == [eikon_cache.MISSING] * 4
+    assert cache.statistics() == (0, 4)
+
+def test_instrument_case_insensitive(cache, clock):
+    cache.put_many("de0001", [TRF_ISIN], {}, ["DE0001"])
+
+    assert cache.get("DE0001", TRF_ISIN, {}) == "DE0001"
+    assert cache.statistics() == (1, 0)
+
+def test_invalidate_fields(cache, clock):
+    cache.put_many("DE0001", [TRF_ISIN, TRF_FREE_FLOAT], {}, ["DE0001", 12.5])
+    cache.put_many("DE0002", [TRF_ISIN, TRF_FREE_FLOAT], {}, ["DE0002", 7.0])
+
+    # Die Angabe der Datenfelder unterscheidet nicht zwischen Groß- und Kleinschreibung.
+    assert cache.invalidate(["tr.freefloatpct"]) == 2
+
+    assert cache.get_many("DE0001", [TRF_ISIN, TRF_FREE_FLOAT], {}) == ["DE0001", eikon_cache.MISSING]
+    assert cache.get_many("DE0002", [TRF_ISIN, TRF_FREE_FLOAT], {}) == ["DE0002", eikon_cache.MISSING]
+
+    assert cache.invalidate() == 2
+
+    assert cache.get("DE0001", TRF_ISIN, {}) is eikon_cache.MISSING
+
+def test_persistent(tmp_path, clock):
+    path_cache_file = eikon_cache.get_path_cache_file(str(tmp_path))
+
+    cache = eikon_cache.EikonCache(path_cache_file)
+    cache.put_many("DE0001", [TRF_TOTAL_ASSETS], {"SDate": "20211231"}, [np.int64(1234)])
+    cache.close()
+
+    cache = eikon_cache.EikonCache(path_cache_file)
+
+    assert cache.get("DE0001", TRF_TOTAL_ASSETS, {"SDate": "20211231"}) == 1234
+
+    cache.close()
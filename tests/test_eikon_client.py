@@ -0,0 +1,119 @@
+import json
+import time
+from datetime import date
+
+import pytest
+
+import eikon_client
+
+class _Today:
+    # Ersatz für datetime.date in eikon_client mit einstellbarem aktuellem Tag
+    day = date(2024, 5, 6)
+
+    @classmethod
+    def today(cls) -> date:
+        return cls.day
+
+@pytest.fixture
+def today(monkeypatch):
+    monkeypatch.setattr(_Today, "day", date(2024, 5, 6))
+    monkeypatch.setattr(eikon_client, "date", _Today)
+
+    return _Today
+
+def _saved_requests(path_quota_file) -> int:
+    with open(path_quota_file, "r") as file:
+        return json.load(file)["requests"]
+
+def test_token_bucket_rate():
+    bucket = eikon_client.TokenBucket(50)
+
+    start = time.monotonic()
+
+    for i in range(11):
+        bucket.acquire()
+
+    # Das erste Token liegt bereit, die übrigen zehn werden im Abstand von 1/50 s erzeugt.
+    assert time.monotonic() - start >= 10 / 50 * 0.95
+
+def test_token_bucket_capacity():
+    bucket = eikon_client.TokenBucket(1, capacity=3)
+
+    start = time.monotonic()
+
+    for i in range(3):
+        bucket.acquire()
+
+    # Bis zur Kapazität werden Anfragen ohne Wartezeit zugelassen.
+    assert time.monotonic() - start < 0.5
+
+def test_quota_ledger_block_booking(tmp_path, today):
+    path_quota_file = str(tmp_path / "eikon_quota.json")
+
+    ledger = eikon_client.QuotaLedger(path_quota_file, limit=100, reserve=10, block_size=5)
+
+    ledger.reserve_request()
+
+    # Die erste Anfrage verbucht einen Block von fünf Anfragen im Voraus.
+    assert ledger.requests_today == 1
+    assert _saved_requests(path_quota_file) == 5
+
+    for i in range(4):
+        ledger.reserve_request()
+
+    assert _saved_requests(path_quota_file) == 5
+
+    ledger.reserve_request()
+
+    assert _saved_requests(path_quota_file) == 10
+
+    # close() schreibt den genauen Stand, der beim nächsten Programmlauf übernommen wird.
+    ledger.close()
+
+    assert _saved_requests(path_quota_file) == 6
+
+    ledger = eikon_client.QuotaLedger(path_quota_file, limit=100, reserve=10, block_size=5)
+
+    assert ledger.requests_today == 6
+    assert ledger.remaining_today == 100 - 10 - 6
+
+def test_quota_ledger_exhausted(tmp_path, today):
+    path_quota_file = str(tmp_path / "eikon_quota.json")
+
+    ledger = eikon_client.QuotaLedger(path_quota_file, limit=10, reserve=7, block_size=50)
+
+    for i in range(3):
+        ledger.reserve_request()
+
+    # Der im Voraus verbuchte Block ist auf das Tageslimit abzüglich der Reserve begrenzt.
+    assert _saved_requests(path_quota_file) == 3
+
+    with pytest.raises(eikon_client.QuotaExhaustedError) as exc_info:
+        ledger.reserve_request()
+
+    assert exc_info.value.requests_today == 3
+    assert exc_info.value.limit == 10
+    assert ledger.requests_today == 3
+
+def test_quota_ledger_roll_over(tmp_path, today):
+    path_quota_file = str(tmp_path / "eikon_quota.json")
+
+    ledger = eikon_client.QuotaLedger(path_quota_file, limit=10, reserve=0, block_size=1)
+
+    for i in range(10):
+        ledger.reserve_request()
+
+    with pytest.raises(eikon_client.QuotaExhaustedError):
+        ledger.reserve_request()
+
+    # Am nächsten Tag beginnt die Zählung (im laufenden Programm und beim Laden der Datei) von vorn.
+    today.day = date(2024, 5, 7)
+
+    assert eikon_client.QuotaLedger(path_quota_file, limit=10, reserve=0).requests_today == 0
+
+    ledger.reserve_request()
+
+    assert ledger.requests_today == 1
+
+    with open(path_quota_file, "r") as file:
+        assert json.load(file) == {"day": "2024-05-07", "requests": 1}
@@ -0,0 +1,361 @@
+import copy
+import time
+
+import pandas as pd
+import pytest
+
+import benchmark_eikon
+import eikon_cache
+import eikon_client
+import eikon_database
+import eikon_standin
+import sample_store
+
+from eikon import EikonError
+
+class _FailingStandIn(eikon_standin.EikonStandIn):
+    # Beantwortet die ersten "failures" Anfragen mit einem EikonError (Fehlercode "code").
+    def __init__(self, failures: int, code: int, **kwargs):
+        super().__init__(**kwargs)
+
+        self.failures = failures
+        self.code = code
+
+    def get_data(self, instruments, fields, parameters=None, **kwargs):
+        if self.failures > 0:
+            self.failures -= 1
+            self.calls += 1
+            self.errors += 1
+
+            raise EikonError(self.code, "Injected error.")
+
+        return super().get_data(instruments, fields, parameters, **kwargs)
+
+def _enriched(reports: list) -> list:
+    # Erwartete Berichte (Abruf ohne Fehler und Limits)
+    reports = copy.deepcopy(reports)
+
+    eikon_database.get_company_data(reports)
+
+    return reports
+
+def _company_data(report: list) -> list:
+    return report[eikon_database.INDEX_ISIN:]
+
+def test_call_counts(eikon_stand_in):
+    reports = benchmark_eikon.create_reports(6)
+
+    eikon_database.get_company_data(reports)
+
+    # Je Bericht: ISIN über den LEI, Unternehmensdaten zum Stichtag, Bilanzsumme zum Stichtag des Vorjahres
+    assert eikon_stand_in.calls == 3 * len(reports)
+    assert eikon_stand_in.errors == 0
+    assert all(len(report) == eikon_database.INDEX_ISIN + eikon_database.COUNT_COMPANY_DATA_FIELDS for report in reports)
+    assert all(value != "" for report in reports for value in _company_data(report))
+
+    eikon_stand_in.calls = 0
+
+    eikon_database.get_company_data_batched(benchmark_eikon.create_reports(6), batch_size=100)
+
+    # Gebündelt: eine Anfrage für die ISIN, je Stichtag (4) eine Anfrage für die Unternehmensdaten und je Stichtag des Vorjahres (4) eine für die Bilanzsumme
+    assert eikon_stand_in.calls == 1 + 4 + 4
+
+def test_retry_after_error(eikon_stand_in):
+    reports = benchmark_eikon.create_reports(2)
+    expected = _enriched(reports)
+
+    stand_in = eikon_standin.install(_FailingStandIn(2, eikon_standin.ERROR_CODE_SERVER_ERROR, requests_per_second=None))
+
+    eikon_database.get_company_data(reports)
+
+    assert stand_in.errors == 2
+    assert stand_in.calls == 3 * len(reports) + 2
+    assert reports == expected
+
+def test_report_skipped_after_max_tries(eikon_stand_in):
+    reports = benchmark_eikon.create_reports(2)
+    expected = _enriched(reports)
+
+    stand_in = eikon_standin.install(_FailingStandIn(5, eikon_standin.ERROR_CODE_TIMEOUT, requests_per_second=None))
+
+    eikon_database.get_company_data(reports)
+
+    # Der erste Bericht wird nach fünf Versuchen übersprungen und um leere Werte ergänzt, der zweite vollständig abgerufen.
+    assert stand_in.calls == 5 + 3
+    assert _company_data(reports[0]) == [""] * eikon_database.COUNT_COMPANY_DATA_FIELDS
+    assert reports[1] == expected[1]
+
+def test_batch_retry_after_error(eikon_stand_in):
+    reports = benchmark_eikon.create_reports(4)
+    expected = _enriched(reports)
+
+    stand_in = eikon_standin.install(_FailingStandIn(1, eikon_standin.ERROR_CODE_SERVER_ERROR, requests_per_second=None))
+
+    eikon_database.get_company_data_batched(reports, batch_size=100)
+
+    assert stand_in.errors == 1
+    assert reports == expected
+
+def test_too_many_requests_retried(eikon_stand_in, monkeypatch):
+    reports = benchmark_eikon.create_reports(1)
+    expected = _enriched(reports)
+
+    # Das Zugriffslimit des Stand-ins (2 Anfragen je Sekunde) ist kleiner als das des Token-Buckets, die dritte Anfrage wird mit 429 abgelehnt.
+    stand_in = eikon_standin.install(eikon_standin.EikonStandIn(requests_per_second=2))
+
+    monkeypatch.setattr(eikon_client, "retry_delay", lambda tries: 0.6)
+
+    eikon_database.get_company_data(reports)
+
+    assert stand_in.rate_limit_errors >= 1
+    assert stand_in.errors == stand_in.rate_limit_errors
+    assert reports == expected
+
+def test_token_bucket_avoids_too_many_requests(eikon_stand_in, monkeypatch):
+    reports = benchmark_eikon.create_reports(4)
+
+    stand_in = eikon_standin.install(eikon_standin.EikonStandIn(requests_per_second=10))
+
+    monkeypatch.setattr(eikon_database, "_rate_limiter", eikon_client.TokenBucket(8))
+
+    eikon_database.get_company_data(reports, workers=4)
+
+    assert stand_in.calls == 3 * len(reports)
+    assert stand_in.rate_limit_errors == 0
+
+def test_quota_exhausted(eikon_stand_in, monkeypatch, tmp_path, capsys):
+    reports = benchmark_eikon.create_reports(3)
+    expected = _enriched(reports)
+
+    eikon_stand_in.calls = 0
+
+    monkeypatch.setattr(eikon_database, "_quota_ledger", eikon_client.QuotaLedger(str(tmp_path / "quota.json"), limit=5, reserve=0))
+
+    eikon_database.get_company_data(reports)
+
+    # Nach fünf Anfragen ist das Tageslimit erreicht: Dem zweiten Bericht fehlt die Bilanzsumme des Vorjahres, der dritte bleibt leer.
+    assert eikon_stand_in.calls == 5
+    assert reports[0] == expected[0]
+    assert _company_data(reports[1])[:-1] == _company_data(expected[1])[:-1]
+    assert _company_data(reports[1])[-1] == ""
+    assert _company_data(reports[2]) == [""] * eikon_database.COUNT_COMPANY_DATA_FIELDS
+    assert "Zu 2 Bericht(en)" in capsys.readouterr().out
+
+def test_batch_quota_exhausted(eikon_stand_in, monkeypatch, tmp_path):
+    reports = benchmark_eikon.create_reports(1)
+    expected = _enriched(reports)
+
+    eikon_stand_in.calls = 0
+
+    monkeypatch.setattr(eikon_database, "_quota_ledger", eikon_client.QuotaLedger(str(tmp_path / "quota.json"), limit=2, reserve=0))
+
+    eikon_database.get_company_data_batched(reports, batch_size=100)
+
+    # Die Anfrage der Bilanzsumme des Vorjahres wird nicht mehr gesendet, die Spalte bleibt leer.
+    assert eikon_stand_in.calls == 2
+    assert _company_data(reports[0]) == _company_data(expected[0])[:-1] + [""]
+
+class _IncompleteStandIn(eikon_standin.EikonStandIn):
+    # Lässt die Zeilen der Instrumente "missing" in den Antworten mit Stichtag (SDate) aus.
+    def __init__(self, missing: set, **kwargs):
+        super().__init__(**kwargs)
+
+        self.missing = missing
+
+    def get_data(self, instruments, fields, parameters=None, **kwargs):
+        data, err = super().get_data(instruments, fields, parameters, **kwargs)
+
+        if parameters and "SDate" in parameters:
+            data = data[~data["Instrument"].isin(self.missing)]
+
+        return data, err
+
+def _normalized(reports: list) -> list:
+    # Unbekannte LEIs liefern pd.NA, das sich nicht über == vergleichen lässt.
+    return [[None if value is pd.NA else value for value in report] for report in reports]
+
+def test_batched_equals_per_report(eikon_stand_in):
+    eikon_stand_in.unknown_rate = 0.3
+
+    reports = benchmark_eikon.create_reports(25)
+    expected = _enriched(reports)
+
+    # Mehrere Pakete je Stichtag (batch_size=2) und mehrere Threads
+    eikon_database.get_company_data_batched(reports, batch_size=2, workers=3)
+
+    assert _normalized(reports) == _normalized(expected)
+    assert any(report[eikon_database.INDEX_ISIN] is pd.NA for report in reports)
+
+def test_batched_groups_by_period_end(eikon_stand_in):
+    reports = benchmark_eikon.create_reports(12)
+    expected = _enriched(reports)
+
+    eikon_stand_in.calls = 0
+
+    eikon_database.get_company_data_batched(reports, batch_size=2)
+
+    # 12 LEIs in 6 Paketen; die Stichtage (6 x 20211231, je 2 x drei weitere) und die Stichtage des Vorjahres ergeben jeweils 3 + 1 + 1 + 1 Pakete.
+    assert eikon_stand_in.calls == 6 + 6 + 6
+    assert reports == expected
+
+def test_batched_pads_missing_instruments(eikon_stand_in):
+    reports = benchmark_eikon.create_reports(4)
+    expected = _enriched(reports)
+
+    missing_isin = expected[1][eikon_database.INDEX_ISIN]
+
+    eikon_standin.install(_IncompleteStandIn({missing_isin}, requests_per_second=None))
+
+    eikon_database.get_company_data_batched(reports, batch_size=100)
+
+    # Die Daten zum Stichtag fehlen in der Antwort und werden als leere Werte angehängt, die ISIN bleibt erhalten.
+    assert _company_data(reports[1]) == [missing_isin] + [""] * (eikon_database.COUNT_COMPANY_DATA_FIELDS - 1)
+    assert [reports[i] for i in (0, 2, 3)] == [expected[i] for i in (0, 2, 3)]
+
+def _sample(reports: list) -> pd.DataFrame:
+    return pd.DataFrame(reports, columns=sample_store.COLUMNS)
+
+def _mask(df: pd.DataFrame, fields: list) -> pd.DataFrame:
+    mask = pd.DataFrame(False, index=df.index, columns=eikon_database.COMPANY_DATA_COLUMNS)
+
+    for index, column in fields:
+        mask.at[index, column] = True
+
+    return mask
+
+def test_update_company_data(eikon_stand_in):
+    expected = _sample(_enriched(benchmark_eikon.create_reports(4)))
+
+    # Bericht 0 ohne ISIN (und damit ohne Unternehmensdaten), Bericht 2 ohne Namen und Bilanzsumme des Vorjahres
+    df = expected.copy()
+    df.loc[0, eikon_database.COMPANY_DATA_COLUMNS] = ""
+    df.loc[2, ["COMPANY", "TOTAL_ASSETS_T-1"]] = ""
+
+    fields_to_update = sample_store.find_fields_to_update(df, pd.DataFrame(), eikon_database.COMPANY_DATA_COLUMNS)
+
+    eikon_stand_in.calls = 0
+
+    updates = eikon_database.update_company_data(df, fields_to_update, batch_size=100)
+
+    assert updates == {(index, column): expected.at[index, column] for index in df.index for column in eikon_database.COMPANY_DATA_COLUMNS if fields_to_update.at[index, column]}
+
+    # ISIN; Unternehmensdaten zu Bericht 0 und der Name zu Bericht 2 (zwei Kombinationen von Feldern); Bilanzsumme des Vorjahres (ein Stichtag)
+    assert eikon_stand_in.calls == 1 + 2 + 1
+
+def test_update_company_data_refreshes_only_stale_fields(eikon_stand_in, monkeypatch, tmp_path):
+    cache = eikon_cache.EikonCache(eikon_cache.get_path_cache_file(str(tmp_path)))
+
+    monkeypatch.setattr(eikon_database, "_cache", cache)
+
+    reports = benchmark_eikon.create_reports(2)
+
+    eikon_database.get_company_data_batched(reports, batch_size=100)
+
+    expected = _sample(reports)
+
+    # Der Cache enthält für den Streubesitz von Bericht 1 einen abweichenden (inzwischen veralteten) Wert.
+    trf_free_float = eikon_database._define_tr_fields()[1][4]
+
+    cache.put_many(expected.at[1, "ISIN"], [trf_free_float], {"SDate": expected.at[1, "PERIOD_END"]}, [999.0])
+
+    # Der Name von Bericht 0 ist leer und wird aus dem Cache übernommen, der Streubesitz von Bericht 1 ist veraltet und wird erneut abgerufen.
+    df = expected.copy()
+    df.at[0, "COMPANY"] = ""
+
+    fields_to_update = _mask(df, [(0, "COMPANY"), (1, "FREE_FLOAT")])
+    stale_fields = _mask(df, [(1, "FREE_FLOAT")])
+
+    eikon_stand_in.calls = 0
+
+    updates = eikon_database.update_company_data(df, fields_to_update, batch_size=100, stale_fields=stale_fields)
+
+    assert updates == {(0, "COMPANY"): expected.at[0, "COMPANY"], (1, "FREE_FLOAT"): expected.at[1, "FREE_FLOAT"]}
+    assert eikon_stand_in.calls == 1
+
+    # Ohne Angabe der veralteten Felder werden beide Werte aus dem Cache übernommen.
+    cache.put_many(expected.at[1, "ISIN"], [trf_free_float], {"SDate": expected.at[1, "PERIOD_END"]}, [999.0])
+
+    eikon_stand_in.calls = 0
+
+    updates = eikon_database.update_company_data(df, fields_to_update, batch_size=100)
+
+    assert updates == {(0, "COMPANY"): expected.at[0, "COMPANY"], (1, "FREE_FLOAT"): 999.0}
+    assert eikon_stand_in.calls == 0
+
+    cache.close()
+
+class _BrokenStandIn(eikon_standin.EikonStandIn):
+    def get_data(self, instruments, fields, parameters=None, **kwargs):
+        raise RuntimeError("Broken stand-in.")
+
+def _is_enriched(report: list) -> bool:
+    return len(report) == eikon_database.INDEX_ISIN + eikon_database.COUNT_COMPANY_DATA_FIELDS
+
+def test_pipeline_backpressure(eikon_stand_in):
+    eikon_stand_in.latency = 0.1
+
+    reports = benchmark_eikon.create_reports(4)
+    expected = _enriched(reports)
+
+    enriched = []
+
+    pipeline = eikon_database.EnrichmentPipeline(queue_size=1, workers=1, on_report=enriched.append)
+
+    # Je Bericht drei Anfragen (0,3 s). Der erste Bericht wird abgerufen, der zweite wartet in der Warteschlange, put des dritten blockiert.
+    start = time.monotonic()
+
+    for report in reports[:3]:
+        pipeline.put(report)
+
+    assert time.monotonic() - start >= 0.2
+    assert len(enriched) >= 1
+
+    pipeline.put(reports[3])
+    pipeline.close()
+
+    assert enriched == expected
+
+def test_pipeline_flush_timeout(eikon_stand_in):
+    reports = benchmark_eikon.create_reports(3)
+    expected = _enriched(reports)
+
+    pipeline = eikon_database.EnrichmentPipeline(queue_size=10, batch_size=10, flush_timeout=0.2)
+
+    for report in reports:
+        pipeline.put(report)
+
+    # Das Paket ist nicht voll, wird aber nach flush_timeout ohne weitere Berichte (und vor close) abgerufen.
+    deadline = time.monotonic() + 5
+
+    while not all(_is_enriched(report) for report in reports) and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert all(_is_enriched(report) for report in reports)
+
+    pipeline.close()
+
+    assert reports == expected
+
+def test_pipeline_propagates_errors(eikon_stand_in):
+    eikon_standin.install(_BrokenStandIn(requests_per_second=None))
+
+    reports = benchmark_eikon.create_reports(5)
+
+    # Nach dem Fehler werden die übrigen Berichte nur noch entnommen, put blockiert trotz queue_size=1 nicht.
+    with pytest.raises(RuntimeError, match="Broken stand-in."):
+        with eikon_database.EnrichmentPipeline(queue_size=1, batch_size=2, flush_timeout=0.1) as pipeline:
+            for report in reports:
+                pipeline.put(report)
+
+    pipeline = eikon_database.EnrichmentPipeline(queue_size=1, workers=2)
+
+    for report in benchmark_eikon.create_reports(5):
+        pipeline.put(report)
+
+    with pytest.raises(RuntimeError):
+        pipeline.close()
+
+    # Ohne raise_errors (z.B. beim Verlassen des Blocks nach einer Ausnahme) wird der Fehler nicht erneut ausgelöst.
+    pipeline = eikon_database.EnrichmentPipeline(queue_size=1)
+    pipeline.put(benchmark_eikon.create_reports(1)[0])
+    pipeline.close(raise_errors=False)
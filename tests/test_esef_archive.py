@@ -0,0 +1,54 @@
+import hashlib
+import zipfile
+
+import esef_archive
+
+REPORT = b"<html xmlns=\"http://www.w3.org/1999/xhtml\"><body>Bericht</body></html>"
+
+def _create_package(path_dir, name: str) -> str:
+    # Paket als ZIP-Archiv mit Bericht und Taxonomiepaket
+    path_archive = str(path_dir / name)
+
+    with zipfile.ZipFile(path_archive, "w") as archive:
+        archive.writestr("package/META-INF/taxonomyPackage.xml", "<taxonomyPackage/>")
+        archive.writestr("package/reports/report.xhtml", REPORT)
+
+    return path_archive
+
+def test_split_url_archive(tmp_path):
+    path_archive = _create_package(tmp_path, "package.ZIP")
+
+    url_report_file, url_taxonomy_package_file = esef_archive.find_files(path_archive)
+
+    assert url_report_file == path_archive + "/package/reports/report.xhtml"
+    assert url_taxonomy_package_file == path_archive
+    assert esef_archive.split_url(url_report_file) == (path_archive, "package/reports/report.xhtml")
+    assert esef_archive.get_path_on_disk(url_report_file) == path_archive
+    assert esef_archive.get_file_size(url_report_file) == len(REPORT)
+    assert esef_archive.calculate_checksum(url_report_file) == hashlib.sha1(REPORT).hexdigest()
+
+def test_split_url_directory_named_zip(tmp_path):
+    # Entpacktes Paket in einem Ordner, dessen Name auf ".zip" endet
+    path_report_file = tmp_path / "package.zip" / "reports" / "report.xhtml"
+    path_report_file.parent.mkdir(parents=True)
+    path_report_file.write_bytes(REPORT)
+
+    url_report_file = str(path_report_file)
+
+    assert not esef_archive.is_archive(str(tmp_path / "package.zip"))
+    assert esef_archive.split_url(url_report_file) is None
+    assert esef_archive.get_path_on_disk(url_report_file) == url_report_file
+    assert esef_archive.get_file_size(url_report_file) == len(REPORT)
+    assert esef_archive.calculate_checksum(url_report_file) == hashlib.sha1(REPORT).hexdigest()
+
+def test_split_url_archive_in_directory_named_zip(tmp_path):
+    (tmp_path / "import.zip").mkdir()
+
+    path_archive = _create_package(tmp_path / "import.zip", "package.zip")
+
+    assert esef_archive.split_url(path_archive + "/package/reports/report.xhtml") == (path_archive, "package/reports/report.xhtml")
+    assert esef_archive.calculate_checksum(path_archive + "/package/reports/report.xhtml") == hashlib.sha1(REPORT).hexdigest()
+
+def test_split_url_without_archive():
+    assert esef_archive.split_url("import/package/reports/report.xhtml") is None
+    assert esef_archive.split_url("import/missing.zip/reports/report.xhtml") is None
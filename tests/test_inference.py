@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+
+import inference
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(2)
+    n = 150
+
+    X = pd.DataFrame({"Intercept": 1.0, "x": rng.normal(size=n), "z": rng.normal(size=n)})
+    groups = pd.Series(rng.integers(0, 12, size=n), name="COUNTRY")
+
+    # Fehlerterm mit einer gemeinsamen Komponente je Cluster
+    y = pd.DataFrame({"y": X @ np.array([1.0, 0.5, -0.3]) + rng.normal(size=12)[groups] + rng.normal(size=n)})
+
+    return X, y, groups
+
+def test_cluster_robust_matches_statsmodels(data):
+    X, y, groups = data
+
+    df_inference = inference.analyze(X, y, inference.InferenceSettings(cluster="COUNTRY"), groups)
+
+    reference = sm.OLS(y["y"], X).fit(cov_type="cluster", cov_kwds={"groups": groups}, use_t=True)
+
+    np.testing.assert_allclose(df_inference["COEF"], reference.params, rtol=1e-10)
+    np.testing.assert_allclose(df_inference["OLS_STD_ERR"], sm.OLS(y["y"], X).fit().bse, rtol=1e-10)
+    np.testing.assert_allclose(df_inference["CLUSTER_STD_ERR"], reference.bse, rtol=1e-10)
+    np.testing.assert_allclose(df_inference["CLUSTER_P"], reference.pvalues, rtol=1e-8)
+    np.testing.assert_allclose(df_inference[["CLUSTER_CI_LOWER", "CLUSTER_CI_UPPER"]], reference.conf_int(), rtol=1e-10)
+
+    assert df_inference.attrs["clusters"] == 12
+
+def _bootstrap_reference(X, y, replications, groups=None, seed=inference.DEFAULT_SEED):
+    # Einzelne Schätzung je Stichprobe mit denselben gezogenen Beobachtungen bzw. Clustern
+    codes, uniques = pd.factorize(groups) if groups is not None else (np.arange(len(X)), np.arange(len(X)))
+
+    rng = np.random.default_rng(seed)
+    draws = rng.integers(0, len(uniques), size=(replications, len(uniques)))
+
+    betas = []
+
+    for draw in draws:
+        rows = np.concatenate([np.flatnonzero(codes == unit) for unit in draw])
+        betas.append(np.linalg.lstsq(X[rows], y[rows], rcond=None)[0])
+
+    return np.array(betas)
+
+@pytest.mark.parametrize("clustered", [False, True])
+def test_bootstrap_matches_reference(data, clustered):
+    X, y, groups = data
+
+    X_values = X.to_numpy()
+    y_values = y["y"].to_numpy()
+    group_values = groups.to_numpy() if clustered else None
+
+    betas = inference.bootstrap(X_values, y_values, 200, group_values)
+
+    np.testing.assert_allclose(betas, _bootstrap_reference(X_values, y_values, 200, group_values), rtol=1e-8, atol=1e-10)
+
+def test_bootstrap_independent_of_chunk_size(data):
+    X, y, groups = data
+
+    betas = inference.bootstrap(X.to_numpy(), y["y"].to_numpy(), 100, groups.to_numpy())
+    betas_chunked = inference.bootstrap(X.to_numpy(), y["y"].to_numpy(), 100, groups.to_numpy(), max_chunk_bytes=50000)
+
+    np.testing.assert_allclose(betas, betas_chunked, rtol=1e-12)
+
+def test_bootstrap_summary(data):
+    X, y, groups = data
+
+    df_inference = inference.analyze(X, y, inference.InferenceSettings(replications=300))
+
+    betas = _bootstrap_reference(X.to_numpy(), y["y"].to_numpy(), 300)
+
+    np.testing.assert_allclose(df_inference["BOOT_STD_ERR"], betas.std(axis=0, ddof=1), rtol=1e-8)
+    np.testing.assert_allclose(df_inference["BOOT_CI_LOWER"], np.percentile(betas, 2.5, axis=0), rtol=1e-8)
+    assert df_inference.attrs["replications"] == 300
@@ -0,0 +1,73 @@
+import ingestion_journal
+
+def _write_journal(path_journal_file):
+    journal = ingestion_journal.IngestionJournal(str(path_journal_file))
+
+    journal.record("a", ingestion_journal.STATE_PARSED, "package-a", ["package-a", "LEI-A", 1])
+    journal.record("b", ingestion_journal.STATE_PARSED, "package-b", ["package-b", "LEI-B", 2])
+    journal.record("a", ingestion_journal.STATE_ENRICHED, "package-a", ["package-a", "LEI-A", 1, "ISIN-A"])
+
+    return journal
+
+def test_replay(tmp_path):
+    path_journal_file = tmp_path / ingestion_journal.JOURNAL_FILE_NAME
+
+    _write_journal(path_journal_file)
+
+    journal = ingestion_journal.IngestionJournal(str(path_journal_file))
+
+    assert journal.state("a") == ingestion_journal.STATE_ENRICHED
+    assert journal.state("b") == ingestion_journal.STATE_PARSED
+    assert journal.pending() == 2
+    assert journal.reports(ingestion_journal.STATE_ENRICHED) == [["package-a", "LEI-A", 1, "ISIN-A"]]
+
+def test_replay_after_truncated_last_record(tmp_path):
+    path_journal_file = tmp_path / ingestion_journal.JOURNAL_FILE_NAME
+
+    _write_journal(path_journal_file)
+
+    # Abbruch während des Schreibens der letzten Zeile
+    with open(path_journal_file, "a", encoding="utf-8") as file:
+        file.write("{\"sha1\": \"b\", \"state\": \"sto")
+
+    journal = ingestion_journal.IngestionJournal(str(path_journal_file))
+
+    assert journal.state("a") == ingestion_journal.STATE_ENRICHED
+    assert journal.state("b") == ingestion_journal.STATE_PARSED
+
+    # Zeilen, die nach der unvollständigen Zeile angehängt werden, gehen beim nächsten Lesen nicht verloren.
+    journal.record("b", ingestion_journal.STATE_STORED, "package-b")
+
+    journal = ingestion_journal.IngestionJournal(str(path_journal_file))
+
+    assert journal.state("b") == ingestion_journal.STATE_STORED
+    assert journal.reports(ingestion_journal.STATE_STORED) == [["package-b", "LEI-B", 2]]
+    assert journal.pending() == 1
+
+def test_clear(tmp_path):
+    path_journal_file = tmp_path / ingestion_journal.JOURNAL_FILE_NAME
+
+    journal = _write_journal(path_journal_file)
+    journal.clear()
+
+    assert not path_journal_file.exists()
+    assert "a" not in ingestion_journal.IngestionJournal(str(path_journal_file))
+
+def test_record_many(tmp_path, monkeypatch):
+    path_journal_file = tmp_path / ingestion_journal.JOURNAL_FILE_NAME
+
+    journal = _write_journal(path_journal_file)
+
+    fsyncs = []
+
+    monkeypatch.setattr(ingestion_journal.os, "fsync", fsyncs.append)
+
+    # Alle Zeilen werden mit einem Schreibvorgang übertragen.
+    journal.record_many(["a", "b"], ingestion_journal.STATE_STORED)
+
+    assert len(fsyncs) == 1
+
+    journal = ingestion_journal.IngestionJournal(str(path_journal_file))
+
+    assert journal.pending() == 0
+    assert journal.reports(ingestion_journal.STATE_STORED) == [["package-a", "LEI-A", 1, "ISIN-A"], ["package-b", "LEI-B", 2]]
@@ -0,0 +1,60 @@
+import io
+
+import pytest
+
+import esef_package_generator
+import ixbrl_parser
+import reporting
+import tag_store
+
+@pytest.fixture(scope="module", autouse=True)
+def arelle():
+    reporting._init_worker()
+
+@pytest.mark.parametrize("archive", [False, True])
+def test_parity_with_arelle(tmp_path, archive):
+    # Beide Engines liefern für dasselbe Paket dieselben Kennzahlen und dieselben Tags.
+    package = esef_package_generator.generate_package(str(tmp_path), 1, facts=300, extension_share=0.2, text_block_share=0.05, text_block_bytes=500, seed=5, archive=archive)
+
+    url_report_file, url_taxonomy_package_file, sha1, manifest_entry, is_from_manifest = reporting._discover_esef_package({}, package.path)
+
+    reports = {}
+
+    for engine in (reporting.ENGINE_STREAM, reporting.ENGINE_ARELLE):
+        path_reports_dir = tmp_path / engine
+        path_reports_dir.mkdir()
+
+        report, err, parity_differences = reporting._parse_esef_package_tags(package.name, url_report_file, url_taxonomy_package_file, str(path_reports_dir), engine, True)
+
+        assert err is None
+        assert parity_differences == []
+
+        reports[engine] = (report, tag_store.read_report(str(path_reports_dir), package.name))
+
+    report, tags = reports[reporting.ENGINE_STREAM]
+    report_reference, tags_reference = reports[reporting.ENGINE_ARELLE]
+
+    assert report == report_reference
+    assert report[1:4] == [package.lei, package.period_end, package.facts]
+    assert report[7] == package.ext_facts
+
+    assert tags == tags_reference
+
+def test_continuation_and_exclude():
+    report = b"""<html xmlns="http://www.w3.org/1999/xhtml" xmlns:ix="http://www.xbrl.org/2013/inlineXBRL" xmlns:xbrli="http://www.xbrl.org/2003/instance">
+<body>
+<ix:header><ix:resources>
+<xbrli:context id="c1"><xbrli:entity><xbrli:identifier scheme="http://standards.iso.org/iso/17442">LEI1</xbrli:identifier></xbrli:entity><xbrli:period><xbrli:instant>2021-12-31</xbrli:instant></xbrli:period></xbrli:context>
+</ix:resources></ix:header>
+<ix:nonNumeric name="ifrs-full:Text" contextRef="c1" continuedAt="k1">Erster <ix:exclude>ohne</ix:exclude>Teil</ix:nonNumeric>
+<ix:nonFraction name="ifrs-full:Amount" contextRef="c1" unitRef="eur" decimals="0" scale="3" sign="-" format="ixt:num-dot-decimal">1,234</ix:nonFraction>
+<ix:continuation id="k1"> und zweiter Teil</ix:continuation>
+</body></html>"""
+
+    contexts = {}
+    facts = list(ixbrl_parser.iter_inline_facts(io.BytesIO(report), contexts))
+
+    assert [fact.qname for fact in facts] == ["ifrs-full:Amount", "ifrs-full:Text"]
+    assert facts[1].value == "Erster Teil und zweiter Teil"
+    assert contexts["c1"].entity_identifier == "LEI1"
+    assert contexts["c1"].end_date.isoformat() == "2021-12-31"
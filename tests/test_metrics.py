@@ -0,0 +1,145 @@
+import json
+import multiprocessing
+import os
+
+import pytest
+
+import metrics
+
+@pytest.fixture(autouse=True)
+def reset_metrics(monkeypatch):
+    # Der Zustand des Moduls wird nach jedem Test wiederhergestellt.
+    for name in ("_enabled", "_sinks", "_pending", "_aggregates", "_run_id"):
+        monkeypatch.setattr(metrics, name, getattr(metrics, name))
+
+def _read_prometheus_file(path_dir) -> list:
+    with open(os.path.join(str(path_dir), metrics.METRICS_PROMETHEUS_FILE_NAME), "r", encoding="utf-8") as file:
+        return file.read().splitlines()
+
+def _worker(value: int) -> list:
+    metrics.enable_in_worker()
+
+    metrics.observe("test.facts", value)
+    metrics.count("test.packages")
+
+    with metrics.timer("test.package"):
+        pass
+
+    return metrics.drain()
+
+def test_disabled_is_no_op(tmp_path):
+    assert not metrics.is_enabled()
+    assert metrics.timer("test.package") is metrics._NULL_TIMER
+
+    with metrics.timer("test.package"):
+        metrics.count("test.packages")
+        metrics.observe("test.facts", 10)
+        metrics.elapsed("test.total", 1.5)
+
+    metrics.merge([{"kind": metrics.KIND_COUNTER, "name": "test.packages", "value": 1}])
+    metrics.flush()
+    metrics.close()
+
+    assert metrics.drain() == []
+    assert metrics._aggregates == {}
+
+def test_prometheus_buckets(tmp_path):
+    metrics.enable(metrics.create_sinks([metrics.SINK_PROMETHEUS], str(tmp_path)))
+
+    for seconds in (0.0005, 0.001, 0.003, 0.2, 400):
+        metrics.elapsed("ingestion.read-tags", seconds)
+
+    metrics.observe("ingestion.facts", 50)
+    metrics.count("ingestion.errors")
+    metrics.count("ingestion.errors", 2)
+
+    metrics.close()
+
+    lines = _read_prometheus_file(tmp_path)
+
+    assert lines[:2] == ["# TYPE esef_ingestion_errors_total counter", "esef_ingestion_errors_total 3"]
+
+    # Die Klassen sind kumulativ; Werte auf der Obergrenze zählen zur Klasse, Werte über der letzten Obergrenze nur zu +Inf.
+    assert "# TYPE esef_ingestion_read_tags_seconds histogram" in lines
+    assert "esef_ingestion_read_tags_seconds_bucket{le=\"0.001\"} 2" in lines
+    assert "esef_ingestion_read_tags_seconds_bucket{le=\"0.005\"} 3" in lines
+    assert "esef_ingestion_read_tags_seconds_bucket{le=\"0.1\"} 3" in lines
+    assert "esef_ingestion_read_tags_seconds_bucket{le=\"0.25\"} 4" in lines
+    assert "esef_ingestion_read_tags_seconds_bucket{le=\"300\"} 4" in lines
+    assert "esef_ingestion_read_tags_seconds_bucket{le=\"+Inf\"} 5" in lines
+    assert "esef_ingestion_read_tags_seconds_count 5" in lines
+
+    assert "esef_ingestion_facts_bucket{le=\"10\"} 0" in lines
+    assert "esef_ingestion_facts_bucket{le=\"100\"} 1" in lines
+    assert "esef_ingestion_facts_sum 50" in lines
+
+def test_aggregates_are_bounded(capsys):
+    metrics.enable([metrics.SummaryTableSink()])
+
+    for i in range(1, 5001):
+        metrics.observe("test.facts", i)
+
+        if i % 1000 == 0:
+            metrics.flush()
+
+    aggregate = metrics._aggregates[(metrics.KIND_HISTOGRAM, "test.facts")]
+
+    # Je Messgröße wird nur eine Stichprobe fester Größe aufbewahrt, Anzahl, Summe und Maximum sind exakt.
+    assert len(aggregate.sample) == metrics.SAMPLE_SIZE
+    assert (aggregate.count, aggregate.sum, aggregate.max) == (5000, 5000 * 5001 // 2, 5000)
+    assert metrics.drain() == []
+
+    metrics.close()
+
+    row = next(line for line in capsys.readouterr().out.splitlines() if line.strip().startswith("test.facts")).split()
+
+    assert row[1:4] == ["5000", "12502500", "2500.5000"]
+    assert row[6] == "5000"
+    assert abs(float(row[4]) - 2500) < 250
+
+def test_summary_table(capsys):
+    metrics.enable([metrics.SummaryTableSink()])
+
+    for seconds in (1, 2, 3, 4):
+        metrics.elapsed("test.package", seconds)
+
+    metrics.count("test.packages", 4)
+
+    metrics.close()
+
+    out = capsys.readouterr().out
+
+    assert "\ttest.package s" in out
+    assert out.split("test.package s")[1].split()[:6] == ["4", "10", "2.5000", "2.5000", "3.8500", "4"]
+    assert out.split("test.packages")[1].split()[:2] == ["1", "4"]
+
+def test_drain_and_merge_across_processes(tmp_path):
+    metrics.enable(metrics.create_sinks([metrics.SINK_JSONL, metrics.SINK_PROMETHEUS], str(tmp_path)))
+
+    metrics.count("test.packages")
+
+    with multiprocessing.get_context("fork").Pool(2) as pool:
+        results = pool.map(_worker, [1, 10, 100])
+
+    assert all(len(events) == 3 for events in results)
+
+    for events in results:
+        metrics.merge(events)
+
+    metrics.close()
+
+    lines = _read_prometheus_file(tmp_path)
+
+    assert "esef_test_packages_total 4" in lines
+    assert "esef_test_facts_bucket{le=\"1\"} 1" in lines
+    assert "esef_test_facts_bucket{le=\"10\"} 2" in lines
+    assert "esef_test_facts_bucket{le=\"100\"} 3" in lines
+    assert "esef_test_package_seconds_count 3" in lines
+
+    # Die Ereignisse der Worker werden dem Lauf des aufrufenden Prozesses zugeordnet und behalten die Prozess-ID des Workers.
+    with open(os.path.join(str(tmp_path), metrics.METRICS_LOG_FILE_NAME), "r", encoding="utf-8") as file:
+        events = [json.loads(line) for line in file]
+
+    assert len(events) == 1 + 3 * 3
+    assert {event["run"] for event in events} == {metrics._run_id}
+    assert any(event["pid"] != os.getpid() for event in events)
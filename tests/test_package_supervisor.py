@@ -0,0 +1,61 @@
+import os
+import signal
+import time
+
+import pytest
+
+import package_supervisor
+
+pytestmark = pytest.mark.skipif(not package_supervisor.is_memory_monitoring_supported(), reason="benötigt /proc")
+
+def _task(kind: str) -> str:
+    if kind == "hang":
+        time.sleep(60)
+    elif kind == "crash":
+        os.kill(os.getpid(), signal.SIGKILL)
+    elif kind == "memory":
+        data = bytearray(400 * 1024 * 1024)
+        time.sleep(60)
+    elif kind == "error":
+        raise ValueError("fehlerhaftes Paket")
+
+    return kind
+
+def _run(kinds, **limits):
+    with package_supervisor.SupervisedPool(2, **limits) as pool:
+        return list(pool.map(_task, kinds))
+
+def test_success_in_order():
+    assert _run(["a", "b", "c", "d", "e"], timeout_s=30) == ["a", "b", "c", "d", "e"]
+
+def test_timeout():
+    start = time.time()
+
+    results = _run(["a", "hang", "b"], timeout_s=1)
+
+    assert results[0] == "a" and results[2] == "b"
+    assert isinstance(results[1], package_supervisor.TaskKilled)
+    assert results[1].reason == package_supervisor.REASON_TIMEOUT
+    assert time.time() - start < 30
+
+def test_crash():
+    results = _run(["a", "crash", "b", "c"], timeout_s=30)
+
+    assert results[1].reason == package_supervisor.REASON_CRASH
+    assert [results[0], results[2], results[3]] == ["a", "b", "c"]
+
+def test_memory_limit():
+    results = _run(["memory", "a"], timeout_s=30, memory_mb=200)
+
+    assert results[0].reason == package_supervisor.REASON_MEMORY
+    assert results[1] == "a"
+
+def test_error():
+    results = _run(["error", "a"], timeout_s=30)
+
+    assert results[0] == package_supervisor.TaskKilled(package_supervisor.REASON_ERROR, "ValueError: fehlerhaftes Paket")
+    assert results[1] == "a"
+
+def test_recycling(capsys):
+    assert _run(["a", "b", "c", "d"], max_tasks_per_child=1) == ["a", "b", "c", "d"]
+    assert capsys.readouterr().out.count("erneuert") == 4
@@ -0,0 +1,149 @@
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import sample_store
+
+COLUMNS = ["ISIN", "COMPANY", "FREE_FLOAT"]
+
+DAY = 86400
+
+def _create_sample(path_sample_store_file: str) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "SHA1": ["a", "b", "c"],
+        "ISIN": ["DE0001", "DE0002", ""],
+        "COMPANY": ["", "Company B", "Company C"],
+        "FREE_FLOAT": [12.5, 30.0, np.nan],
+    })
+
+    sample_store.append(path_sample_store_file, df)
+
+    now = time.time()
+
+    # Bericht a: ISIN aktuell, Streubesitz vor 40 Tagen aktualisiert; Bericht b: Alter unbekannt; Bericht c: Name vor 10 Tagen aktualisiert
+    sample_store.record_field_updates(path_sample_store_file, df, pd.DataFrame({"ISIN": [True, False, False], "COMPANY": [False, False, False], "FREE_FLOAT": [False, False, False]}), now)
+    sample_store.record_field_updates(path_sample_store_file, df, pd.DataFrame({"ISIN": [False, False, False], "COMPANY": [False, False, False], "FREE_FLOAT": [True, False, False]}), now - 40 * DAY)
+    sample_store.record_field_updates(path_sample_store_file, df, pd.DataFrame({"ISIN": [False, False, False], "COMPANY": [False, False, True], "FREE_FLOAT": [False, False, False]}), now - 10 * DAY)
+
+    return sample_store.load(path_sample_store_file)
+
+def test_find_empty_fields(tmp_path):
+    path_sample_store_file = str(tmp_path / "sample.sqlite")
+
+    df = _create_sample(path_sample_store_file)
+
+    fields_to_update = sample_store.find_fields_to_update(df, sample_store.load_field_updates(path_sample_store_file), COLUMNS)
+
+    assert fields_to_update.to_dict("list") == {"ISIN": [False, False, True], "COMPANY": [True, False, False], "FREE_FLOAT": [False, False, True]}
+
+def test_find_stale_fields(tmp_path):
+    path_sample_store_file = str(tmp_path / "sample.sqlite")
+
+    df = _create_sample(path_sample_store_file)
+    field_updates = sample_store.load_field_updates(path_sample_store_file)
+
+    # Veraltet sind der Streubesitz von a (40 Tage) und alle Werte von b (Alter unbekannt). Bericht c hat nur leere Felder und einen aktuellen
+    # Namen (10 Tage); leere Felder gelten nicht als veraltet.
+    stale_fields = sample_store.find_stale_fields(df, field_updates, COLUMNS, 30)
+
+    assert stale_fields.to_dict("list") == {"ISIN": [False, True, False], "COMPANY": [False, True, False], "FREE_FLOAT": [True, True, False]}
+
+    fields_to_update = sample_store.find_fields_to_update(df, field_updates, COLUMNS, 30)
+
+    assert fields_to_update.to_dict("list") == {"ISIN": [False, True, True], "COMPANY": [True, True, False], "FREE_FLOAT": [True, True, True]}
+
+    # Mit einem höheren Höchstalter bleiben nur die Felder unbekannten Alters veraltet, mit 0 Tagen alle nicht leeren Felder.
+    assert sample_store.find_stale_fields(df, field_updates, COLUMNS, 60).to_dict("list") == {"ISIN": [False, True, False], "COMPANY": [False, True, False], "FREE_FLOAT": [False, True, False]}
+    assert sample_store.find_stale_fields(df, field_updates, COLUMNS, 0).to_dict("list") == {"ISIN": [True, True, False], "COMPANY": [False, True, True], "FREE_FLOAT": [True, True, False]}
+
+def test_find_stale_fields_without_field_updates(tmp_path):
+    path_sample_store_file = str(tmp_path / "sample.sqlite")
+
+    df = pd.DataFrame({"SHA1": ["a", "b"], "ISIN": ["DE0001", ""], "COMPANY": ["Company A", "Company B"], "FREE_FLOAT": [np.nan, 1.0]})
+
+    # Ohne erfasste Zeitpunkte (z.B. Sample aus einer früheren Version) ist das Alter aller Werte unbekannt.
+    stale_fields = sample_store.find_stale_fields(df, sample_store.load_field_updates(path_sample_store_file), COLUMNS, 30)
+
+    assert stale_fields.to_dict("list") == {"ISIN": [True, False], "COMPANY": [True, True], "FREE_FLOAT": [False, True]}
+
+def test_append_upserts_on_key(tmp_path):
+    path_sample_store_file = str(tmp_path / "sample.sqlite")
+
+    sample_store.append(path_sample_store_file, pd.DataFrame({"SHA1": ["a", "b"], "LEI": ["LEI-A", "LEI-B"], "ISIN": ["", "DE0002"]}))
+
+    # Ein erneut gelesener Bericht überschreibt die vorhandene Zeile und behält seine Position.
+    sample_store.append(path_sample_store_file, pd.DataFrame({"SHA1": ["a", "c"], "LEI": ["LEI-A", "LEI-C"], "ISIN": ["DE0001", "DE0003"]}))
+
+    df = sample_store.load(path_sample_store_file, ["SHA1", "LEI", "ISIN"])
+
+    assert df.to_dict("list") == {"LEI": ["LEI-A", "LEI-B", "LEI-C"], "SHA1": ["a", "b", "c"], "ISIN": ["DE0001", "DE0002", "DE0003"]}
+
+    # Nur mit der Schlüsselspalte werden vorhandene Berichte nicht verändert.
+    sample_store.append(path_sample_store_file, pd.DataFrame({"SHA1": ["b", "d"]}))
+
+    df = sample_store.load(path_sample_store_file, ["SHA1", "ISIN"])
+
+    assert df["SHA1"].tolist() == ["a", "b", "c", "d"]
+    assert df["ISIN"].tolist()[:3] == ["DE0001", "DE0002", "DE0003"]
+
+    with sqlite3.connect(path_sample_store_file) as connection:
+        assert connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (sample_store.KEY_INDEX_NAME, )).fetchone() is not None
+
+def test_legacy_duplicates_removed(tmp_path):
+    path_sample_store_file = str(tmp_path / "sample.sqlite")
+
+    # Sample einer früheren Version: nicht eindeutiger Index, Bericht "a" zweimal enthalten
+    with sqlite3.connect(path_sample_store_file) as connection:
+        connection.execute("CREATE TABLE {} (ROW_ID INTEGER PRIMARY KEY AUTOINCREMENT, {})".format(sample_store.TABLE_NAME, ", ".join("\"{}\" {}".format(column, column_type) for column, column_type in sample_store.COLUMN_TYPES.items())))
+        connection.execute("CREATE INDEX IDX_{0}_SHA1 ON {0} (SHA1)".format(sample_store.TABLE_NAME))
+        connection.executemany("INSERT INTO {} (SHA1, ISIN) VALUES (?, ?)".format(sample_store.TABLE_NAME), [("a", "OLD"), ("b", "DE0002"), ("a", "DE0001"), (None, "X"), (None, "Y")])
+
+    sample_store.create(path_sample_store_file)
+
+    # Erhalten bleibt die zuletzt geschriebene Zeile je Bericht; Zeilen ohne Prüfsumme werden nicht zusammengefasst.
+    df = sample_store.load(path_sample_store_file, ["SHA1", "ISIN"])
+
+    assert df["ISIN"].tolist() == ["DE0002", "DE0001", "X", "Y"]
+
+    with sqlite3.connect(path_sample_store_file) as connection:
+        indices = [row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (sample_store.TABLE_NAME, ))]
+
+    assert sample_store.KEY_INDEX_NAME in indices
+    assert "IDX_{}_SHA1".format(sample_store.TABLE_NAME) not in indices
+
+@pytest.mark.parametrize("value, column_type, expected", [
+    (None, "REAL", None),
+    (np.nan, "REAL", None),
+    (pd.NA, "TEXT", None),
+    ("", "TEXT", None),
+    ("DE0001", "TEXT", "DE0001"),
+    (12, "TEXT", "12"),
+    ("12.5", "REAL", 12.5),
+    ("12.5", "INTEGER", 12),
+    ("n/a", "REAL", None),
+    (np.int64(7), "INTEGER", 7),
+    (np.float64(7.0), "INTEGER", 7),
+    (np.int64(7), "REAL", 7.0),
+    (True, "INTEGER", 1),
+])
+def test_to_sql_value(value, column_type, expected):
+    result = sample_store._to_sql_value(value, column_type)
+
+    assert result == expected
+    assert type(result) is type(expected)
+
+def test_export_excel(tmp_path):
+    path_sample_store_file = str(tmp_path / "sample.sqlite")
+    path_sample_excel_file = str(tmp_path / "sample.xlsx")
+
+    sample_store.append(path_sample_store_file, pd.DataFrame({"SHA1": ["a", "b"], "ISIN": ["DE0001", ""], "MARKET_CAP": [1.5, np.nan]}))
+    sample_store.export_excel(path_sample_store_file, path_sample_excel_file)
+
+    df = pd.read_excel(path_sample_excel_file, sheet_name="DATA", index_col=0)
+
+    assert list(df.columns) == sample_store.COLUMNS
+    assert df["SHA1"].tolist() == ["a", "b"]
+    assert df["MARKET_CAP"].tolist()[0] == 1.5
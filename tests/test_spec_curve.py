@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.formula.api as smf
+
+import spec_curve
+
+CONFIG = spec_curve.SpecCurveConfig("y", "x", ["z"], [[None, "w"], [None, "SECTOR", "v"], [None, "u"]])
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(1)
+    n = 200
+
+    df = pd.DataFrame({
+        "x": rng.normal(size=n),
+        "z": rng.normal(size=n),
+        "w": rng.normal(size=n),
+        "v": rng.normal(size=n),
+        "u": rng.normal(size=n),
+        "SECTOR": rng.choice(["A", "B", "C"], size=n),
+    })
+
+    df["y"] = 0.5 * df["x"] - 0.2 * df["z"] + 0.3 * df["w"] + (df["SECTOR"] == "B") * 0.4 + rng.normal(size=n)
+
+    # Fehlende Werte in einzelnen Variablen, sodass sich die Beobachtungen der Spezifikationen unterscheiden
+    df.loc[rng.choice(n, 15, replace=False), "w"] = np.nan
+    df.loc[rng.choice(n, 10, replace=False), "u"] = np.nan
+
+    return df
+
+def test_estimate_matches_statsmodels(df):
+    df_results = spec_curve.estimate(df, CONFIG)
+
+    assert len(df_results) == len(spec_curve.get_specifications(CONFIG)) == 12
+
+    for row in df_results.itertuples():
+        reference = smf.ols(row.FORMULA, data=df).fit()
+
+        assert row.COEF == pytest.approx(reference.params["x"], rel=1e-8)
+        assert row.STD_ERR == pytest.approx(reference.bse["x"], rel=1e-8)
+        assert row.P == pytest.approx(reference.pvalues["x"], rel=1e-6)
+        assert [row.CI_LOWER, row.CI_UPPER] == pytest.approx(reference.conf_int().loc["x"].tolist(), rel=1e-8)
+        assert row.R2 == pytest.approx(reference.rsquared, rel=1e-8)
+        assert row.ADJ_R2 == pytest.approx(reference.rsquared_adj, rel=1e-8)
+        assert row.N == reference.nobs
+        assert row.K == len(reference.params)
+
+def test_rank_deficient_specification(df):
+    # Eine Kontrollvariable, die der untersuchten Variable entspricht, macht die Spezifikation nicht schätzbar.
+    df["copy_of_x"] = df["x"] * 2
+
+    df_results = spec_curve.estimate(df, spec_curve.SpecCurveConfig("y", "x", [], [[None, "copy_of_x"]]))
+
+    assert not np.isnan(df_results.loc[0, "COEF"])
+    assert np.isnan(df_results.loc[1, "COEF"])
+
+def test_term_not_in_design(df):
+    # "w * v" wird von patsy in mehrere Terme (w, v, w:v) zerlegt.
+    with pytest.raises(ValueError):
+        spec_curve.estimate(df, spec_curve.SpecCurveConfig("y", "x", [], [[None, "w * v"]]))
@@ -0,0 +1,71 @@
+import hashlib
+import json
+
+import numpy as np
+import pytest
+
+import tag_store
+
+TAGS = [
+    ("ifrs-full:Revenue", "1000", False),
+    ("ext:SpecialItem", "Ä-Umlaut und Emoji \U0001F600", True),
+    ("ifrs-full:Revenue", "2000", False),
+    ("ifrs-full:DisclosureTextBlock", "<p>Text</p>" * 500, False),
+    ("ext:Empty", None, True),
+]
+
+def test_round_trip_text(tmp_path):
+    tag_store.save(str(tmp_path), "package", TAGS)
+
+    assert tag_store.read_report(str(tmp_path), "package") == [(qname, "" if value is None else value, is_extension) for qname, value, is_extension in TAGS]
+
+def test_round_trip_hash(tmp_path):
+    tag_store.save(str(tmp_path), "package", TAGS, tag_store.VALUES_HASH)
+
+    with np.load(tag_store.get_path_report_file(str(tmp_path), "package")) as report:
+        assert "value_blob" not in report.files
+
+    expected_hashes = [hashlib.sha1(("" if value is None else value).encode("utf-8")).hexdigest() for qname, value, is_extension in TAGS]
+
+    assert [value for qname, value, is_extension in tag_store.read_report(str(tmp_path), "package")] == expected_hashes
+    assert tag_store.read_column(str(tmp_path), tag_store.COLUMN_VALUE_HASH)[tag_store.COLUMN_VALUE_HASH].tolist() == expected_hashes
+
+def test_dictionary_encoding(tmp_path):
+    tag_store.save(str(tmp_path), "package", TAGS)
+
+    with np.load(tag_store.get_path_report_file(str(tmp_path), "package")) as report:
+        assert sorted(report["qname_dictionary"].tolist()) == sorted(set(qname for qname, value, is_extension in TAGS))
+        assert len(report["qname_codes"]) == len(TAGS)
+
+def test_empty_report(tmp_path):
+    tag_store.save(str(tmp_path), "package", [])
+
+    assert tag_store.read_report(str(tmp_path), "package") == []
+    assert tag_store.read_column(str(tmp_path), tag_store.COLUMN_QNAME).empty
+
+def test_read_column_across_reports(tmp_path):
+    tag_store.save(str(tmp_path), "b", TAGS[:2])
+    tag_store.save(str(tmp_path), "a", TAGS[2:])
+
+    # Berichte im bisherigen JSON-Format werden weiterhin gelesen.
+    with open(tmp_path / "c.json", "w") as file:
+        json.dump([list(tag) for tag in TAGS[:1]], file)
+
+    df = tag_store.read_column(str(tmp_path), tag_store.COLUMN_IS_EXTENSION)
+
+    assert df["ESEF_PACKAGE_NAME"].tolist() == ["a"] * 3 + ["b"] * 2 + ["c"]
+    assert df[tag_store.COLUMN_IS_EXTENSION].tolist() == [False, False, True, False, True, False]
+
+    df = tag_store.read_column(str(tmp_path), tag_store.COLUMN_QNAME, ["c", "b"])
+
+    assert df[tag_store.COLUMN_QNAME].tolist() == ["ifrs-full:Revenue", "ifrs-full:Revenue", "ext:SpecialItem"]
+
+def test_read_unknown_column(tmp_path):
+    with pytest.raises(ValueError):
+        tag_store.read_column(str(tmp_path), "unknown")
+
+def test_discard_leaves_no_file(tmp_path):
+    with tag_store.TagWriter(str(tmp_path), "package") as tag_writer:
+        tag_writer.add("ifrs-full:Revenue", "1", False)
+
+    assert list(tmp_path.iterdir()) == []